@@ -1,41 +1,36 @@
 # ObstacleAvoidance.py
 import state
+import sensor_filters
 from arduino import send_command
-import time
 
 # Configuration
 SAFE_LASER_DISTANCE = 40
 SAFE_ULTRASONIC_DISTANCE = 20
-LOOP_DELAY = 0.05
-MIN_US_VALID = 5
+SENSOR_TIMEOUT = 1.0  # warn when no distance reading arrives for this long
+DISTANCE_SENSORS = ("laser", "ultrasonic0", "ultrasonic1")
 
-def parse_sensor(value):
-    """Convert sensor value to int. Works for int or 'LASER:111' format."""
-    if value is None:
-        return None
-    if isinstance(value, int):
-        return value
-    try:
-        # Handle "LASER:111" or "ULTRASONIC0:8"
-        return int(value.split(":")[1])
-    except:
-        return None
-
-def read_sensors():
-    laser = parse_sensor(getattr(state, 'laserValue', None))
-    us0 = parse_sensor(getattr(state, 'ultrasonic0Value', None))
-    us1 = parse_sensor(getattr(state, 'ultrasonic1Value', None))
+def read_sensors(snapshot=None):
+    """
+    Filtered distances from state.filtered (or from a snapshot of it), see sensor_filters.py.
+    None when a sensor has no valid reading: the laser out of range (-1), ultrasonic echoes
+    below sensor_filters.MIN_US_VALID; single bad readings are already dropped by the median.
+    """
+    values = (snapshot or state.filtered.snapshot()).values
+    return values.laser, values.ultrasonic0, values.ultrasonic1
 
-    # Ignore invalid ultrasonic readings
-    if us0 is not None and us0 < MIN_US_VALID:
-        us0 = None
-    if us1 is not None and us1 < MIN_US_VALID:
-        us1 = None
+def read_confidence(snapshot=None):
+    values = (snapshot or state.filtered.snapshot()).values
+    return values.laser_confidence, values.ultrasonic0_confidence, values.ultrasonic1_confidence
 
-    return laser, us0, us1
+def fmt(distance, confidence):
+    # "412 (0.93)": filtered distance and its confidence
+    return "None" if distance is None else f"{distance:.0f} ({confidence:.2f})"
 
-def obstacle_avoidance_step():
-    laser, us0, us1 = read_sensors()
+def obstacle_avoidance_step(snapshot=None):
+    # Reaction time counts from the arrival of the raw readings, not from the filter's publish
+    raw = state.sensors.snapshot()
+    snapshot = snapshot or state.filtered.snapshot()
+    laser, us0, us1 = read_sensors(snapshot)
     command = "FORWARD"
 
     left_clear = us0 is None or us0 > SAFE_ULTRASONIC_DISTANCE
@@ -57,17 +52,28 @@ def obstacle_avoidance_step():
             command = "LEFT" if left_clear else "STOP"
 
     send_command("dev00", command)
-    state.systemStatus = f"ObstacleAvoidance: {command} | Sensors: laser={laser}, us_left={us0}, us_right={us1}"
+    state.reactions.record("ObstacleAvoidance", raw, DISTANCE_SENSORS)
+    c_laser, c_us0, c_us1 = read_confidence(snapshot)
+    state.systemStatus = (f"ObstacleAvoidance: {command} | Sensors: laser={fmt(laser, c_laser)}, "
+                          f"us_left={fmt(us0, c_us0)}, us_right={fmt(us1, c_us1)}")
     print(state.systemStatus)
 
 def run_obstacle_avoidance():
+    # React to each new filtered distance as soon as the Arduino reader stores the reading
+    sensor_filters.start()
+    snapshot = state.filtered.snapshot()
     try:
         while True:
-            obstacle_avoidance_step()
-            time.sleep(LOOP_DELAY)
+            update = state.filtered.wait(snapshot, DISTANCE_SENSORS, timeout=SENSOR_TIMEOUT)
+            if update is None:
+                print(f"⚠️ ObstacleAvoidance: no distance reading for {SENSOR_TIMEOUT}s")
+                continue
+            snapshot = update
+            obstacle_avoidance_step(snapshot)
     except KeyboardInterrupt:
         send_command("dev00", "STOP")
         print("Obstacle avoidance stopped safely.")
+        print(state.reactions.report())
 
 if __name__ == "__main__":
     run_obstacle_avoidance()
@@ -9,6 +9,7 @@ from common.audio_utils import load_audio
 from common.preprocessing import preprocess, improve_input_audio
 from common.postprocessing import clean_transcription
 from common.record_utils import record_audio
+from common.streaming import StreamingTranscriber
 from whisper_hef_registry import HEF_REGISTRY
 
 
@@ -47,6 +48,11 @@ def get_args():
         action="store_true", 
         help="Enable multi-process service to run other models in addition to Whisper"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Transcribe the microphone continuously, one utterance at a time"
+    )
     return parser.parse_args()
 
 
@@ -93,6 +99,20 @@ def main():
 
     chunk_length = 10 if variant == "tiny" else 5
 
+    if args.stream:
+        transcriber = StreamingTranscriber(whisper_hailo, chunk_length=chunk_length, is_nhwc=is_nhwc,
+                                           on_transcription=lambda text: print(f"\n{text}"))
+        transcriber.start()
+        print("Streaming transcription started. Press Ctrl+C to stop.")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        transcriber.stop()
+        whisper_hailo.stop()
+        return
+
     while True:
         if args.reuse_audio:
             # Reuse the previous audio file
@@ -121,10 +141,9 @@ def main():
             chunk_offset=chunk_offset
         )
 
-        for mel in mel_spectrograms:
-            whisper_hailo.send_data(mel)
-            time.sleep(0.2)
-            transcription = clean_transcription(whisper_hailo.get_transcription())
+        futures = [whisper_hailo.submit(mel) for mel in mel_spectrograms]
+        for future in futures:
+            transcription = clean_transcription(future.result())
             print(f"\n{transcription}")
 
         if args.reuse_audio:
@@ -81,6 +81,26 @@ unsigned long lastStrobe = 0;
 unsigned long strobeInterval = 100;      // ms
 unsigned long rainbowIndex = 0;
 
+// ===============================================
+// BINARY PROTOCOL (scripts/common/serial_protocol.py)
+// ===============================================
+// Enabled by the "BINARY" command: sensor records are batched into frames
+//   A5 5A | type | length | records | CRC-16/CCITT-FALSE (big-endian)
+// Text lines (scan results, errors) are still printed between frames.
+namespace Protocol {
+  constexpr uint8_t SYNC0 = 0xA5;
+  constexpr uint8_t SYNC1 = 0x5A;
+  constexpr uint8_t FRAME_DEV00 = 0x01;
+  constexpr uint8_t RECORD_SIZE = 13;      // millis u32, laser/us0/us1 i16, servo/speed/button u8
+  constexpr uint8_t BATCH = 4;             // records per frame
+  constexpr unsigned long FLUSH_MS = 100;  // a partial batch is sent after this long
+}
+
+bool binaryMode = false;
+uint8_t frameBuffer[Protocol::BATCH * Protocol::RECORD_SIZE];
+uint8_t frameRecords = 0;
+unsigned long frameStarted = 0;
+
 // ===============================================
 // HARDWARE FUNCTIONS
 // ===============================================
@@ -280,6 +300,48 @@ void updateRainbow() {
   rainbowIndex = (rainbowIndex + 1) & 255;
 }
 
+// ===============================================
+// BINARY FRAMES
+// ===============================================
+uint16_t crc16(const uint8_t* data, uint8_t len, uint16_t crc) {
+  for (uint8_t i = 0; i < len; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (uint8_t bit = 0; bit < 8; bit++) crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+  }
+  return crc;
+}
+
+void putLE(uint8_t*& p, uint32_t value, uint8_t bytes) {
+  for (uint8_t i = 0; i < bytes; i++) { *p++ = value & 0xFF; value >>= 8; }
+}
+
+void sendFrame() {
+  if (frameRecords == 0) return;
+  const uint8_t length = frameRecords * Protocol::RECORD_SIZE;
+  const uint8_t header[4] = {Protocol::SYNC0, Protocol::SYNC1, Protocol::FRAME_DEV00, length};
+  uint16_t crc = crc16(header + 2, 2, 0xFFFF);
+  crc = crc16(frameBuffer, length, crc);
+  Serial.write(header, 4);
+  Serial.write(frameBuffer, length);
+  Serial.write(crc >> 8);
+  Serial.write(crc & 0xFF);
+  frameRecords = 0;
+}
+
+void addRecord(const SensorReadings& r) {
+  if (frameRecords == 0) frameStarted = millis();
+  uint8_t* p = frameBuffer + frameRecords * Protocol::RECORD_SIZE;
+  putLE(p, millis(), 4);
+  putLE(p, (uint16_t)(int16_t)r.laserDistance, 2);
+  putLE(p, (uint16_t)(int16_t)r.ultrasonic0Distance, 2);
+  putLE(p, (uint16_t)(int16_t)r.ultrasonic1Distance, 2);
+  *p++ = robotServo.read();
+  *p++ = robotState.motorSpeed;
+  *p++ = robotState.buttonPressed;
+  frameRecords++;
+  if (frameRecords == Protocol::BATCH || millis() - frameStarted >= Protocol::FLUSH_MS) sendFrame();
+}
+
 // ===============================================
 // SERIAL INPUT
 // ===============================================
@@ -292,6 +354,9 @@ void processSerialCommand(String cmd) {
   else if (cmd == "RIGHT") executeMotorCommand(MotorDirection::RIGHT);
   else if (cmd == "STOP") executeMotorCommand(MotorDirection::STOP);
   else if (cmd.startsWith("SPEED:")) robotState.motorSpeed = constrain(cmd.substring(6).toInt(), 0, 255);
+  else if (cmd == "ID") Serial.println(F("ID:dev00"));  // handshake: which board is on this port
+  else if (cmd == "BINARY") binaryMode = true;
+  else if (cmd == "TEXT") { sendFrame(); binaryMode = false; }
 
  if (cmd == "SCANLEFT") {
     long distance = ScanForObstacles_Left();
@@ -365,8 +430,10 @@ void loop() {
   // --- Serial input ---
   handleSerialInput();
 
-  // --- Print sensor status (non-blocking) ---
-  if (millis() - lastSensorPrint >= sensorPrintInterval) {
+  // --- Send sensor status (non-blocking) ---
+  if (binaryMode) {
+    addRecord(readings);  // every loop, batched
+  } else if (millis() - lastSensorPrint >= sensorPrintInterval) {
     Serial.print(F("LASER:")); Serial.print(readings.laserDistance);
     Serial.print(" ULTRASONIC0:"); Serial.print(readings.ultrasonic0Distance);
     Serial.print(" ULTRASONIC1:"); Serial.println(readings.ultrasonic1Distance);
@@ -16,8 +16,24 @@ const int metalDetectorPin = A0;   // Metal detector sensor
 #define LF_MID  9
 #define LF_RIGHT 10
 
+// --- Binary protocol (scripts/common/serial_protocol.py) ---
+// Enabled by the "BINARY" command: readings are sampled faster and batched into frames
+//   A5 5A | type | length | records | CRC-16/CCITT-FALSE (big-endian)
+// Alerts are still printed as text lines between frames, once when the condition starts.
+#define SYNC0 0xA5
+#define SYNC1 0x5A
+#define FRAME_DEV01 0x02
+#define RECORD_SIZE 13          // millis u32, motion u8, photo/uv/metal u16, ball u8, line bits u8
+#define BATCH 4                 // records per frame
+#define BINARY_PERIOD_MS 50     // sample period in binary mode (text mode: 500 ms)
+
 // --- Variables ---
 bool motionDetected = false;
+bool metalDetected = false;
+bool ballTriggered = false;
+bool binaryMode = false;
+uint8_t frameBuffer[BATCH * RECORD_SIZE];
+uint8_t frameRecords = 0;
 
 // --- Setup ---
 void setup() {
@@ -45,7 +61,9 @@ void loop() {
     String cmd = Serial.readStringUntil('\n');
     cmd.trim();
 
-    if (cmd == "LIGHT_FRONT_ON") {
+    if (handleProtocolCommand(cmd)) {
+      // switched protocol
+    } else if (cmd == "LIGHT_FRONT_ON") {
       TurnOnFrontLights();
       Serial.println("Front lights ON");
     } else if (cmd == "LIGHT_FRONT_OFF") {
@@ -61,6 +79,7 @@ void loop() {
   }
 
   // --- Read sensors ---
+  bool wasMotion = motionDetected;
   motionDetected = digitalRead(MOTION_PIN);
   int photoValue = analogRead(PHOTO_PIN);
   int uvValue = analogRead(UV_PIN);
@@ -70,22 +89,29 @@ void loop() {
   int lfMid = digitalRead(LF_MID);
   int lfRight = digitalRead(LF_RIGHT);
 
-  // --- Print all readings in one line ---
-  Serial.print("MOTION:"); Serial.print(motionDetected);
-  Serial.print(" | PHOTO:"); Serial.print(photoValue);
-  Serial.print(" | UV:"); Serial.print(uvValue);
-  Serial.print(" | METAL:"); Serial.print(metalValue);
-  Serial.print(" | BALL:"); Serial.print(ballState);
-  Serial.print(" | LF[L:"); Serial.print(lfLeft);
-  Serial.print(" M:"); Serial.print(lfMid);
-  Serial.print(" R:"); Serial.print(lfRight);
-  Serial.println("]");
+  // --- Send readings: batched binary record, or all readings in one line ---
+  if (binaryMode) {
+    addRecord(motionDetected, photoValue, uvValue, metalValue, ballState,
+              lfLeft | (lfMid << 1) | (lfRight << 2));
+  } else {
+    Serial.print("MOTION:"); Serial.print(motionDetected);
+    Serial.print(" | PHOTO:"); Serial.print(photoValue);
+    Serial.print(" | UV:"); Serial.print(uvValue);
+    Serial.print(" | METAL:"); Serial.print(metalValue);
+    Serial.print(" | BALL:"); Serial.print(ballState);
+    Serial.print(" | LF[L:"); Serial.print(lfLeft);
+    Serial.print(" M:"); Serial.print(lfMid);
+    Serial.print(" R:"); Serial.print(lfRight);
+    Serial.println("]");
+  }
 
 if (Serial.available() > 0) {
   String cmd = Serial.readStringUntil('\n');
   cmd.trim();
 
-  if (cmd == "LIGHT_FRONT_ON" || cmd == "TURNONFLIGHTS") {
+  if (handleProtocolCommand(cmd)) {
+    // switched protocol
+  } else if (cmd == "LIGHT_FRONT_ON" || cmd == "TURNONFLIGHTS") {
     TurnOnFrontLights();
     Serial.println("Front lights ON");
   } else if (cmd == "LIGHT_FRONT_OFF") {
@@ -100,25 +126,84 @@ if (Serial.available() > 0) {
   }
 }
   // --- Sensor reactions ---
+  // Alerts (and the blocking back light flash) on the rising edge only, not on every sample
   if (motionDetected) {
-    Serial.println("⚠️ Motion detected!");
+    if (!wasMotion) Serial.println("⚠️ Motion detected!");
     TurnOnFrontLights();
   } else {
     TurnOffFrontLights();
   }
 
-  if (metalValue > 350) {
-    Serial.println("⚡ METAL DETECTED!");
-    BlinkBackLights(2, 150); // flash back lights
+  bool metal = metalValue > 350;
+  if (metal) {
+    if (!metalDetected) {
+      Serial.println("⚡ METAL DETECTED!");
+      BlinkBackLights(2, 150); // flash back lights
+    }
   } else {
     TurnOffBackLights();
   }
+  metalDetected = metal;
 
-  if (ballState == HIGH) {
+  bool ball = ballState == HIGH;
+  if (ball && !ballTriggered) {
     Serial.println("Ball switch triggered!");
   }
+  ballTriggered = ball;
+
+  delay(binaryMode ? BINARY_PERIOD_MS : 500); // update rate
+}
+
+// --- Binary protocol functions ---
+bool handleProtocolCommand(const String& cmd) {
+  if (cmd == "ID") {
+    Serial.println("ID:dev01");  // handshake: which board is on this port
+  } else if (cmd == "BINARY") {
+    binaryMode = true;
+  } else if (cmd == "TEXT") {
+    sendFrame();
+    binaryMode = false;
+  } else {
+    return false;
+  }
+  return true;
+}
+
+uint16_t crc16(const uint8_t* data, uint8_t len, uint16_t crc) {
+  for (uint8_t i = 0; i < len; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (uint8_t bit = 0; bit < 8; bit++) crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+  }
+  return crc;
+}
+
+void putLE(uint8_t*& p, uint32_t value, uint8_t bytes) {
+  for (uint8_t i = 0; i < bytes; i++) { *p++ = value & 0xFF; value >>= 8; }
+}
+
+void sendFrame() {
+  if (frameRecords == 0) return;
+  const uint8_t length = frameRecords * RECORD_SIZE;
+  const uint8_t header[4] = {SYNC0, SYNC1, FRAME_DEV01, length};
+  uint16_t crc = crc16(header + 2, 2, 0xFFFF);
+  crc = crc16(frameBuffer, length, crc);
+  Serial.write(header, 4);
+  Serial.write(frameBuffer, length);
+  Serial.write(crc >> 8);
+  Serial.write(crc & 0xFF);
+  frameRecords = 0;
+}
 
-  delay(500); // update rate
+void addRecord(bool motion, int photo, int uv, int metal, int ball, uint8_t lineBits) {
+  uint8_t* p = frameBuffer + frameRecords * RECORD_SIZE;
+  putLE(p, millis(), 4);
+  *p++ = motion;
+  putLE(p, photo, 2);
+  putLE(p, uv, 2);
+  putLE(p, metal, 2);
+  *p++ = ball;
+  *p++ = lineBits;
+  if (++frameRecords == BATCH) sendFrame();
 }
 
 // --- LED control functions ---
@@ -1,13 +1,170 @@
+import glob
+import random
+import re
 import serial
 import time
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import config
 import state
+from common.serial_protocol import FrameDecoder, FRAME_DEV00, FRAME_DEV01, FRAME_DEVICES, LF_LEFT, LF_MID, LF_RIGHT
 
 # -----------------------------
 # Global Arduino connections
 # -----------------------------
 arduinos = {}
+decoders = {}  # dev_name -> FrameDecoder (binary protocol), for link stats
+writers = {}  # dev_name -> CommandWriter
+
+# -----------------------------
+# Non-blocking command writer
+# -----------------------------
+# Commands that set a state on the board: a newer one with the same key makes an older,
+# still queued one pointless ("the latest wins")
+MOTION_COMMANDS = {"FORWARD", "BACKWARD", "LEFT", "RIGHT", "STOP"}
+COMMAND_KEYS = {
+    "RAINBOW": "pattern", "CYCLE": "pattern",
+    "LIGHT_FRONT_ON": "front_light", "LIGHT_FRONT_OFF": "front_light",
+    "LIGHT_BACK_ON": "back_light", "LIGHT_BACK_OFF": "back_light",
+    "KEYBOARDCONTROL": "control", "SELFCONTROL": "control",
+    "BINARY": "protocol", "TEXT": "protocol",
+}
+
+def command_key(command):
+    if command in MOTION_COMMANDS:
+        return "motion"
+    if command.startswith("SPEED:"):
+        return "speed"
+    return COMMAND_KEYS.get(command)  # None: an action (SCANLEFT...), always sent
+
+class CommandWriter:
+    """
+    Serial writer thread for one device.
+
+    send() only queues the command, so a slow port never stalls the caller (the UI loop, a
+    controller). While a write is in progress or rate limited, a state command replaces the
+    queued one with the same key (the latest FORWARD/LEFT/STOP, the latest SPEED:n...), and a
+    state command repeating what was just written is dropped. Everything queued goes out in
+    one write, up to max_batch_bytes (the Arduino receive buffer is 64 bytes).
+    """
+
+    def __init__(self, dev_name, ser, min_interval=0.02, max_batch_bytes=60, repeat_interval=0.5, verbose=False):
+        self.dev_name = dev_name
+        self.ser = ser
+        self.min_interval = min_interval
+        self.max_batch_bytes = max_batch_bytes
+        self.repeat_interval = repeat_interval
+        self.verbose = verbose
+        self.cond = threading.Condition()
+        self.pending = []  # (key, command, queued at), oldest first
+        self.last_sent = {}  # key -> (command, written at)
+        self.last_write = 0.0
+        self.running = True
+        self.submitted = self.written = self.coalesced = self.writes = self.errors = 0
+        self.max_depth = 0
+        self.latencies_ms = deque(maxlen=1000)  # queued -> written
+        self.write_ms = 0.0
+        self.thread = threading.Thread(target=self._run, name=f"{dev_name}-writer", daemon=True)
+        self.thread.start()
+
+    def send(self, command):
+        """Queue a command; returns False if it was dropped as redundant."""
+        key = command_key(command)
+        now = time.monotonic()
+        with self.cond:
+            self.submitted += 1
+            if key is not None:
+                for i, (queued_key, _, _) in enumerate(self.pending):
+                    if queued_key == key:
+                        del self.pending[i]
+                        self.coalesced += 1
+                        break
+                last = self.last_sent.get(key)
+                if last and last[0] == command and now - last[1] < self.repeat_interval:
+                    self.coalesced += 1
+                    return False
+            self.pending.append((key, command, now))
+            self.max_depth = max(self.max_depth, len(self.pending))
+            self.cond.notify()
+        return True
+
+    def close(self, timeout=1.0):
+        """Write what is still queued, then stop the thread."""
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.thread.join(timeout)
+
+    def _next_batch(self):
+        with self.cond:
+            while self.running and not self.pending:
+                self.cond.wait()
+            # Rate limit; commands arriving meanwhile are coalesced into this batch
+            while self.running:
+                delay = self.last_write + self.min_interval - time.monotonic()
+                if delay <= 0:
+                    break
+                self.cond.wait(delay)
+            batch, size = [], 0
+            while self.pending and (not batch or size + len(self.pending[0][1]) + 1 <= self.max_batch_bytes):
+                batch.append(self.pending.pop(0))
+                size += len(batch[-1][1]) + 1
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return  # closed and flushed
+            data = "".join(command + "\n" for _, command, _ in batch).encode("utf-8")
+            start = time.monotonic()
+            try:
+                self.ser.write(data)
+                ok = True
+            except Exception as e:
+                ok = False
+                print(f"⚠️ Failed to send {[c for _, c, _ in batch]} to {self.dev_name}: {e}")
+            done = time.monotonic()
+            with self.cond:
+                self.last_write = done
+                self.writes += 1
+                self.write_ms += (done - start) * 1000
+                if ok:
+                    self.written += len(batch)
+                    for key, command, queued in batch:
+                        self.latencies_ms.append((done - queued) * 1000)
+                        if key is not None:
+                            self.last_sent[key] = (command, done)
+                else:
+                    self.errors += 1
+            if ok and self.verbose:
+                print(f"➡️ Sent to {self.dev_name}: {', '.join(c for _, c, _ in batch)}")
+
+    def stats(self):
+        with self.cond:
+            latencies = sorted(self.latencies_ms)
+            return {
+                "depth": len(self.pending),
+                "max_depth": self.max_depth,
+                "submitted": self.submitted,
+                "written": self.written,
+                "coalesced": self.coalesced,
+                "writes": self.writes,
+                "errors": self.errors,
+                "commands_per_write": self.written / self.writes if self.writes else 0.0,
+                "mean_write_ms": self.write_ms / self.writes if self.writes else 0.0,
+                "p50_latency_ms": latencies[len(latencies) // 2] if latencies else 0.0,
+                "p95_latency_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0,
+            }
+
+    def report(self):
+        s = self.stats()
+        return (f"📤 {self.dev_name}: {s['written']}/{s['submitted']} commands written "
+                f"({s['coalesced']} coalesced, {s['errors']} failed writes) in {s['writes']} writes "
+                f"({s['commands_per_write']:.1f}/write, {s['mean_write_ms']:.2f} ms each) | "
+                f"queue {s['depth']} (max {s['max_depth']}) | latency p50 {s['p50_latency_ms']:.2f} ms, "
+                f"p95 {s['p95_latency_ms']:.2f} ms")
 
 # -----------------------------
 # Connect to Arduino
@@ -16,44 +173,43 @@ def connect_arduino(dev_name, port, baud):
     try:
         ser = serial.Serial(port, baud, timeout=1)
         time.sleep(2)  # Allow Arduino to reset
+        if config.ARDUINO_PROTOCOL == "binary":
+            ser.write(b"BINARY\n")  # sketches without binary mode ignore it and keep sending text
         arduinos[dev_name] = ser
+        writers[dev_name] = CommandWriter(dev_name, ser, min_interval=config.ARDUINO_COMMAND_INTERVAL,
+                                          verbose=config.ARDUINO_LOG_COMMANDS)
         print(f"✅ Connected {dev_name} on {port}")
         return ser
     except serial.SerialException as e:
         print(f"❌ Could not connect {dev_name} on {port}: {e}")
         return None
 
+# -----------------------------
+# Text protocol keys -> state.sensors fields
+# -----------------------------
+READING = re.compile(r"([A-Z][A-Z0-9]*):\s*(-?\d+)")
+DEV01_KEYS = {"MOTION": "motion", "PHOTO": "photo", "UV": "uv", "METAL": "metal", "BALL": "ball",
+              "L": "lf_left", "M": "lf_mid", "R": "lf_right"}
+DEV00_KEYS = {"LASER": "laser", "ULTRASONIC0": "ultrasonic0", "ULTRASONIC1": "ultrasonic1",
+              "SERVO": "servo", "BUTTON": "button", "SPEED": "speed"}
+
+def parse_readings(line, keys):
+    """Readings of a text line: "LASER:412 ULTRASONIC0:35" -> {"laser": 412, "ultrasonic0": 35}."""
+    return {keys[key]: int(value) for key, value in READING.findall(line) if key in keys}
+
 # -----------------------------
 # Update dev01 sensors
 # -----------------------------
 def update_state_dev01(line, dev_name="dev01"):
     line = line.strip()
     if line.startswith("MOTION:"):
-        try:
-            parts = [p.strip() for p in line.split("|")]
-            for part in parts:
-                if part.startswith("MOTION:"):
-                    state.motionValue = f"MOTION: {part.split(':')[1]}"
-                elif part.startswith("PHOTO:"):
-                    state.photoValue = f"PHOTO: {part.split(':')[1]}"
-                elif part.startswith("UV:"):
-                    state.uvValue = f"UV: {part.split(':')[1]}"
-                elif part.startswith("METAL:"):
-                    state.metalValue = f"METAL: {part.split(':')[1]}"
-                elif part.startswith("BALL:"):
-                    state.ballSwitchValue = f"BALL: {part.split(':')[1]}"
-                elif part.startswith("LF["):
-                    inside = part.split("[", 1)[1].rstrip("]")
-                    vals = {kv.split(":")[0]: kv.split(":")[1] for kv in inside.split()}
-                    state.lfLeftValue = f"LF_LEFT: {vals.get('L', 'N/A')}"
-                    state.lfMidValue = f"LF_MID: {vals.get('M', 'N/A')}"
-                    state.lfRightValue = f"LF_RIGHT: {vals.get('R', 'N/A')}"
-            print(f"📊 {dev_name} updated sensors: "
-                  f"{state.motionValue}, {state.photoValue}, {state.uvValue}, "
-                  f"{state.metalValue}, {state.ballSwitchValue}, "
-                  f"{state.lfLeftValue}/{state.lfMidValue}/{state.lfRightValue}")
-        except Exception as e:
-            print(f"⚠️ {dev_name} parse error: {e} | line={line}")
+        # "MOTION:0 | PHOTO:512 | UV:120 | METAL:200 | BALL:0 | LF[L:0 M:1 R:0]"
+        readings = parse_readings(line, DEV01_KEYS)
+        if readings:
+            state.sensors.update(**readings)
+            print(f"📊 {dev_name} updated sensors: {', '.join(state.sensors.display(readings))}")
+        else:
+            print(f"⚠️ {dev_name} parse error | line={line}")
     elif "Motion detected" in line:
         state.systemStatus = "⚠️ Motion detected!"
         print(f"👀 {dev_name} ALERT: {line}")
@@ -71,7 +227,7 @@ def update_state_dev01(line, dev_name="dev01"):
 # -----------------------------
 def update_state_dev00(line, dev_name="dev00"):
     line = line.strip()
-    if line.startswith("LASER:") or line.startswith("ULTRASONIC:") \
+    if line.startswith("LASER:") or line.startswith("ULTRASONIC") \
         or line.startswith("SERVO:") or line.startswith("BUTTON:") \
         or line.startswith("SPEED:"):
         update_state(line, dev_name)
@@ -81,82 +237,369 @@ def update_state_dev00(line, dev_name="dev00"):
 # -----------------------------
 # Generic single-line state updater
 # -----------------------------
+def update_state(line, dev_name="dev0"):
+    # "LASER:412 ULTRASONIC0:35 ULTRASONIC1:80", or a single "KEY:value"
+    readings = parse_readings(line, DEV00_KEYS)
+    if readings:
+        state.sensors.update(**readings)
+    else:
+        print(f"⚠️ {dev_name} failed to parse line: {line.strip()}")
+
 # -----------------------------
-# Generic single-line state updater
+# Update state from a binary frame
 # -----------------------------
-def update_state(line, dev_name="dev0"):
-    line = line.strip()
-    try:
-        if line.startswith("LASER:"):
-            val_str = line.split(":", 1)[1]
-            state.laserValue = f"LASER: {val_str.strip()}"
-        elif line.startswith("ULTRASONIC0:"):
-            val_str = line.split(":", 1)[1]
-            state.ultrasonic0Value = f"ULTRASONIC0: {val_str.strip()}"
-        elif line.startswith("ULTRASONIC1:"):
-            val_str = line.split(":", 1)[1]
-            state.ultrasonic1Value = f"ULTRASONIC1: {val_str.strip()}"
-        elif line.startswith("SERVO:"):
-            val_str = line.split(":", 1)[1]
-            state.servoPosValue = f"SERVO: {val_str.strip()}"
-        elif line.startswith("BUTTON:"):
-            val_str = line.split(":", 1)[1]
-            state.buttonValue = f"BUTTON: {val_str.strip()}"
-        elif line.startswith("SPEED:"):
-            val_str = line.split(":", 1)[1]
-            state.motorSpeedValue = f"SPEED: {val_str.strip()}"
-    except Exception as e:
-        print(f"⚠️ {dev_name} failed to parse line: {line} | {e}")
+def update_state_frame(frame, dev_name):
+    # Batched frames carry several samples; the state keeps the newest, the history gets them all
+    if len(frame) > 1:
+        record_history(frame)
+    record = frame.latest()
+    if frame.type == FRAME_DEV00:
+        _, laser, us0, us1, servo, speed, button = record
+        state.sensors.update(laser=laser, ultrasonic0=us0, ultrasonic1=us1, servo=servo, speed=speed, button=button)
+    elif frame.type == FRAME_DEV01:
+        _, motion, photo, uv, metal, ball, line = record
+        state.sensors.update(motion=motion, photo=photo, uv=uv, metal=metal, ball=ball,
+                             lf_left=int(bool(line & LF_LEFT)), lf_mid=int(bool(line & LF_MID)),
+                             lf_right=int(bool(line & LF_RIGHT)))
+
+def record_history(frame):
+    """Append the older records of a batched frame to state.history, timed from their millis."""
+    records = frame.array()
+    older = records[:-1]
+    # Arrival time of the newest record, minus how much earlier the board took the others
+    times = time.monotonic() - ((int(records["millis"][-1]) - older["millis"].astype("i8")) & 0xFFFFFFFF) / 1000
+    if frame.type == FRAME_DEV00:
+        readings = {name: older[name] for name in ("laser", "ultrasonic0", "ultrasonic1", "servo", "speed", "button")}
+    else:
+        line = older["line"]
+        readings = {name: older[name] for name in ("motion", "photo", "uv", "metal", "ball")}
+        readings.update(lf_left=(line & LF_LEFT) != 0, lf_mid=(line & LF_MID) != 0, lf_right=(line & LF_RIGHT) != 0)
+    state.history.extend(times, readings)
+
+def handle_line(dev_name, line):
+    if line.startswith("ID:"):
+        return  # late reply to the DeviceManager handshake
+    if dev_name == "dev01":
+        update_state_dev01(line, dev_name)
+    elif dev_name == "dev00":
+        update_state_dev00(line, dev_name)
+    else:
+        update_state(line, dev_name)
 
 # -----------------------------
 # Arduino reading thread
 # -----------------------------
-def read_from_arduino(dev_name):
+def read_from_arduino(dev_name, link=None):
+    """
+    Read and parse until the port fails or is closed (returns: the link is lost).
+    link: DeviceLink counting bytes and errors, when run by the DeviceManager.
+    """
     ser = arduinos.get(dev_name)
     if not ser:
         print(f"❌ {dev_name} not connected")
         return
+    if config.ARDUINO_PROTOCOL == "binary":
+        read_frames(dev_name, ser, link)
+        return
     while True:
         try:
-            line = ser.readline().decode("utf-8").strip()
+            raw = ser.readline()
+            if link is not None:
+                link.bytes_read += len(raw)
+            line = raw.decode("utf-8").strip()
             if line:
-                if dev_name == "dev01":
-                    update_state_dev01(line, dev_name)
-                elif dev_name == "dev00":
-                    update_state_dev00(line, dev_name)
+                handle_line(dev_name, line)
+        except Exception as e:
+            if link_lost(dev_name, ser, e):
+                return
+            if link is not None:
+                link.errors += 1
+            print(f"⚠️ Error reading from {dev_name}: {e}")
+            time.sleep(0.5)
+
+def read_frames(dev_name, ser, link=None):
+    """Binary frames and text lines from the same port (text covers alerts and old sketches)."""
+    decoder = decoders[dev_name] = FrameDecoder()
+    while True:
+        try:
+            data = ser.read(ser.in_waiting or 1)
+            if link is not None:
+                link.bytes_read += len(data)
+            for item in decoder.feed(data):
+                if isinstance(item, str):
+                    handle_line(dev_name, item)
                 else:
-                    update_state(line, dev_name)
+                    update_state_frame(item, dev_name)
         except Exception as e:
+            if link_lost(dev_name, ser, e):
+                return
+            if link is not None:
+                link.errors += 1
             print(f"⚠️ Error reading from {dev_name}: {e}")
             time.sleep(0.5)
 
+def link_lost(dev_name, ser, error):
+    """True if a read error means the port is gone (unplugged, closed) rather than bad data."""
+    if not ser.is_open:
+        return True  # closed on purpose
+    if isinstance(error, (serial.SerialException, OSError)):
+        print(f"❌ {dev_name} link lost: {error}")
+        return True
+    return False
+
+# -----------------------------
+# Device manager: discovery, handshake, reconnect
+# -----------------------------
+# Lines that tell which sketch is talking: the reply to "ID", boot banners, sensor lines
+SIGNATURES = (
+    ("ID:", None),
+    ("=== Robot Startup", "dev00"), ("VL53L0X", "dev00"), ("LASER:", "dev00"), ("ULTRASONIC", "dev00"),
+    ("=== Multi-Sensor", "dev01"), ("MOTION:", "dev01"), ("Front lights", "dev01"), ("Back lights", "dev01"),
+)
+
+def identify(item):
+    """Device name from a decoded Frame or text line, None if it does not tell."""
+    if not isinstance(item, str):
+        return FRAME_DEVICES.get(item.type)
+    for prefix, dev_name in SIGNATURES:
+        if item.startswith(prefix):
+            return dev_name or item[len(prefix):].strip()
+    return None
+
+def probe_port(port, baud, timeout=4.0):
+    """
+    Open a port and find out which board is on it: sends "ID" every 0.5 s (the board may still
+    be rebooting from the port being opened) until the reply or any identifying output.
+    :return: (dev_name, open Serial) or (None, None).
+    """
+    try:
+        ser = serial.Serial(port, baud, timeout=0.05)
+    except (serial.SerialException, OSError):
+        return None, None
+    decoder = FrameDecoder()
+    deadline = time.monotonic() + timeout
+    next_id = 0.0
+    try:
+        while time.monotonic() < deadline:
+            if time.monotonic() >= next_id:
+                ser.write(b"ID\n")
+                next_id = time.monotonic() + 0.5
+            for item in decoder.feed(ser.read(ser.in_waiting or 1)):
+                dev_name = identify(item)
+                if dev_name:
+                    return dev_name, ser
+    except (serial.SerialException, OSError):
+        pass
+    ser.close()
+    return None, None
+
+class DeviceLink:
+    """Connection state and counters of one board."""
+
+    def __init__(self, dev_name):
+        self.dev_name = dev_name
+        self.port = None
+        self.connected_since = None  # time.monotonic() of the current connection
+        self.uptime = 0.0  # seconds connected in previous connections
+        self.started = time.monotonic()
+        self.connects = 0
+        self.disconnects = 0
+        self.errors = 0
+        self.bytes_read = 0
+        self.last_error = None
+
+    @property
+    def connected(self):
+        return self.connected_since is not None
+
+    def mark_up(self, port):
+        self.port = port
+        self.connected_since = time.monotonic()
+        self.connects += 1
+
+    def mark_down(self, error=None):
+        if self.connected_since is not None:
+            self.uptime += time.monotonic() - self.connected_since
+            self.connected_since = None
+            self.disconnects += 1
+        self.last_error = error
+
+    def stats(self):
+        now = time.monotonic()
+        uptime = self.uptime + (now - self.connected_since if self.connected_since else 0.0)
+        decoder = decoders.get(self.dev_name)
+        crc_errors = decoder.crc_errors if decoder is not None else 0
+        return {
+            "port": self.port,
+            "connected": self.connected,
+            "uptime_s": uptime,
+            "availability": uptime / max(now - self.started, 1e-9),
+            "connects": self.connects,
+            "reconnects": max(0, self.connects - 1),
+            "errors": self.errors + crc_errors,
+            "errors_per_min": (self.errors + crc_errors) / (uptime / 60) if uptime > 1 else 0.0,
+            "bytes_read": self.bytes_read,
+        }
+
+class DeviceManager:
+    """
+    Finds the boards and keeps them connected.
+
+    All candidate ports are probed in parallel and each board is recognized by its handshake
+    (see probe_port), so port numbering does not matter and boot waits for the slowest board
+    once instead of 2 s per port. When a link drops, a supervisor thread probes again, with
+    exponential backoff, until the board is back (re-plugged on the same or another port).
+    Ports that gave no handshake or a board we do not manage are not probed again until the
+    list of ports changes.
+
+    Parameters:
+    - devices: Boards to keep connected.
+    - ports: Ports to probe (None: config.ARDUINO_PORT_PATTERNS, e.g. all /dev/ttyUSB*).
+    - baud: Serial speed.
+    - probe_timeout: Seconds to wait for a board to identify itself.
+    - backoff: (first, max) delay between reconnect attempts, in seconds.
+    """
+
+    def __init__(self, devices=("dev00", "dev01"), ports=None, baud=None, probe_timeout=4.0, backoff=(0.5, 10.0)):
+        self.devices = tuple(devices)
+        self.ports = ports
+        self.baud = baud or config.ARDUINO_BAUD
+        self.probe_timeout = probe_timeout
+        self.backoff = backoff
+        self.links = {dev_name: DeviceLink(dev_name) for dev_name in self.devices}
+        self.lock = threading.Lock()
+        self.changed = threading.Event()
+        self.stopping = threading.Event()
+        self.supervisor = None
+        self.seen_ports = None  # port list the skipped ports belong to
+        self.skipped = set()  # ports without a board we manage
+
+    def candidate_ports(self):
+        if self.ports is not None:
+            ports = list(self.ports)
+        else:
+            ports = sorted({path for pattern in config.ARDUINO_PORT_PATTERNS for path in glob.glob(pattern)})
+        with self.lock:
+            if ports != self.seen_ports:
+                self.seen_ports = ports
+                self.skipped.clear()  # something was plugged or unplugged: probe everything again
+            in_use = {link.port for link in self.links.values() if link.connected}
+            return [port for port in ports if port not in in_use and port not in self.skipped]
+
+    def discover(self):
+        """Probe the free ports in parallel and attach the missing boards found; returns their names."""
+        with self.lock:
+            missing = {dev_name for dev_name, link in self.links.items() if not link.connected}
+        ports = self.candidate_ports()
+        if not missing or not ports:
+            return []
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=len(ports)) as pool:
+            results = list(zip(ports, pool.map(lambda port: probe_port(port, self.baud, self.probe_timeout), ports)))
+        found = []
+        for port, (dev_name, ser) in results:
+            if dev_name not in self.links:
+                with self.lock:
+                    self.skipped.add(port)  # no handshake, or a board we do not manage
+            if ser is None:
+                continue
+            if dev_name in missing:
+                missing.discard(dev_name)
+                self._attach(dev_name, port, ser)
+                found.append(dev_name)
+            else:
+                ser.close()  # a board we do not manage, or a duplicate
+        if found:
+            print(f"🔍 Found {', '.join(found)} in {time.monotonic() - start:.1f}s ({len(ports)} ports probed)")
+        return found
+
+    def _attach(self, dev_name, port, ser):
+        old = writers.get(dev_name)
+        if old is not None:
+            old.close(timeout=None)  # its port is closed: pending writes fail at once, then it exits
+        arduinos[dev_name] = ser
+        writers[dev_name] = CommandWriter(dev_name, ser, min_interval=config.ARDUINO_COMMAND_INTERVAL,
+                                          verbose=config.ARDUINO_LOG_COMMANDS)
+        if config.ARDUINO_PROTOCOL == "binary":
+            writers[dev_name].send("BINARY")
+        link = self.links[dev_name]
+        with self.lock:
+            link.mark_up(port)
+        print(f"✅ Connected {dev_name} on {port}")
+        threading.Thread(target=self._read, args=(dev_name, ser), name=f"{dev_name}-reader", daemon=True).start()
+
+    def _read(self, dev_name, ser):
+        link = self.links[dev_name]
+        read_from_arduino(dev_name, link)
+        try:
+            ser.close()
+        except Exception:
+            pass
+        with self.lock:
+            link.mark_down("link lost")
+        self.changed.set()  # wake the supervisor
+
+    def start(self):
+        """Connect what can be found now, then keep reconnecting in the background."""
+        self.discover()
+        for dev_name, link in self.links.items():
+            if not link.connected:
+                print(f"❌ {dev_name} not found, will keep looking")
+        self.supervisor = threading.Thread(target=self._supervise, name="arduino-supervisor", daemon=True)
+        self.supervisor.start()
+        return self
+
+    def _supervise(self):
+        attempt = 0
+        while not self.stopping.is_set():
+            with self.lock:
+                missing = [dev_name for dev_name, link in self.links.items() if not link.connected]
+            if not missing:
+                attempt = 0
+                self.changed.wait()
+                self.changed.clear()
+                continue
+            delay = min(self.backoff[1], self.backoff[0] * 2 ** attempt) * random.uniform(0.5, 1.0)
+            if self.stopping.wait(delay):
+                return
+            attempt = 0 if self.discover() else attempt + 1
+
+    def stop(self):
+        self.stopping.set()
+        self.changed.set()
+        close_all_arduinos()
+
+    def stats(self):
+        with self.lock:
+            return {dev_name: link.stats() for dev_name, link in self.links.items()}
+
+    def report(self):
+        lines = []
+        for dev_name, s in self.stats().items():
+            status = f"on {s['port']}" if s["connected"] else "DISCONNECTED"
+            lines.append(f"🔌 {dev_name} {status}: up {s['uptime_s']:.0f}s ({s['availability']:.1%}), "
+                         f"{s['reconnects']} reconnects, {s['errors']} errors ({s['errors_per_min']:.2f}/min), "
+                         f"{s['bytes_read']} bytes read")
+        return "\n".join(lines)
+
+manager = None  # DeviceManager started by start_arduino_threads()
+
 # -----------------------------
 # Start all Arduino threads
 # -----------------------------
 def start_arduino_threads():
-    ports = {
-        "dev00": "/dev/ttyUSB0",  # Update with correct port
-        "dev01": "/dev/ttyUSB1",  # Update with correct port
-    }
-    for dev_name, port in ports.items():
-        ser = connect_arduino(dev_name, port, config.ARDUINO_BAUD)
-        if ser:
-            t = threading.Thread(target=read_from_arduino, args=(dev_name,), daemon=True)
-            t.start()
-            print(f"🔄 Started thread for {dev_name}")
+    global manager
+    manager = DeviceManager().start()
+    return manager
 
 def send_command(dev_name, command):
     """
-    Send a string command to an Arduino device.
+    Queue a string command for an Arduino device; returns immediately (see CommandWriter).
     Example: send_command("dev00", "FORWARD")
     """
-    ser = arduinos.get(dev_name)
-    if ser and ser.is_open:
-        try:
-            ser.write((command + "\n").encode('utf-8'))
-            print(f"➡️ Sent to {dev_name}: {command}")
-        except Exception as e:
-            print(f"⚠️ Failed to send command to {dev_name}: {e}")
+    writer = writers.get(dev_name)
+    if writer is not None and writer.ser.is_open:
+        writer.send(command)
     else:
         print(f"❌ {dev_name} not connected or closed")
 
@@ -165,7 +608,12 @@ def send_command(dev_name, command):
 # Close all connections
 # -----------------------------
 def close_all_arduinos():
-    for dev_name, ser in arduinos.items():
+    for dev_name, writer in list(writers.items()):
+        writer.close()
+        print(writer.report())
+    if manager is not None:
+        print(manager.report())
+    for dev_name, ser in list(arduinos.items()):
         try:
             ser.close()
             print(f"🔒 Closed connection to {dev_name}")
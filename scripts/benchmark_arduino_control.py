@@ -0,0 +1,130 @@
+"""
+Arduino control stack without the robot: parser throughput and obstacle reaction latency.
+
+1. Parser throughput: sensor lines of both sketches through arduino.handle_line (the text
+   protocol), and binary frames through FrameDecoder + update_state_frame, in lines / records
+   per second.
+2. Reaction latency: both boards run as VirtualArduino on ptys (9600 baud emulated) with an
+   ObstacleScenario, connected through arduino.connect_arduino and driven by the
+   ObstacleAvoidance controller on the filtered distances (sensor_filters). Measured on the board side, from the sample in which an
+   obstacle comes closer than SAFE_LASER_DISTANCE to the arrival of the turn / stop command, so
+   serial transmission both ways is included.
+"""
+
+import argparse
+import contextlib
+import os
+import threading
+import time
+import numpy as np
+import arduino
+import config
+import state
+import ObstacleAvoidance
+import sensor_filters
+from common.serial_protocol import FRAME_DEV00, FRAME_DEV01, FrameDecoder, SensorSimulator, format_text
+from virtual_arduino import ObstacleScenario, VirtualArduino
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Arduino parser / control loop benchmark")
+    parser.add_argument("--lines", type=int, default=20000, help="Lines per device for the parser benchmark")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of obstacle avoidance")
+    parser.add_argument("--protocol", choices=["text", "binary"], default=config.ARDUINO_PROTOCOL)
+    parser.add_argument("--period-ms", type=float, default=50, help="Virtual board sample period")
+    parser.add_argument("--batch", type=int, default=1, help="Records per binary frame on the virtual boards")
+    parser.add_argument("--speed", type=int, default=200, help="Motor speed (SPEED:n)")
+    return parser.parse_args()
+
+
+def parser_throughput(count):
+    """:return: [(device, text lines/s, binary records/s)]"""
+    rates = []
+    for device, frame_type in (("dev00", FRAME_DEV00), ("dev01", FRAME_DEV01)):
+        simulator = SensorSimulator(device)
+        records = [simulator.sample() for _ in range(count)]
+        lines = [format_text(frame_type, r).split("\r\n")[0] for r in records]
+        start = time.perf_counter()
+        for line in lines:
+            arduino.handle_line(device, line)
+        text_rate = count / (time.perf_counter() - start)
+
+        data, _ = SensorSimulator(device).stream(count, binary=True, batch=1)
+        decoder = FrameDecoder()
+        start = time.perf_counter()
+        for item in decoder.feed(data):
+            if not isinstance(item, str):
+                arduino.update_state_frame(item, device)
+        binary_rate = decoder.records / (time.perf_counter() - start)
+        rates.append((device, text_rate, binary_rate))
+    return rates
+
+
+def reaction_latency(args):
+    scenario = ObstacleScenario(alert_mm=ObstacleAvoidance.SAFE_LASER_DISTANCE)
+    boards = {device: VirtualArduino(device, scenario, period_ms=args.period_ms, batch=args.batch).start()
+              for device in ("dev00", "dev01")}
+    config.ARDUINO_PROTOCOL = args.protocol
+    for device, board in boards.items():
+        arduino.connect_arduino(device, board.port, config.ARDUINO_BAUD)
+        threading.Thread(target=arduino.read_from_arduino, args=(device,), daemon=True).start()
+
+    stop = threading.Event()
+    sensor_filters.start()
+
+    def control_loop():
+        snapshot = state.filtered.snapshot()
+        while not stop.is_set():
+            update = state.filtered.wait(snapshot, ObstacleAvoidance.DISTANCE_SENSORS, timeout=0.5)
+            if update is not None:
+                snapshot = update
+                ObstacleAvoidance.obstacle_avoidance_step(snapshot)
+
+    controller = threading.Thread(target=control_loop, daemon=True)
+    arduino.send_command("dev00", f"SPEED:{args.speed}")
+    controller.start()
+    time.sleep(args.duration)
+    stop.set()
+    controller.join(1)
+    arduino.send_command("dev00", "STOP")
+
+    dev00 = boards["dev00"]
+    latencies = []
+    for alert in scenario.alerts:
+        reaction = dev00.wait_for_command(lambda c: c in ("LEFT", "RIGHT", "STOP", "BACKWARD"), after=alert, timeout=0)
+        if reaction is not None:
+            latencies.append((reaction[0] - alert) * 1000)
+    arduino.close_all_arduinos()
+    for board in boards.values():
+        board.stop()
+    return scenario, dev00, np.array(latencies)
+
+
+def main():
+    args = get_args()
+    # The parsers and the controller print every update: keep them out of the measurement
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        rates = parser_throughput(args.lines)
+        scenario, dev00, latencies = reaction_latency(args)
+        reactions = state.reactions.report()
+        writer_report = arduino.writers["dev00"].report()
+        decoder = arduino.decoders.get("dev00")
+
+    print("Parser throughput:")
+    for device, text_rate, binary_rate in rates:
+        print(f"  {device}: text {text_rate:9.0f} lines/s | binary {binary_rate:9.0f} records/s")
+    print(f"Obstacle avoidance, {args.protocol} protocol, {args.period_ms:.0f} ms samples, {args.duration:.0f} s:")
+    print(f"  {dev00.samples_sent} samples, {len(dev00.commands)} commands received by dev00, "
+          f"{len(scenario.alerts)} obstacles within {scenario.alert_mm} mm, {scenario.collisions} collisions")
+    if len(latencies):
+        print(f"  Reaction (board to board): p50 {np.percentile(latencies, 50):.1f} ms | "
+              f"p95 {np.percentile(latencies, 95):.1f} ms | max {latencies.max():.1f} ms | "
+              f"{len(latencies)}/{len(scenario.alerts)} reacted")
+    print("  " + reactions)
+    print("  " + writer_report)
+    if decoder is not None:
+        print(f"  dev00 decoder: {decoder.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Report tokens/sec of each decoding strategy.
+
+Without --hardware, the Hailo decoder is replaced by a host-side model that fills the output
+buffers with random logits after a configurable delay, so the host cost of each strategy can be
+measured on any machine. With --hardware, the real pipeline is run on an audio file.
+"""
+
+import argparse
+import time
+import numpy as np
+from common.decoding import make_strategy
+from whisper_decoder import WhisperDecoder
+
+
+VOCAB_SIZE = 51865
+EMBEDDING_DIM = 384
+EOS_TOKEN_ID = 50257
+
+STRATEGIES = [
+    ("greedy", {}),
+    ("sampling", {"temperature": 0.7, "top_k": 50, "top_p": 0.9, "seed": 0}),
+    ("beam", {"width": 2}),
+    ("beam", {"width": 3}),
+    ("beam", {"width": 4}),
+]
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Decoding strategy benchmark")
+    parser.add_argument("--sequence-length", type=int, default=32, help="32 for tiny, 24 for base")
+    parser.add_argument("--decoder-ms", type=float, default=0.0, help="Simulated decoder latency per run")
+    parser.add_argument("--chunks", type=int, default=5, help="Chunks decoded per strategy")
+    parser.add_argument("--hardware", action="store_true", help="Run the Hailo pipeline instead")
+    parser.add_argument("--audio", type=str, default="sampled_audio.wav")
+    parser.add_argument("--hw-arch", type=str, default="hailo8", choices=["hailo8", "hailo8l"])
+    parser.add_argument("--variant", type=str, default="base", choices=["base", "tiny"])
+    return parser.parse_args()
+
+
+class _Buffer:
+    def __init__(self):
+        self.buffer = None
+
+    def set_buffer(self, buffer):
+        self.buffer = buffer
+
+    def get_buffer(self):
+        return self.buffer
+
+
+class SimulatedDecoderModel:
+    """Stands in for the configured Hailo decoder: bindings, output shapes and run()."""
+
+    def __init__(self, sequence_length, decoder_ms, output_names=("out0", "out1")):
+        self.sequence_length = sequence_length
+        self.decoder_ms = decoder_ms
+        self.output_names = list(output_names)
+        self.inputs = {}
+        self.outputs = {}
+        self.rng = np.random.default_rng(0)
+        self.pool = None
+        self.runs = 0
+
+    # InferModel / bindings interface
+    def input(self, name):
+        return self.inputs.setdefault(name, _Buffer())
+
+    def output(self, name):
+        if name not in self.outputs:
+            self.outputs[name] = _Buffer()
+            self.outputs[name].shape = (1, self.sequence_length, VOCAB_SIZE // len(self.output_names) + 1)
+        return self.outputs[name]
+
+    # ConfiguredInferModel interface
+    def run(self, bindings, timeout_ms):
+        if self.decoder_ms:
+            time.sleep(self.decoder_ms / 1000)
+        if self.pool is None:
+            # A few precomputed outputs, so generating random numbers does not dominate the timing
+            self.pool = [
+                [self.rng.standard_normal(o.buffer.shape, dtype=np.float32) for o in self.outputs.values()]
+                for _ in range(4)
+            ]
+            # Make end-of-transcript likely after ~20 tokens so runs have realistic lengths
+            for outputs in self.pool:
+                outputs[-1][:, 20:, EOS_TOKEN_ID - (VOCAB_SIZE // 2 + 1)] = 10.0
+        self.runs += 1
+        for output, values in zip(self.outputs.values(), self.pool[self.runs % len(self.pool)]):
+            np.copyto(output.buffer, values)
+
+
+def bench_simulated(args):
+    rng = np.random.default_rng(0)
+    embedding = rng.standard_normal((VOCAB_SIZE + 1, EMBEDDING_DIM), dtype=np.float32)
+    add_input = rng.standard_normal((args.sequence_length, EMBEDDING_DIM), dtype=np.float32)
+
+    for name, options in STRATEGIES:
+        model = SimulatedDecoderModel(args.sequence_length, args.decoder_ms)
+        decoder = WhisperDecoder(model, model, model, "decoder", model.output_names, embedding, add_input,
+                                 args.sequence_length, EOS_TOKEN_ID, strategy=make_strategy(name, **options))
+        tokens, seconds = 0, 0.0
+        for _ in range(args.chunks):
+            generated = decoder.decode(np.zeros(1, dtype=np.float32))
+            tokens += len(generated)
+            seconds += sum(decoder.token_times)
+        label = name + (f"-{options['width']}" if name == "beam" else "")
+        print(f"{label:>10}: {tokens / seconds:8.1f} tokens/s ({tokens} tokens)")
+
+
+def bench_hardware(args):
+    from hailo_whisper_pipeline import HailoWhisperPipeline
+    from common.audio_utils import load_audio
+    from common.preprocessing import preprocess
+    from whisper_hef_registry import HEF_REGISTRY
+
+    chunk_length = 10 if args.variant == "tiny" else 5
+    mel = preprocess(load_audio(args.audio), is_nhwc=True, chunk_length=chunk_length)[0]
+    for name, options in STRATEGIES:
+        pipeline = HailoWhisperPipeline(HEF_REGISTRY[args.variant][args.hw_arch]["encoder"],
+                                        HEF_REGISTRY[args.variant][args.hw_arch]["decoder"],
+                                        args.variant, decoding_strategy=name, strategy_options=options)
+        times = []
+        try:
+            for _ in range(args.chunks):
+                pipeline.send_data(mel)
+                text = pipeline.get_transcription()
+                times.extend(pipeline.get_token_timings())
+        finally:
+            pipeline.stop()
+        label = name + (f"-{options['width']}" if name == "beam" else "")
+        print(f"{label:>10}: {len(times) / (sum(times) / 1000):8.1f} tokens/s | {text}")
+
+
+if __name__ == "__main__":
+    args = get_args()
+    if args.hardware:
+        bench_hardware(args)
+    else:
+        bench_simulated(args)
@@ -0,0 +1,78 @@
+"""
+Request latency of a new connection per call (plain requests.post, as the chatbots used to do)
+vs the shared keep-alive session of common.http_client.
+
+Runs against mock_llm_server.py (started in-process, non-streamed replies) unless --url is given.
+For a real endpoint the difference is the TCP + TLS handshake on every turn. With --fail-every
+the server answers every n-th request with a 503, which the shared client retries.
+"""
+
+import argparse
+import time
+import numpy as np
+import requests
+from common.http_client import HttpClient
+from mock_llm_server import start_server
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="HTTP keep-alive / retry benchmark")
+    parser.add_argument("--url", type=str, default=None, help="Completions endpoint (default: local mock server)")
+    parser.add_argument("--key", type=str, default="mock", help="API key for --url")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--fail-every", type=int, default=0, help="Mock server: answer every n-th request with a 503")
+    return parser.parse_args()
+
+
+def payload(key):
+    headers = {"Authorization": f"Bearer {key}", "Content-Type": "application/json"}
+    data = {"model": "meta-llama/llama-3-8b-instruct", "messages": [{"role": "user", "content": "Hi"}], "max_tokens": 16}
+    return headers, data
+
+
+def run_fresh(url, key, n):
+    headers, data = payload(key)
+    times, failures = [], 0
+    for _ in range(n):
+        start = time.perf_counter()
+        response = requests.post(url, headers=headers, json=data, timeout=30)
+        times.append(time.perf_counter() - start)
+        failures += response.status_code != 200
+    return np.array(times) * 1000, failures
+
+
+def run_pooled(url, key, n, client):
+    headers, data = payload(key)
+    times, failures = [], 0
+    for _ in range(n):
+        start = time.perf_counter()
+        response = client.post(url, endpoint="openrouter", headers=headers, json=data)
+        times.append(time.perf_counter() - start)
+        failures += response.status_code != 200
+    return np.array(times) * 1000, failures
+
+
+def main():
+    args = get_args()
+    url = args.url
+    server = None
+    if url is None:
+        server, url = start_server(first_token_ms=0, token_ms=0, fail_every=args.fail_every)
+
+    client = HttpClient()
+    try:
+        fresh, fresh_failures = run_fresh(url, args.key, args.requests)
+        pooled, pooled_failures = run_pooled(url, args.key, args.requests, client)
+        for name, times, failures in (("new conn", fresh, fresh_failures), ("pooled", pooled, pooled_failures)):
+            print(f"{name:>9}: mean {times.mean():7.2f} ms | p50 {np.percentile(times, 50):7.2f} ms | "
+                  f"p95 {np.percentile(times, 95):7.2f} ms | failed {failures}/{args.requests}")
+        print(f"Mean latency, new connection / shared session: {fresh.mean() / pooled.mean():.2f}x")
+        print(client.report())
+    finally:
+        client.close()
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Time-to-first-audio of a chatbot reply: blocking completion + whole-reply TTS vs streamed
+completion with sentence-level TTS pipelining.
+
+Runs against mock_llm_server.py (started in-process) unless --url is given. TTS is simulated
+with a fixed cost per request plus a cost per character, and playback with a speaking rate, so
+only the request/synthesis/playback overlap is measured.
+"""
+
+import argparse
+import time
+import numpy as np
+from common.http_client import HttpClient
+from common.llm_streaming import SpeechPipeline, iter_sentences, stream_chat
+from mock_llm_server import DEFAULT_REPLY, start_server
+
+
+MESSAGES = [
+    {"role": "system", "content": "You are KIDA, a flirty, sarcastic AI tank robot girl. Keep your responses clever, short, and spicy."},
+    {"role": "user", "content": "Hey KIDA, what are you up to?"},
+]
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="LLM + TTS time-to-first-audio benchmark")
+    parser.add_argument("--url", type=str, default=None, help="Completions endpoint (default: local mock server)")
+    parser.add_argument("--key", type=str, default="mock", help="API key for --url")
+    parser.add_argument("--first-token-ms", type=float, default=400.0, help="Mock server time to first token")
+    parser.add_argument("--token-ms", type=float, default=30.0, help="Mock server delay per token")
+    parser.add_argument("--tts-ms", type=float, default=300.0, help="Simulated TTS cost per request")
+    parser.add_argument("--tts-char-ms", type=float, default=3.0, help="Simulated TTS cost per character")
+    parser.add_argument("--speech-char-ms", type=float, default=10.0, help="Simulated playback time per character")
+    parser.add_argument("--runs", type=int, default=3)
+    return parser.parse_args()
+
+
+def make_tts(args):
+    def synthesize(text):
+        time.sleep((args.tts_ms + args.tts_char_ms * len(text)) / 1000)
+        return text
+
+    def play(audio):
+        time.sleep(args.speech_char_ms * len(audio) / 1000)
+
+    return synthesize, play
+
+
+def run_blocking(args, url, client):
+    synthesize, play = make_tts(args)
+    start = time.perf_counter()
+    data = {"model": "meta-llama/llama-3-8b-instruct", "messages": MESSAGES, "max_tokens": 120, "temperature": 0.95}
+    response = client.post(url, endpoint="openrouter", headers={"Authorization": f"Bearer {args.key}"}, json=data)
+    reply = response.json()["choices"][0]["message"]["content"]
+    audio = synthesize(reply)
+    first_audio = time.perf_counter() - start
+    play(audio)
+    return first_audio, time.perf_counter() - start
+
+
+def run_streaming(args, url, client):
+    synthesize, play = make_tts(args)
+    speech = SpeechPipeline(synthesize, play)
+    sentences = []
+    for sentence in iter_sentences(stream_chat(args.key, MESSAGES, url=url, client=client)):
+        sentences.append(sentence)
+        speech.say(sentence)
+    speech.close()
+    if args.url is None and " ".join(sentences).split() != DEFAULT_REPLY.split():
+        raise RuntimeError(f"Streamed reply differs from the mock reply: {' '.join(sentences)!r}")
+    return speech.time_to_first_audio, time.perf_counter() - speech.start_time
+
+
+def main():
+    args = get_args()
+    url = args.url
+    server = None
+    if url is None:
+        server, url = start_server(first_token_ms=args.first_token_ms, token_ms=args.token_ms)
+
+    client = HttpClient()
+    try:
+        results = {}
+        for name, run in (("blocking", run_blocking), ("streaming", run_streaming)):
+            times = np.array([run(args, url, client) for _ in range(args.runs)]) * 1000
+            results[name] = times[:, 0].mean()
+            print(f"{name:>10}: first audio {times[:, 0].mean():7.0f} ms | reply finished {times[:, 1].mean():7.0f} ms")
+        print(f"Time-to-first-audio: {results['blocking'] / results['streaming']:.1f}x faster when streaming")
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Compare the NumPy and torch log-Mel frontends: accuracy, latency, import cost and memory."""
+
+import argparse
+import resource
+import time
+import tracemalloc
+import numpy as np
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Log-Mel frontend benchmark")
+    parser.add_argument("--chunk-length", type=int, default=10, help="Chunk length in seconds")
+    parser.add_argument("--runs", type=int, default=50, help="Number of timed runs per frontend")
+    parser.add_argument("--tolerance", type=float, default=1e-4, help="Max allowed absolute difference")
+    parser.add_argument("--overlap", type=float, default=0.5, help="Chunk overlap for the long-recording test")
+    parser.add_argument("--duration", type=int, default=60, help="Long-recording length in seconds")
+    return parser.parse_args()
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def time_frontend(fn, audio, runs):
+    fn(audio)  # warm-up: caches, buffers, lazy imports
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(audio)
+        times.append(time.perf_counter() - start)
+    return np.array(times) * 1000
+
+
+def bench_overlap(args, rng):
+    """Overlapping chunks of a long recording: per-chunk STFT vs the incremental mel buffer."""
+    from common.mel import log_mel_spectrogram, pad_or_trim
+    from common.preprocessing import preprocess
+
+    audio = (0.1 * rng.standard_normal(args.duration * 16000)).astype(np.float32)
+    segment_samples = args.chunk_length * 16000
+    step = int(segment_samples * (1 - args.overlap))
+
+    def per_chunk(a):
+        return [log_mel_spectrogram(pad_or_trim(a[s:s + segment_samples], segment_samples))
+                for s in range(0, len(a), step)]
+
+    runs = max(1, args.runs // 10)
+    chunk_times = time_frontend(per_chunk, audio, runs)
+    incremental_times = time_frontend(
+        lambda a: preprocess(a, chunk_length=args.chunk_length, max_duration=args.duration, overlap=args.overlap),
+        audio, runs)
+    print(f"{args.duration}s recording, overlap {args.overlap}: per-chunk {chunk_times.mean():.1f} ms, "
+          f"incremental {incremental_times.mean():.1f} ms")
+
+
+def main():
+    args = get_args()
+    rng = np.random.default_rng(0)
+    audio = (0.1 * rng.standard_normal(args.chunk_length * 16000)).astype(np.float32)
+
+    rss_start = max_rss_mb()
+    start = time.perf_counter()
+    from common.mel import log_mel_spectrogram
+    print(f"import common.mel: {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"+{max_rss_mb() - rss_start:.1f} MB RSS")
+
+    tracemalloc.start()
+    numpy_mel = log_mel_spectrogram(audio)
+    _, first_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    log_mel_spectrogram(audio)
+    _, steady_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    times = time_frontend(log_mel_spectrogram, audio, args.runs)
+    print(f"numpy: mean {times.mean():.2f} ms, p95 {np.percentile(times, 95):.2f} ms, "
+          f"peak alloc {first_peak / 2**20:.1f} MB first call, {steady_peak / 2**20:.1f} MB after")
+
+    bench_overlap(args, rng)
+
+    rss_start = max_rss_mb()
+    start = time.perf_counter()
+    try:
+        from common.audio_utils import log_mel_spectrogram as torch_log_mel_spectrogram
+        import torch
+    except ImportError:
+        print("torch not installed, skipping comparison")
+        return
+    print(f"import torch: {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"+{max_rss_mb() - rss_start:.1f} MB RSS")
+
+    times = time_frontend(lambda a: torch_log_mel_spectrogram(a).numpy(), audio, args.runs)
+    print(f"torch: mean {times.mean():.2f} ms, p95 {np.percentile(times, 95):.2f} ms "
+          f"({torch.get_num_threads()} threads)")
+
+    diff = np.abs(numpy_mel - torch_log_mel_spectrogram(audio).numpy()).max()
+    print(f"max abs difference: {diff:.2e} ({'OK' if diff <= args.tolerance else 'FAIL'}, tolerance {args.tolerance:.0e})")
+
+
+if __name__ == "__main__":
+    main()
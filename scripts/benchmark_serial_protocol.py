@@ -0,0 +1,78 @@
+"""
+Host CPU and link capacity of the legacy text protocol vs binary frames (common.serial_protocol).
+
+Serial output of both sketches is synthesized with SensorSimulator and run through the same code
+as arduino.read_from_arduino: text lines through the update_state_dev0x parsers (with their
+prints going to /dev/null), binary frames through FrameDecoder and update_state_frame. The
+maximum sample rate is what fits through the link at config.ARDUINO_BAUD (10 bits per byte).
+"""
+
+import argparse
+import contextlib
+import os
+import time
+import arduino
+import config
+from common.serial_protocol import FrameDecoder, SensorSimulator
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Arduino serial protocol benchmark")
+    parser.add_argument("--samples", type=int, default=20000)
+    parser.add_argument("--chunk", type=int, default=64, help="Bytes per serial read")
+    parser.add_argument("--batch", type=int, default=4, help="Records per binary frame")
+    return parser.parse_args()
+
+
+def run_text(dev_name, data, chunk):
+    buffer = b""
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for i in range(0, len(data), chunk):
+            # What ser.readline() does: accumulate until a newline
+            buffer += data[i:i + chunk]
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                line = line.decode("utf-8").strip()
+                if line:
+                    arduino.handle_line(dev_name, line)
+    return time.perf_counter() - start
+
+
+def run_binary(dev_name, data, chunk):
+    decoder = FrameDecoder()
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for i in range(0, len(data), chunk):
+            for item in decoder.feed(data[i:i + chunk]):
+                if isinstance(item, str):
+                    arduino.handle_line(dev_name, item)
+                else:
+                    arduino.update_state_frame(item, dev_name)
+    return time.perf_counter() - start, decoder
+
+
+def main():
+    args = get_args()
+    bytes_per_s = config.ARDUINO_BAUD / 10
+    for dev_name in ("dev00", "dev01"):
+        text, records = SensorSimulator(dev_name).stream(args.samples, binary=False)
+        cases = [("text", text, run_text(dev_name, text, args.chunk), None)]
+        for batch in sorted({1, args.batch}):
+            data, _ = SensorSimulator(dev_name).stream(args.samples, binary=True, batch=batch)
+            elapsed, decoder = run_binary(dev_name, data, args.chunk)
+            assert decoder.records == len(records) and decoder.crc_errors == 0, decoder.stats()
+            cases.append((f"binary x{batch}", data, elapsed, decoder))
+
+        print(f"{dev_name} ({args.samples} samples):")
+        for name, data, elapsed, _ in cases:
+            per_sample = len(data) / args.samples
+            print(f"  {name:>10}: {elapsed / args.samples * 1e6:6.2f} µs/sample | "
+                  f"{per_sample:5.1f} bytes/sample | max {bytes_per_s / per_sample:5.1f} samples/s "
+                  f"at {config.ARDUINO_BAUD} baud")
+        text_time = cases[0][2]
+        print(f"  Parse CPU, text / binary x{args.batch}: {text_time / cases[-1][2]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Measure Whisper asset and tokenizer startup time, each run in a fresh interpreter.
+
+- transformers: AutoTokenizer.from_pretrained + np.load of the decoder assets (previous startup).
+- cached: decode table from the local cache + memory-mapped decoder assets, run with the
+  Hugging Face hub forced offline.
+
+The first cached run is the cold start (with --rebuild, right after the table is rebuilt, so
+nothing is in the page cache); the following runs are warm starts.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+import numpy as np
+from common.tokenizer import build_tokenizer_cache, tokenizer_cache_dir
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+TRANSFORMERS_STARTUP = """
+import numpy as np
+from transformers import AutoTokenizer
+tokenizer = AutoTokenizer.from_pretrained("openai/whisper-{variant}")
+np.load("{assets}/token_embedding_weight_{variant}.npy")
+np.load("{assets}/onnx_add_input_{variant}.npy")
+tokenizer.decode([50258, 2425, 11, 50257], skip_special_tokens=True)
+"""
+
+CACHED_STARTUP = """
+import numpy as np
+from common.tokenizer import load_tokenizer
+tokenizer = load_tokenizer("{variant}")
+np.load("{assets}/token_embedding_weight_{variant}.npy", mmap_mode="r")
+np.load("{assets}/onnx_add_input_{variant}.npy", mmap_mode="r")
+tokenizer.decode([50258, 2425, 11, 50257], skip_special_tokens=True)
+"""
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Whisper startup benchmark")
+    parser.add_argument("--variant", type=str, default="base", choices=["base", "tiny"])
+    parser.add_argument("--runs", type=int, default=5, help="Warm runs per mode")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the decode table first (needs transformers)")
+    parser.add_argument("--skip-transformers", action="store_true", help="Only time the cached startup")
+    return parser.parse_args()
+
+
+def run(code, offline=False):
+    env = dict(os.environ)
+    if offline:
+        env["HF_HUB_OFFLINE"] = "1"
+        env["TRANSFORMERS_OFFLINE"] = "1"
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=SCRIPTS_DIR, env=env, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def report(name, code, runs, cold_offline=False, warm_offline=False):
+    cold = run(code, cold_offline)
+    warm = [run(code, warm_offline) for _ in range(runs)]
+    print(f"{name:>12}: cold {cold:8.1f} ms | warm median {np.median(warm):8.1f} ms, min {min(warm):8.1f} ms")
+
+
+def main():
+    args = get_args()
+    assets = os.path.join(SCRIPTS_DIR, f"resources/decoder_assets/{args.variant}/decoder_tokenization")
+    if args.rebuild:
+        shutil.rmtree(tokenizer_cache_dir(args.variant), ignore_errors=True)
+        build_tokenizer_cache(args.variant, tokenizer_cache_dir(args.variant))
+
+    baseline = run("pass")
+    print(f"Interpreter startup: {baseline:.1f} ms (included below)")
+    if not args.skip_transformers:
+        report("transformers", TRANSFORMERS_STARTUP.format(variant=args.variant, assets=assets), args.runs)
+    # The decode table is built ahead of time, so every start must work offline
+    report("cached", CACHED_STARTUP.format(variant=args.variant, assets=assets), args.runs,
+           cold_offline=True, warm_offline=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark speech detection on long clips: list-based onset detection vs the vectorized VAD."""
+
+import argparse
+import time
+import numpy as np
+from common.preprocessing import detect_first_speech
+from common.vad import detect_speech_segments
+
+
+SAMPLE_RATE = 16000
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="VAD benchmark")
+    parser.add_argument("--duration", type=int, default=60, help="Clip length in seconds")
+    parser.add_argument("--runs", type=int, default=20, help="Number of timed runs")
+    return parser.parse_args()
+
+
+def detect_first_speech_lists(audio_data, sample_rate, threshold=0.2, frame_duration=0.02):
+    """The previous list-based implementation, kept here as the baseline."""
+    frame_size = int(frame_duration * sample_rate)
+    frames = [audio_data[i:i + frame_size] for i in range(0, len(audio_data), frame_size)]
+    energy = [np.sum(np.abs(frame)**2) / len(frame) for frame in frames]
+    max_energy = max(energy)
+    if max_energy > 0:
+        energy = [e / max_energy for e in energy]
+    for i, e in enumerate(energy):
+        if e > threshold:
+            return round(i * frame_duration, 1)
+    return None
+
+
+def make_clip(duration, rng):
+    """Background noise with a few amplitude-modulated voiced bursts."""
+    audio = rng.normal(0, 0.005, duration * SAMPLE_RATE).astype(np.float32)
+    t = np.arange(2 * SAMPLE_RATE) / SAMPLE_RATE
+    burst = (0.3 * np.sin(2 * np.pi * 180 * t) * (1 + np.sin(2 * np.pi * 4 * t)) / 2).astype(np.float32)
+    for start in range(3, duration - 2, 9):
+        audio[start * SAMPLE_RATE:start * SAMPLE_RATE + len(burst)] += burst
+    return audio
+
+
+def bench(name, fn, audio, runs):
+    result = fn(audio)
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn(audio)
+    elapsed_ms = (time.perf_counter() - start) / runs * 1000
+    print(f"{name:>28}: {elapsed_ms:8.2f} ms  -> {result}")
+    return elapsed_ms
+
+
+def main():
+    args = get_args()
+    audio = make_clip(args.duration, np.random.default_rng(0))
+    print(f"{args.duration}s clip, {args.runs} runs")
+
+    baseline = bench("detect_first_speech (lists)",
+                     lambda a: detect_first_speech_lists(a, SAMPLE_RATE), audio, args.runs)
+    vectorized = bench("detect_first_speech",
+                       lambda a: detect_first_speech(a, SAMPLE_RATE), audio, args.runs)
+    bench("detect_speech_segments",
+          lambda a: len(detect_speech_segments(a, SAMPLE_RATE)), audio, args.runs)
+    print(f"Onset detection speedup: {baseline / vectorized:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
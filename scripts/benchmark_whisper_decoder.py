@@ -0,0 +1,53 @@
+"""Compare per-token decoder timings of the incremental and full-sequence Hailo Whisper decoders."""
+
+import argparse
+import numpy as np
+from hailo_whisper_pipeline import HailoWhisperPipeline
+from common.audio_utils import load_audio
+from common.preprocessing import preprocess
+from whisper_hef_registry import HEF_REGISTRY
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Whisper Hailo decoder benchmark")
+    parser.add_argument("--audio", type=str, default="sampled_audio.wav", help="Audio file to transcribe")
+    parser.add_argument("--hw-arch", type=str, default="hailo8", choices=["hailo8", "hailo8l"])
+    parser.add_argument("--variant", type=str, default="base", choices=["base", "tiny"])
+    parser.add_argument("--runs", type=int, default=5, help="Number of transcriptions per decoder")
+    return parser.parse_args()
+
+
+def run(args, mel, incremental):
+    pipeline = HailoWhisperPipeline(
+        HEF_REGISTRY[args.variant][args.hw_arch]["encoder"],
+        HEF_REGISTRY[args.variant][args.hw_arch]["decoder"],
+        args.variant,
+        incremental_decoding=incremental
+    )
+    token_times = []
+    try:
+        for _ in range(args.runs):
+            pipeline.send_data(mel)
+            pipeline.get_transcription()
+            token_times.extend(pipeline.get_token_timings())
+    finally:
+        pipeline.stop()
+    return np.array(token_times)
+
+
+def main():
+    args = get_args()
+    chunk_length = 10 if args.variant == "tiny" else 5
+    mel = preprocess(load_audio(args.audio), is_nhwc=True, chunk_length=chunk_length)[0]
+
+    results = {}
+    for name, incremental in (("full-sequence", False), ("incremental", True)):
+        times = run(args, mel, incremental)
+        results[name] = times.mean()
+        print(f"{name:>14}: {len(times)} tokens, mean {times.mean():.2f} ms, "
+              f"p50 {np.percentile(times, 50):.2f} ms, max {times.max():.2f} ms")
+    print(f"Speedup per token: {results['full-sequence'] / results['incremental']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare throughput and latency of the serial and the pipelined (encoder/decoder overlap) Whisper loop."""
+
+import argparse
+import time
+import numpy as np
+from hailo_whisper_pipeline import HailoWhisperPipeline
+from common.audio_utils import load_audio
+from common.preprocessing import preprocess
+from whisper_hef_registry import HEF_REGISTRY
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Whisper Hailo pipeline overlap benchmark")
+    parser.add_argument("--audio", type=str, default="sampled_audio.wav", help="Audio file to transcribe")
+    parser.add_argument("--hw-arch", type=str, default="hailo8", choices=["hailo8", "hailo8l"])
+    parser.add_argument("--variant", type=str, default="base", choices=["base", "tiny"])
+    parser.add_argument("--chunks", type=int, default=6, help="Chunks per utterance")
+    parser.add_argument("--runs", type=int, default=5, help="Utterances per loop")
+    return parser.parse_args()
+
+
+def run(args, mels, pipelined):
+    pipeline = HailoWhisperPipeline(
+        HEF_REGISTRY[args.variant][args.hw_arch]["encoder"],
+        HEF_REGISTRY[args.variant][args.hw_arch]["decoder"],
+        args.variant,
+        pipelined=pipelined
+    )
+    durations, latencies = [], []
+    try:
+        pipeline.submit(mels[0]).result()  # warm-up: device configuration, tokenizer
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            futures = [pipeline.submit(mel) for mel in mels]
+            for future in futures:
+                future.add_done_callback(lambda f: latencies.append(time.perf_counter() - start))
+            for future in futures:
+                future.result()
+            durations.append(time.perf_counter() - start)
+    finally:
+        pipeline.stop()
+    return np.array(durations), np.array(latencies) * 1000
+
+
+def main():
+    args = get_args()
+    chunk_length = 10 if args.variant == "tiny" else 5
+    mel = preprocess(load_audio(args.audio), is_nhwc=True, chunk_length=chunk_length)[0]
+    mels = [mel.copy() for _ in range(args.chunks)]  # a multi-chunk utterance
+
+    results = {}
+    for name, pipelined in (("serial", False), ("pipelined", True)):
+        durations, latencies = run(args, mels, pipelined)
+        results[name] = durations.mean()
+        print(f"{name:>10}: {args.chunks / durations.mean():6.2f} chunks/s | utterance {durations.mean() * 1000:8.1f} ms | "
+              f"chunk latency p50 {np.percentile(latencies, 50):8.1f} ms, max {latencies.max():8.1f} ms")
+    print(f"Throughput gain: {results['serial'] / results['pipelined']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
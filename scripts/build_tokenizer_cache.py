@@ -0,0 +1,32 @@
+"""
+Build the offline Whisper decode tables (common.tokenizer) once, on a machine with
+`transformers` and network access (or the models in the Hugging Face cache). The robot then
+loads them at startup without either.
+
+    python build_tokenizer_cache.py                 # tiny and base
+    python build_tokenizer_cache.py --variant base
+"""
+
+import argparse
+from common.tokenizer import build_tokenizer_cache, tokenizer_cache_dir, WhisperTokenDecoder
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Build the offline Whisper decode tables")
+    parser.add_argument("--variant", nargs="+", default=["tiny", "base"], choices=["tiny", "base"])
+    parser.add_argument("--cache-dir", type=str, default=None,
+                        help="Root of the decoder assets (default: resources/decoder_assets)")
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+    for variant in args.variant:
+        directory = tokenizer_cache_dir(variant, args.cache_dir)
+        build_tokenizer_cache(variant, directory)
+        decoder = WhisperTokenDecoder.load(directory)
+        print(f"✅ {variant}: {len(decoder)} tokens in {directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
 # copied from Whisper repo
+from __future__ import annotations
+
 import os
+import sys
 from functools import lru_cache
 from subprocess import CalledProcessError, run
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Optional, Union
 
 import numpy as np
-import torch
-import torch.nn.functional as F
+
+# torch is imported lazily by the functions that need it, so load_audio and the
+# constants can be used without paying the torch import (see common.mel)
+if TYPE_CHECKING:
+    import torch
 
 
 def exact_div(x, y):
@@ -70,7 +76,10 @@ def pad_or_trim(array, length: int = N_SAMPLES, *, axis: int = -1):
     """
     Pad or trim the audio array to N_SAMPLES, as expected by the encoder.
     """
-    if torch.is_tensor(array):
+    torch = sys.modules.get("torch")  # an array can only be a tensor if torch is already loaded
+    if torch is not None and torch.is_tensor(array):
+        import torch.nn.functional as F
+
         if array.shape[axis] > length:
             array = array.index_select(
                 dim=axis, index=torch.arange(length, device=array.device)
@@ -104,6 +113,8 @@ def mel_filters(device, n_mels: int) -> torch.Tensor:
             mel_128=librosa.filters.mel(sr=16000, n_fft=400, n_mels=128),
         )
     """
+    import torch
+
     assert n_mels in {80, 128}, f"Unsupported n_mels: {n_mels}"
 
     filters_path = os.path.join(os.path.dirname(__file__), "assets", "mel_filters.npz")
@@ -139,6 +150,9 @@ def log_mel_spectrogram(
     torch.Tensor, shape = (n_mels, n_frames)
         A Tensor that contains the Mel spectrogram
     """
+    import torch
+    import torch.nn.functional as F
+
     if not torch.is_tensor(audio):
         if isinstance(audio, str):
             audio = load_audio(audio)
@@ -0,0 +1,657 @@
+"""
+Asyncio conversation engine: listen -> transcribe -> LLM -> speak, with pluggable backends.
+
+The chatbot scripts each run the same loop one blocking step at a time. Here every stage is a
+task connected by queues: the reply is split into sentences as it streams in, sentences are
+synthesized concurrently and queued on the AudioPlayer back to back. By default listening pauses
+from the end of an utterance until its reply has been spoken, since the mic would hear the robot;
+with listen_while_speaking (echo cancellation needed) the next utterance is captured and
+transcribed while the previous reply is still being generated and spoken. Backends are picked by
+name from a config dict (see DEFAULT_CONFIG and conversation.json) and every turn reports its
+latencies.
+"""
+
+import asyncio
+import copy
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from common.http_client import LatencyHistogram
+from common.intents import IntentRouter
+from common.llm_streaming import OPENROUTER_URL, SentenceSplitter, stream_chat
+from common.playback import AudioPlayer
+from common.tts import elevenlabs_tts, google_tts
+from common.tts_cache import CANNED_PHRASES, get_cache
+
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+SAMPLE_RATE = 16000
+EXPRESSIONS = re.compile(r"\b(wink|smile|frown|blush)\b")
+QUIT_WORDS = {"quit", "exit", "shutdown"}
+
+DEFAULT_CONFIG = {
+    "system_prompt": "You are KIDA, a flirty, sarcastic AI tank robot girl. Keep your responses clever, short, and spicy.",
+    "listen_while_speaking": False,  # the mic hears the speaker: keep it off unless there is echo cancellation
+    "prepare_ahead": 2,
+    "listener": {"energy_threshold": 400, "pause_threshold": 1.0},
+    "stt": {"backend": "faster-whisper", "model": "tiny"},
+    "llm": {"backend": "openrouter", "model": "meta-llama/llama-3-8b-instruct"},
+    "tts": {"backend": "pyttsx3"},
+    # Chat history packed into a token budget (memory/conversation_memory.py)
+    "memory": {"enabled": True, "token_budget": 768, "filepath": "conversation_history.json"},
+    # Robot commands matched locally instead of asking the LLM (common/intents.py)
+    "intents": {"enabled": True},
+}
+
+
+def load_key(path):
+    with open(path if os.path.isabs(path) else os.path.join(BASE_DIR, path), "r") as f:
+        return f.readline().strip()
+
+
+def load_config(path=None, overrides=None):
+    """
+    DEFAULT_CONFIG updated with a JSON file and then with overrides (one level deep: the
+    "stt", "llm", "tts" and "listener" sections are merged key by key).
+    """
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    layers = []
+    if path is not None:
+        with open(path, "r") as f:
+            layers.append(json.load(f))
+    if overrides:
+        layers.append(overrides)
+    for layer in layers:
+        for key, value in layer.items():
+            if isinstance(value, dict) and isinstance(config.get(key), dict):
+                if "backend" in value and value["backend"] != config[key].get("backend"):
+                    config[key] = {}  # options of another backend do not carry over
+                config[key].update(value)
+            else:
+                config[key] = value
+    return config
+
+
+def _backend_options(spec):
+    return {k: v for k, v in spec.items() if k != "backend"}
+
+
+def _in_daemon_thread(function, *args):
+    """
+    Await a blocking call on a daemon thread. Unlike asyncio.to_thread, a call that never
+    returns (a microphone waiting for speech) does not keep asyncio.run() from exiting.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(result, error):
+        if not future.cancelled():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def call():
+        try:
+            result, error = function(*args), None
+        except Exception as e:
+            result, error = None, e
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(settle, result, error)
+
+    threading.Thread(target=call, daemon=True).start()
+    return future
+
+
+# === METRICS ===
+
+class TurnMetrics:
+    """Timestamps (time.perf_counter) of one user turn, from the end of the user's speech."""
+
+    STAGES = ("stt", "first_token", "first_audio", "total")
+
+    def __init__(self, speech_end=None):
+        self.speech_end = speech_end if speech_end is not None else time.perf_counter()
+        self.transcribed = None
+        self.first_token = None
+        self.first_audio = None
+        self.end = None
+
+    def latencies_ms(self):
+        """Milliseconds from the end of speech to each stage; missing stages are left out."""
+        marks = {"stt": self.transcribed, "first_token": self.first_token,
+                 "first_audio": self.first_audio, "total": self.end}
+        return {name: (t - self.speech_end) * 1000 for name, t in marks.items() if t is not None}
+
+    def format(self):
+        latencies = self.latencies_ms()
+        return " | ".join(f"{name} {latencies[name]:.0f} ms" for name in self.STAGES if name in latencies)
+
+
+class ConversationMetrics:
+    """Latency histograms per stage over all turns."""
+
+    def __init__(self):
+        self.histograms = {name: LatencyHistogram() for name in TurnMetrics.STAGES}
+        self.turns = 0
+        self.local_turns = 0
+
+    def record(self, turn, local=False):
+        """Add a turn; local: answered by a local intent, without the LLM."""
+        self.turns += 1
+        self.local_turns += int(local)
+        for name, latency_ms in turn.latencies_ms().items():
+            self.histograms[name].record(latency_ms)
+
+    def report(self):
+        lines = [f"⏱️ {self.turns} turns, {self.local_turns} local commands (ms after end of speech):"]
+        for name in TurnMetrics.STAGES:
+            s = self.histograms[name].summary()
+            if s["requests"]:
+                lines.append(f"{name:>12}: mean {s['mean_ms']:.0f} | p50 ≤{s['p50_ms']:.0f} | "
+                             f"p95 ≤{s['p95_ms']:.0f} | max {s['max_ms']:.0f}")
+        return "\n".join(lines)
+
+
+# === LISTENER ===
+
+class MicrophoneListener:
+    """
+    Blocking utterance capture with speech_recognition's energy detector.
+
+    listen() returns one utterance as float32 mono samples at 16 kHz, or None for noise.
+    """
+
+    def __init__(self, energy_threshold=400, pause_threshold=1.0, device_index=None, min_duration=0.3):
+        import speech_recognition as sr
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+        self.recognizer.energy_threshold = energy_threshold
+        self.recognizer.dynamic_energy_threshold = True
+        self.recognizer.pause_threshold = pause_threshold
+        self.device_index = device_index
+        self.min_duration = min_duration
+        self.calibrated = False
+
+    def listen(self):
+        with self.sr.Microphone(device_index=self.device_index) as source:
+            if not self.calibrated:
+                # Once; the dynamic threshold keeps tracking the noise floor afterwards
+                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+                self.calibrated = True
+            print("🎤 Waiting for speech...")
+            audio = self.recognizer.listen(source, timeout=None)
+        raw = audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)
+        samples = np.frombuffer(raw, np.int16).astype(np.float32) / 32768.0
+        return samples if len(samples) >= self.min_duration * SAMPLE_RATE else None
+
+
+# === STT BACKENDS ===
+
+class FasterWhisperSTT:
+    """faster-whisper on the CPU (tiny/int8 is the fastest)."""
+
+    def __init__(self, model="tiny", compute_type="int8", beam_size=1, no_speech_threshold=0.6):
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(model, device="cpu", compute_type=compute_type)
+        self.beam_size = beam_size
+        self.no_speech_threshold = no_speech_threshold
+
+    def _transcribe(self, audio):
+        segments, info = self.model.transcribe(audio, beam_size=self.beam_size, without_timestamps=True)
+        if getattr(info, "no_speech_prob", 0.0) > self.no_speech_threshold:
+            return ""
+        # segments is lazy: decoding happens while iterating, so keep it on this thread
+        return " ".join(segment.text for segment in segments).strip()
+
+    async def transcribe(self, audio):
+        return await asyncio.to_thread(self._transcribe, audio)
+
+
+class WhisperSTT:
+    """openai-whisper on the CPU."""
+
+    def __init__(self, model="base", download_root=None):
+        import whisper
+        self.model = whisper.load_model(model, download_root=download_root)
+
+    async def transcribe(self, audio):
+        result = await asyncio.to_thread(self.model.transcribe, audio, fp16=False)
+        return result["text"].strip()
+
+
+class HailoWhisperSTT:
+    """
+    Whisper on the Hailo accelerator. Chunks of an utterance are submitted together and run
+    through the pipelined encoder/decoder.
+
+    With streaming=True the backend also captures audio itself (StreamingTranscriber with VAD
+    on the rolling mel buffer) and the engine uses listen() instead of the microphone listener.
+    """
+
+    def __init__(self, variant="base", hw_arch="hailo8l", streaming=False):
+        self.captures_audio = streaming
+        from hailo_whisper_pipeline import HailoWhisperPipeline
+        from whisper_hef_registry import HEF_REGISTRY
+        try:
+            hefs = HEF_REGISTRY[variant][hw_arch]
+        except KeyError:
+            raise ValueError(f"No HEF paths found for variant '{variant}' and arch '{hw_arch}' in HEF_REGISTRY.")
+        self.pipeline = HailoWhisperPipeline(hefs["encoder"], hefs["decoder"], variant)
+        self.chunk_length = 10 if variant == "tiny" else 5
+        self.transcriber = None
+        if streaming:
+            from common.streaming import StreamingTranscriber
+            self.transcriber = StreamingTranscriber(self.pipeline, chunk_length=self.chunk_length)
+            self.transcriber.start()
+
+    async def transcribe(self, audio):
+        from common.postprocessing import clean_transcription
+        from common.preprocessing import improve_input_audio, preprocess
+        audio, start_time = improve_input_audio(audio, vad=True)
+        mels = preprocess(audio, is_nhwc=True, chunk_length=self.chunk_length,
+                          chunk_offset=max(0, start_time - 0.2))
+        texts = await asyncio.gather(*(self.pipeline.transcribe_async(mel) for mel in mels))
+        return " ".join(clean_transcription(text) for text in texts).strip()
+
+    def listen(self, timeout=None):
+        return self.transcriber.listen(timeout)
+
+    def flush(self):
+        self.transcriber.flush()
+
+
+# === LLM BACKENDS ===
+
+class OpenRouterLLM:
+    """Streamed chat completions from OpenRouter (or any OpenAI-compatible url, e.g. mock_llm_server.py)."""
+
+    def __init__(self, model="meta-llama/llama-3-8b-instruct", max_tokens=120, temperature=0.95,
+                 url=OPENROUTER_URL, api_key_path="keys/openrouter-api-key.txt", api_key=None):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.url = url
+        self.api_key = api_key or load_key(api_key_path)
+
+    async def stream(self, messages):
+        """Async iterator over the reply deltas; the blocking SSE reader runs on a worker thread."""
+        loop = asyncio.get_running_loop()
+        deltas = asyncio.Queue()
+        done = object()
+
+        def read():
+            try:
+                for delta in stream_chat(self.api_key, messages, model=self.model, max_tokens=self.max_tokens,
+                                         temperature=self.temperature, url=self.url):
+                    loop.call_soon_threadsafe(deltas.put_nowait, delta)
+            except Exception as e:
+                loop.call_soon_threadsafe(deltas.put_nowait, e)
+            loop.call_soon_threadsafe(deltas.put_nowait, done)
+
+        reader = loop.run_in_executor(None, read)
+        while True:
+            item = await deltas.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        await reader
+
+
+# === TTS BACKENDS ===
+
+class GoogleTTS:
+    """gTTS through the shared HTTP session and the TTS cache."""
+
+    engine = "gtts"
+
+    def __init__(self, player, lang="en"):
+        self.player = player
+        self.voice = lang
+        self.cache = get_cache()
+
+    def _fetch(self, text):
+        return google_tts(text, lang=self.voice)
+
+    def _synthesize(self, text):
+        return self.player.decode(self.cache.get_bytes(text, self.engine, self.voice, lambda: self._fetch(text)))
+
+    async def synthesize(self, text):
+        return await asyncio.to_thread(self._synthesize, text)
+
+    def prewarm(self, phrases):
+        self.cache.prewarm(phrases, self.engine, self.voice, self._fetch)
+
+
+class ElevenLabsTTS(GoogleTTS):
+    """ElevenLabs REST API through the shared HTTP session and the TTS cache."""
+
+    engine = "elevenlabs"
+
+    def __init__(self, player, voice="Rachel", api_key_path="keys/elevenlabs-api-key.txt"):
+        super().__init__(player)
+        self.voice = voice
+        self.api_key = load_key(api_key_path)
+
+    def _fetch(self, text):
+        return elevenlabs_tts(text, self.api_key, self.voice)
+
+
+class Pyttsx3TTS:
+    """
+    Offline pyttsx3 (espeak) rendered to a wav and decoded for the player. The pyttsx3 engine is
+    not thread-safe, so all synthesis runs on one dedicated thread.
+    """
+
+    def __init__(self, player, rate=175, volume=1.0, voice="en+f3"):
+        self.player = player
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyttsx3")
+        self.properties = {"rate": rate, "volume": volume, "voice": voice}
+        self.engine = None
+
+    def _synthesize(self, text):
+        if self.engine is None:
+            import pyttsx3
+            self.engine = pyttsx3.init()
+            for name, value in self.properties.items():
+                self.engine.setProperty(name, value)
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            self.engine.save_to_file(text, path)
+            self.engine.runAndWait()
+            return self.player.decode(path)
+        finally:
+            os.remove(path)
+
+    async def synthesize(self, text):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self._synthesize, text)
+
+    def prewarm(self, phrases):
+        pass  # local and cheap
+
+
+STT_BACKENDS = {"faster-whisper": FasterWhisperSTT, "whisper": WhisperSTT, "hailo": HailoWhisperSTT}
+LLM_BACKENDS = {"openrouter": OpenRouterLLM}
+TTS_BACKENDS = {"gtts": GoogleTTS, "elevenlabs": ElevenLabsTTS, "pyttsx3": Pyttsx3TTS}
+
+
+def _build(registry, spec, kind, *args):
+    try:
+        backend = registry[spec["backend"]]
+    except KeyError:
+        raise ValueError(f"Unknown {kind} backend '{spec.get('backend')}' (available: {', '.join(registry)})")
+    return backend(*args, **_backend_options(spec))
+
+
+def _build_memory(spec):
+    if not spec.get("enabled"):
+        return None
+    from memory.conversation_memory import ConversationMemory
+    from memory.personality_memory import PersonalityMemory
+    from memory.user_memory import UserMemory
+    return ConversationMemory(spec.get("filepath", "conversation_history.json"),
+                              token_budget=spec.get("token_budget", 768),
+                              user_memory=UserMemory(), personality_memory=PersonalityMemory())
+
+
+def _build_intents(spec):
+    if not spec.get("enabled"):
+        return None
+    try:
+        from arduino import send_command
+    except ImportError as e:
+        print(f"⚠️ Arduino unavailable ({e}); voice commands are answered but not sent")
+        send_command = None
+    return IntentRouter(send=send_command)
+
+
+# === ENGINE ===
+
+class ConversationEngine:
+    """
+    Runs the conversation as concurrent asyncio tasks.
+
+    Parameters:
+    - stt, llm, tts: Backends (see STT_BACKENDS, LLM_BACKENDS, TTS_BACKENDS).
+    - player: AudioPlayer the TTS backend decodes for.
+    - listener: Utterance source with a blocking listen(); unused if stt has its own listen().
+    - system_prompt: System message of every request.
+    - listen_while_speaking: Keep capturing while the robot talks (needs echo cancellation).
+    - prepare_ahead: Sentences synthesized ahead of playback.
+    - on_state: Optional callback with "listening", "thinking", "speaking", "idle" (UI, LEDs).
+    - memory: Optional ConversationMemory; without it every request is single-turn.
+    - intents: Optional IntentRouter; matched commands are executed and answered locally.
+    """
+
+    def __init__(self, stt, llm, tts, player, listener=None, system_prompt=DEFAULT_CONFIG["system_prompt"],
+                 listen_while_speaking=False, prepare_ahead=2, on_state=None, memory=None, intents=None):
+        self.stt = stt
+        self.llm = llm
+        self.tts = tts
+        self.player = player
+        self.listener = listener
+        self.system_prompt = system_prompt
+        self.listen_while_speaking = listen_while_speaking
+        self.prepare_ahead = prepare_ahead
+        self.on_state = on_state
+        self.memory = memory
+        self.intents = intents
+        self.metrics = ConversationMetrics()
+        self.stopped = None
+        self.quiet = None
+
+    @classmethod
+    def from_config(cls, config, on_state=None):
+        player = AudioPlayer()
+        stt = _build(STT_BACKENDS, config["stt"], "STT")
+        listener = None if getattr(stt, "captures_audio", False) else MicrophoneListener(**config.get("listener", {}))
+        return cls(stt, _build(LLM_BACKENDS, config["llm"], "LLM"), _build(TTS_BACKENDS, config["tts"], "TTS", player),
+                   player, listener, system_prompt=config["system_prompt"],
+                   listen_while_speaking=config["listen_while_speaking"], prepare_ahead=config["prepare_ahead"],
+                   on_state=on_state, memory=_build_memory(config.get("memory", {})),
+                   intents=_build_intents(config.get("intents", {})))
+
+    def _state(self, state):
+        if self.on_state is not None:
+            self.on_state(state)
+
+    async def run(self):
+        """Converse until a quit word is heard."""
+        self.stopped = asyncio.Event()
+        self.quiet = asyncio.Event()
+        self.quiet.set()
+        self.tts.prewarm(CANNED_PHRASES + tuple(self.intents.replies() if self.intents else ()))
+        utterances = asyncio.Queue(maxsize=2)
+        prompts = asyncio.Queue(maxsize=2)
+        tasks = [asyncio.create_task(coro) for coro in (
+            self._listen_loop(utterances, prompts),
+            self._transcribe_loop(utterances, prompts),
+            self._respond_loop(prompts),
+        )]
+        print("🔋 KIDA online. Awaiting orders, hotshot.")
+        self._state("listening")
+        try:
+            await self.stopped.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await asyncio.to_thread(self.player.wait_idle)
+            print(self.metrics.report())
+            if self.intents is not None:
+                print(self.intents.report())
+
+    async def _listen_loop(self, utterances, prompts):
+        streaming = self.listener is None
+        while True:
+            if not self.listen_while_speaking:
+                await self.quiet.wait()
+            try:
+                if streaming:
+                    text = await _in_daemon_thread(self.stt.listen, 0.5)
+                    if text is None:
+                        continue
+                    self._hand_off()
+                    # Transcribed as the utterance ended: latencies count from the transcript
+                    await prompts.put((TurnMetrics(), text))
+                else:
+                    audio = await _in_daemon_thread(self.listener.listen)
+                    if audio is not None:
+                        self._hand_off()
+                        await utterances.put((TurnMetrics(), audio))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("Error:", e)
+                await asyncio.sleep(0.5)
+
+    def _hand_off(self):
+        # Stop capturing until this utterance has been answered (or dropped)
+        if not self.listen_while_speaking:
+            self.quiet.clear()
+
+    def _resume_listening(self):
+        if getattr(self.stt, "captures_audio", False) and not self.listen_while_speaking:
+            self.stt.flush()  # drop what the mic heard of the robot
+        self.quiet.set()
+        self._state("listening")
+
+    async def _transcribe_loop(self, utterances, prompts):
+        while True:
+            turn, audio = await utterances.get()
+            print("🧠 Recognizing...")
+            try:
+                text = await self.stt.transcribe(audio)
+            except Exception as e:
+                print("STT error:", e)
+                self._resume_listening()
+                continue
+            turn.transcribed = time.perf_counter()
+            await prompts.put((turn, text))
+
+    async def _respond_loop(self, prompts):
+        while True:
+            turn, text = await prompts.get()
+            if not text or text == "[Silence]":
+                print("⚠️ Ignored silence / noise")
+                self._resume_listening()
+                continue
+            print("You said:", text)
+            try:
+                match = self.intents.match(text) if self.intents is not None else None
+                if match is not None:
+                    await self._run_intent(turn, match)
+                    if match.intent.stop:
+                        self.stopped.set()
+                        return
+                    continue
+                if self.intents is None and re.sub(r"[^\w\s]", "", text).strip().lower() in QUIT_WORDS:
+                    await self.say("Going dark. Goodbye, commander.")
+                    self.stopped.set()
+                    return
+                await self._respond(turn, text)
+                turn.end = time.perf_counter()
+                self.metrics.record(turn)
+                print(f"⏱️ {turn.format()}")
+            except Exception as e:
+                print("Error:", e)
+                await self.say("Oops. System hiccup. Try again, babe.")
+            finally:
+                self._resume_listening()
+
+    async def _run_intent(self, turn, match):
+        print(f"⚡ Intent '{match.intent.name}' matched in {match.elapsed_ms * 1000:.0f} µs")
+        # Commands first: the robot moves while the reply is synthesized
+        self.intents.execute(match)
+        if match.reply:
+            clip = await self.say(match.reply)
+            turn.first_audio = clip.start_time
+        turn.end = time.perf_counter()
+        self.metrics.record(turn, local=True)
+        print(f"⏱️ {turn.format()}")
+
+    async def say(self, text):
+        """Speak a fixed line (not from the LLM) and wait until it has been played."""
+        self._state("speaking")
+        pcm = await self.tts.synthesize(text)
+        clip = self.player.play(pcm)
+        await asyncio.to_thread(clip.wait)
+        return clip
+
+    async def _respond(self, turn, text):
+        self._state("thinking")
+        if self.memory is not None:
+            messages = self.memory.build_messages(self.system_prompt, text)
+        else:
+            messages = [{"role": "system", "content": self.system_prompt}, {"role": "user", "content": text}]
+        reply = []
+        # Synthesis tasks in sentence order; the playback task awaits them one by one
+        synthesized = asyncio.Queue(maxsize=self.prepare_ahead)
+        playback = asyncio.create_task(self._playback(turn, synthesized))
+        splitter = SentenceSplitter()
+        expression = None
+        try:
+            try:
+                async for delta in self.llm.stream(messages):
+                    if turn.first_token is None:
+                        turn.first_token = time.perf_counter()
+                    reply.append(delta)
+                    for sentence in splitter.feed(delta):
+                        expression = await self._queue_sentence(sentence, synthesized, expression)
+            except Exception as e:
+                print("LLM error:", e)
+                reply = None
+                splitter.feed(" I'm glitching hard, babe. Try again later.")
+            rest = splitter.flush()
+            if rest:
+                expression = await self._queue_sentence(rest, synthesized, expression)
+        finally:
+            await synthesized.put(None)
+            await playback
+        if self.memory is not None and reply:
+            self.memory.add_exchange(text, "".join(reply).strip())
+        return expression
+
+    async def _queue_sentence(self, sentence, synthesized, expression):
+        match = EXPRESSIONS.search(sentence)
+        if match and expression is None:
+            expression = match.group(1)
+            print("Expression:", expression)
+        spoken = EXPRESSIONS.sub("", sentence).replace("*", "").strip()
+        if spoken:
+            print("KIDA says:", spoken)
+            await synthesized.put(asyncio.create_task(self.tts.synthesize(spoken)))
+        return expression
+
+    async def _playback(self, turn, synthesized):
+        clips = []
+        while True:
+            task = await synthesized.get()
+            if task is None:
+                break
+            try:
+                pcm = await task
+            except Exception as e:
+                print("Voice error:", e)
+                continue
+            if not clips:
+                self._state("speaking")
+            clips.append(self.player.play(pcm))
+        for clip in clips:
+            await asyncio.to_thread(clip.wait)
+        if clips:
+            turn.first_audio = clips[0].start_time
+        self._state("idle")
+
+
+def run(config):
+    """Build the engine from a config dict and converse until told to quit."""
+    asyncio.run(ConversationEngine.from_config(config).run())
@@ -0,0 +1,154 @@
+"""Decoding strategies for the Whisper decoder: greedy, top-k/top-p sampling and beam search."""
+
+import numpy as np
+
+
+PUNCTUATION_TOKENS = [11, 13]  # ',' and '.': excluded from the repetition penalty
+
+
+class RepetitionPenalty:
+    """
+    Divide the logits of recently generated tokens by a penalty factor.
+
+    The exclusion mask is built once, so applying the penalty is a couple of array
+    indexing operations instead of a Python loop over a set.
+    """
+
+    def __init__(self, vocab_size, penalty=1.5, last_window=8, excluded_tokens=PUNCTUATION_TOKENS):
+        self.penalty = penalty
+        self.last_window = last_window
+        self.excluded = np.zeros(vocab_size, dtype=bool)
+        self.excluded[[t for t in excluded_tokens if t < vocab_size]] = True
+
+    def __call__(self, logits, generated_tokens, out=None):
+        """
+        :param logits: Logits of shape (vocab_size,).
+        :param generated_tokens: Previously generated token IDs.
+        :param out: Optional array to write into (may be `logits` itself). A new array otherwise.
+        :return: Penalized logits.
+        """
+        if out is None:
+            out = logits.copy()
+        elif out is not logits:
+            np.copyto(out, logits)
+        if generated_tokens:
+            recent = np.asarray(generated_tokens[-self.last_window:], dtype=np.int64)
+            recent = recent[~self.excluded[recent]]
+            # Duplicate indices are divided once, like the set-based version
+            out[recent] = out[recent] / self.penalty
+        return out
+
+
+def log_softmax(logits):
+    shifted = logits - logits.max()
+    return shifted - np.log(np.exp(shifted).sum())
+
+
+class GreedyStrategy:
+    """Pick the most likely token."""
+
+    name = "greedy"
+
+    def select(self, logits, generated_tokens):
+        return int(np.argmax(logits))
+
+
+class SamplingStrategy:
+    """
+    Temperature sampling restricted to the top-k tokens and/or the smallest set of tokens
+    whose cumulative probability reaches top_p (nucleus sampling).
+    """
+
+    name = "sampling"
+
+    def __init__(self, temperature=0.7, top_k=50, top_p=0.9, seed=None):
+        self.temperature = temperature
+        self.top_k = top_k
+        self.top_p = top_p
+        self.rng = np.random.default_rng(seed)
+
+    def select(self, logits, generated_tokens):
+        if self.temperature <= 0:
+            return int(np.argmax(logits))
+
+        # Only the top-k candidates are sorted; the rest of the vocabulary is never touched again
+        k = min(self.top_k or len(logits), len(logits))
+        candidates = np.argpartition(logits, -k)[-k:]
+        candidate_logits = logits[candidates]
+        order = np.argsort(candidate_logits)[::-1]
+        candidates = candidates[order]
+        scaled = candidate_logits[order] / self.temperature
+
+        probs = np.exp(scaled - scaled[0])
+        probs /= probs.sum()
+        if self.top_p is not None and self.top_p < 1.0:
+            cutoff = int(np.searchsorted(np.cumsum(probs), self.top_p)) + 1
+            probs = probs[:cutoff] / probs[:cutoff].sum()
+            candidates = candidates[:cutoff]
+        return int(candidates[self.rng.choice(len(candidates), p=probs)])
+
+
+class BeamSearch:
+    """
+    Beam search over the fixed-sequence decoder.
+
+    The Hailo decoder has no KV cache, so every hypothesis costs one decoder run per step:
+    a width of 2-4 multiplies decoder time by roughly the same factor.
+
+    Parameters:
+    - width: Number of hypotheses kept per step.
+    - length_penalty: Finished hypotheses are ranked by log-probability / length ** length_penalty.
+    """
+
+    name = "beam"
+
+    def __init__(self, width=3, length_penalty=1.0):
+        self.width = width
+        self.length_penalty = length_penalty
+
+    def search(self, decoder, max_tokens, eos_token_id, repetition_penalty=None):
+        """
+        :param decoder: Object with load_tokens(tokens) and run_step(position) -> logits (1, vocab_size).
+        :param max_tokens: Maximum number of tokens to generate.
+        :param eos_token_id: End-of-transcript token.
+        :param repetition_penalty: Optional RepetitionPenalty applied before scoring.
+        :return: Best list of token IDs (including the EOS token if one was generated).
+        """
+        beams = [([], 0.0)]
+        finished = []
+        for position in range(max_tokens):
+            candidates = []
+            for tokens, score in beams:
+                decoder.load_tokens(tokens)
+                logits = decoder.run_step(position)[0]
+                if repetition_penalty is not None:
+                    logits = repetition_penalty(logits, tokens)
+                log_probs = log_softmax(logits)
+                top = np.argpartition(log_probs, -self.width)[-self.width:]
+                candidates.extend((score + log_probs[t], tokens + [int(t)]) for t in top)
+
+            candidates.sort(key=lambda c: c[0], reverse=True)
+            beams = []
+            for score, tokens in candidates:
+                if tokens[-1] == eos_token_id:
+                    finished.append((tokens, score))
+                else:
+                    beams.append((tokens, score))
+                if len(beams) == self.width:
+                    break
+            if len(finished) >= self.width or not beams:
+                break
+
+        finished.extend(beams)
+        best_tokens, _ = max(finished, key=lambda b: b[1] / max(1, len(b[0])) ** self.length_penalty)
+        return best_tokens
+
+
+def make_strategy(name="greedy", **kwargs):
+    """
+    Build a decoding strategy by name: "greedy", "sampling" or "beam".
+    """
+    strategies = {"greedy": GreedyStrategy, "sampling": SamplingStrategy, "beam": BeamSearch}
+    if name not in strategies:
+        raise ValueError(f"Unknown decoding strategy '{name}'. Choose from {sorted(strategies)}.")
+    return strategies[name](**kwargs)
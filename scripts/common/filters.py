@@ -0,0 +1,85 @@
+"""
+Streaming filters for noisy distance sensors.
+
+MedianKalman filters one channel one sample at a time: a median over the last k readings
+removes single bad echoes / laser glitches, then a 1-D Kalman filter smooths what is left. The
+Kalman state is just the distance (no velocity), its uncertainty grows with time between
+samples (process_noise, for the robot or the obstacle moving) and shrinks with each reading
+(measurement_noise, the sensor noise). Pure Python on a few floats: a few microseconds per sample.
+"""
+
+import math
+from collections import deque, namedtuple
+
+
+# value: filtered reading (None: no valid reading); confidence: 0..1
+Estimate = namedtuple("Estimate", ("value", "confidence"))
+
+
+class MedianKalman:
+    """
+    Median-of-k then 1-D Kalman filter for one sensor channel.
+
+    Parameters:
+    - k: Readings in the median window; it delays steps by (k - 1) / 2 samples.
+    - process_noise: Variance the distance can gain per second (units^2 / s).
+    - measurement_noise: Variance of one reading (units^2).
+    - low, high: Valid reading range (e.g. the laser's -1 for out of range); readings outside
+      it are skipped by the median. With most of the window invalid the output is None.
+    - gate: A median further than this many standard deviations from the estimate is taken as
+      a real change (an obstacle appearing), which the filter then follows at once instead of
+      averaging it away.
+    - tolerance: Error that still counts as right, for the confidence (units).
+
+    update() returns an Estimate whose confidence is the probability, by the Kalman variance,
+    that the true distance is within tolerance of the value, times the share of valid readings
+    in the window: near 1 for a settled estimate from clean readings, low right after a jump.
+    """
+
+    def __init__(self, k=3, process_noise=100.0, measurement_noise=4.0, low=None, high=None, gate=3.0,
+                 tolerance=3.0):
+        self.window = deque(maxlen=k)
+        self.q = process_noise
+        self.r = measurement_noise
+        self.low = low
+        self.high = high
+        self.gate2 = gate * gate
+        self.erf_scale = tolerance / math.sqrt(2)  # P(|error| < tolerance) = erf(tolerance / (sqrt(2) * std))
+        self.reset()
+
+    def reset(self):
+        self.window.clear()
+        self.x = None  # estimate
+        self.p = 0.0  # its variance
+        self.t = None
+
+    def update(self, t, z):
+        """
+        :param t: Time of the reading in seconds (time.monotonic()).
+        :param z: Reading (None, NaN or out of range: invalid).
+        :return: Estimate.
+        """
+        valid = z is not None and z == z and (self.low is None or z >= self.low) and (self.high is None or z <= self.high)
+        window = self.window
+        window.append(z if valid else None)
+        values = sorted(v for v in window if v is not None)
+        if len(values) * 2 < len(window):
+            self.x = None
+            return Estimate(None, 0.0)
+        # Lower median: with an even count, trust the closer distance
+        m = values[(len(values) - 1) // 2]
+
+        r = self.r
+        if self.x is None:
+            x, p = m, r
+        else:
+            x = self.x
+            p = self.p + self.q * max(t - self.t, 0.0)
+            innovation = m - x
+            if innovation * innovation > self.gate2 * (p + r):
+                p += innovation * innovation
+            gain = p / (p + r)
+            x += gain * innovation
+            p *= 1.0 - gain
+        self.x, self.p, self.t = x, p, t
+        return Estimate(x, len(values) / len(window) * math.erf(self.erf_scale / math.sqrt(p)))
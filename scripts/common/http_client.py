@@ -0,0 +1,247 @@
+"""
+Shared HTTP client for the chatbots (OpenRouter, Google TTS, ElevenLabs).
+
+One pooled requests.Session keeps TCP/TLS connections alive between turns. Failed requests
+are retried with jittered exponential backoff, every endpoint has its own (connect, read)
+timeout, and request latencies are collected in a histogram per endpoint. Idempotent requests
+(GET...) are retried after any connection error, timeout or 429/5xx; a POST (a chat completion
+or a synthesis, billed once the server starts on it) only when it was surely not processed:
+the connection could not be made, or a 429/503 with Retry-After.
+"""
+
+import asyncio
+import bisect
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+
+# (connect, read) timeouts in seconds, per endpoint name
+DEFAULT_TIMEOUTS = {
+    "openrouter": (5, 30),
+    "openrouter_stream": (5, 60),  # read timeout between chunks, not for the whole reply
+    "gtts": (5, 15),
+    "elevenlabs": (5, 30),
+    "default": (5, 30),
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class LatencyHistogram:
+    """
+    Request latencies in fixed log-spaced buckets (milliseconds).
+
+    Percentiles are read from the bucket upper bounds, so memory stays constant however
+    long the robot runs.
+    """
+
+    BUCKETS_MS = (10, 25, 50, 100, 200, 400, 800, 1600, 3200, 6400, 12800, float("inf"))
+
+    def __init__(self):
+        self.counts = [0] * len(self.BUCKETS_MS)
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, latency_ms, error=False):
+        self.counts[bisect.bisect_left(self.BUCKETS_MS, latency_ms)] += 1
+        self.count += 1
+        self.errors += int(error)
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (0-100)."""
+        if self.count == 0:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def summary(self):
+        return {
+            "requests": self.count,
+            "errors": self.errors,
+            "retries": self.retries,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": self.max_ms,
+        }
+
+    def format(self, width=30):
+        """Text histogram, one line per non-empty bucket."""
+        lines = []
+        peak = max(self.counts) or 1
+        lower = 0
+        for bound, count in zip(self.BUCKETS_MS, self.counts):
+            if count:
+                label = f"{lower:g}-{bound:g} ms" if bound != float("inf") else f">{lower:g} ms"
+                lines.append(f"{label:>16} | {'#' * max(1, round(width * count / peak))} {count}")
+            lower = bound
+        return "\n".join(lines)
+
+
+class HttpClient:
+    """
+    Pooled HTTP session with retries, per-endpoint timeouts and latency histograms.
+
+    Parameters:
+    - retries: Additional attempts after a failed request.
+    - backoff: Base delay in seconds; attempt n waits a random time in [0, backoff * 2**n].
+    - max_backoff: Upper bound of a single backoff delay.
+    - timeouts: Per-endpoint (connect, read) timeouts, merged over DEFAULT_TIMEOUTS.
+    - pool_maxsize: Connections kept alive per host.
+    """
+
+    def __init__(self, retries=2, backoff=0.25, max_backoff=4.0, timeouts=None, pool_maxsize=8):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def request(self, method, url, endpoint="default", **kwargs):
+        """
+        Send a request through the shared session.
+
+        :param endpoint: Endpoint name, selects the timeout and the histogram.
+        :param kwargs: Passed to requests (json, data, headers, stream...). An explicit
+                       timeout overrides the endpoint timeout.
+        :return: requests.Response. A 429/5xx response that is not retried (after the last
+                 retry, or not safe to resend) is returned as is and connection errors are raised.
+        """
+        kwargs.setdefault("timeout", self.timeouts.get(endpoint, self.timeouts["default"]))
+        return self._with_retries(endpoint, method.upper() in IDEMPOTENT_METHODS,
+                                  lambda: self.session.request(method, url, **kwargs))
+
+    def post(self, url, endpoint="default", **kwargs):
+        return self.request("POST", url, endpoint, **kwargs)
+
+    def get(self, url, endpoint="default", **kwargs):
+        return self.request("GET", url, endpoint, **kwargs)
+
+    def send(self, prepared_request, endpoint="default", **kwargs):
+        """
+        Send an already prepared request (e.g. built by a third-party library), with the same
+        retries and timeouts.
+        """
+        kwargs.setdefault("timeout", self.timeouts.get(endpoint, self.timeouts["default"]))
+        return self._with_retries(endpoint, prepared_request.method in IDEMPOTENT_METHODS,
+                                  lambda: self.session.send(prepared_request, **kwargs))
+
+    def _with_retries(self, endpoint, idempotent, send):
+        for attempt in range(self.retries + 1):
+            start = time.perf_counter()
+            try:
+                response = send()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                retry = attempt < self.retries and (idempotent or not_sent(e))
+                self._record(endpoint, start, error=True, retry=retry)
+                if not retry:
+                    raise
+                self._sleep(attempt)
+                continue
+
+            retry_after = response.headers.get("Retry-After")
+            retry_after = float(retry_after) if retry_after and retry_after.isdigit() else None
+            if idempotent:
+                retry = response.status_code in RETRY_STATUSES
+            else:
+                retry = response.status_code in (429, 503) and retry_after is not None
+            retry = retry and attempt < self.retries
+            self._record(endpoint, start, error=response.status_code >= 400, retry=retry)
+            if not retry:
+                return response
+            response.close()
+            self._sleep(attempt, retry_after)
+
+    def _sleep(self, attempt, retry_after=None):
+        # Full jitter: callers that failed together do not retry together
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        time.sleep(max(delay, min(retry_after or 0.0, self.max_backoff)))
+
+    def _record(self, endpoint, start, error=False, retry=False):
+        latency_ms = (time.perf_counter() - start) * 1000
+        with self.lock:
+            histogram = self.histograms.setdefault(endpoint, LatencyHistogram())
+            histogram.record(latency_ms, error)
+            histogram.retries += int(retry)
+
+    def stats(self):
+        """Latency summary per endpoint."""
+        with self.lock:
+            return {endpoint: h.summary() for endpoint, h in self.histograms.items()}
+
+    def report(self):
+        """Printable latency report with one histogram per endpoint."""
+        with self.lock:
+            sections = []
+            for endpoint, h in sorted(self.histograms.items()):
+                s = h.summary()
+                sections.append(
+                    f"🌐 {endpoint}: {s['requests']} requests, {s['errors']} errors, {s['retries']} retries | "
+                    f"mean {s['mean_ms']:.0f} ms, p50 ≤{s['p50_ms']:.0f} ms, p95 ≤{s['p95_ms']:.0f} ms, "
+                    f"max {s['max_ms']:.0f} ms\n{h.format()}"
+                )
+            return "\n".join(sections)
+
+    def close(self):
+        self.session.close()
+
+
+def not_sent(error):
+    """True if a requests error happened before the request reached the server (no connection)."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+class AsyncHttpClient:
+    """
+    asyncio front end for an HttpClient: requests run in worker threads on the same pooled
+    session, so sync and async callers share connections, retries and histograms.
+    """
+
+    def __init__(self, client=None):
+        self.client = client or get_client()
+
+    async def request(self, method, url, endpoint="default", **kwargs):
+        return await asyncio.to_thread(self.client.request, method, url, endpoint, **kwargs)
+
+    async def post(self, url, endpoint="default", **kwargs):
+        return await self.request("POST", url, endpoint, **kwargs)
+
+    async def get(self, url, endpoint="default", **kwargs):
+        return await self.request("GET", url, endpoint, **kwargs)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    The process-wide HttpClient, created on first use.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
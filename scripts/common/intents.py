@@ -0,0 +1,229 @@
+"""
+Local intent fast-path for voice commands.
+
+Transcripts like "move forward", "stop!" or "turn on the lights" are matched against a word
+trie of command phrases and executed right away (Arduino commands plus a canned reply), without
+the LLM round-trip. Whisper spelling variants ("forwards", "for word") are fixed by fuzzy
+matching each unknown word against the trie vocabulary. An utterance is only treated as a
+command when the matched phrases cover all of its words except fillers ("please", "KIDA"...);
+anything else is open-ended chat and falls through to the LLM.
+"""
+
+import difflib
+import re
+import threading
+import time
+from functools import lru_cache
+
+
+NUMBER = "<number>"  # trie slot matching a number, passed to the command template
+FILLER_WORDS = frozenset({
+    "kida", "hey", "hi", "please", "now", "can", "could", "would", "you", "will", "the", "a", "an",
+    "ok", "okay", "just", "then", "and", "to", "up", "your", "my", "robot", "tank",
+})
+
+
+class Intent:
+    """
+    A local command.
+
+    Parameters:
+    - name: Intent name (stats, logs).
+    - phrases: Trigger phrases; "<number>" is a numeric slot, e.g. "set speed to <number>".
+    - commands: (device, command) pairs for arduino.send_command; "{number}" is replaced by the
+      slot value.
+    - reply: Canned line spoken after the commands are sent.
+    - stop: End the conversation after replying.
+    """
+
+    def __init__(self, name, phrases, commands=(), reply=None, stop=False):
+        self.name = name
+        self.phrases = phrases
+        self.commands = commands
+        self.reply = reply
+        self.stop = stop
+
+
+# Commands understood by ardiuno00 (motors, servo, LEDs) and ardiuno01 (lights). Words that
+# are whole replies in chat ("right", "back", "go", "go ahead", "wait") are not triggers; the
+# directions need a verb ("turn right", "move back"), so "Right." or "Wait..." goes to the LLM.
+DEFAULT_INTENTS = (
+    Intent("stop", ["stop", "halt", "freeze", "brake", "stop moving", "stop it", "hold on"],
+           [("dev00", "STOP")], "Stopping."),
+    Intent("forward", ["forward", "move forward", "go forward", "drive forward", "go straight", "move ahead",
+                       "drive ahead"],
+           [("dev00", "FORWARD")], "Rolling out."),
+    Intent("backward", ["backward", "backwards", "move back", "go back", "drive back", "reverse", "back up"],
+           [("dev00", "BACKWARD")], "Backing up."),
+    Intent("left", ["turn left", "go left"], [("dev00", "LEFT")], "Turning left."),
+    Intent("right", ["turn right", "go right"], [("dev00", "RIGHT")], "Turning right."),
+    Intent("scan_left", ["look left", "scan left"], [("dev00", "SCANLEFT")], "Looking left."),
+    Intent("scan_right", ["look right", "scan right"], [("dev00", "SCANRIGHT")], "Looking right."),
+    Intent("speed", ["speed <number>", "set speed <number>", "set speed to <number>", "set the speed to <number>"],
+           [("dev00", "SPEED:{number}")], "Speed set."),
+    Intent("lights_on", ["lights on", "turn on lights", "turn on the lights", "turn the lights on", "headlights on"],
+           [("dev01", "LIGHT_FRONT_ON")], "Lights on."),
+    Intent("lights_off", ["lights off", "turn off lights", "turn off the lights", "turn the lights off",
+                          "headlights off"],
+           [("dev01", "LIGHT_FRONT_OFF")], "Lights off."),
+    Intent("rainbow", ["rainbow", "party mode", "party time"], [("dev00", "RAINBOW")], "Party mode, baby."),
+    Intent("quit", ["quit", "exit", "shutdown", "shut down"], [("dev00", "STOP")],
+           "Going dark. Goodbye, commander.", stop=True),
+)
+
+
+def normalize(text):
+    """Lowercase words without punctuation ("Move forward!" -> ["move", "forward"])."""
+    return re.sub(r"[^\w\s']", " ", text.lower()).replace("'", "").split()
+
+
+class IntentMatch:
+    def __init__(self, intent, number=None, elapsed_ms=0.0):
+        self.intent = intent
+        self.number = number
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def commands(self):
+        return [(device, command.format(number=self.number)) for device, command in self.intent.commands]
+
+    @property
+    def reply(self):
+        return self.intent.reply
+
+
+class IntentRouter:
+    """
+    Matches transcripts to intents and keeps hit-rate / latency stats.
+
+    Parameters:
+    - intents: Intent list (default DEFAULT_INTENTS).
+    - send: Function (device, command), normally arduino.send_command.
+    - fuzzy_cutoff: Minimum difflib similarity for correcting an unknown word.
+    - number_range: (min, max) the numeric slot is clamped to.
+    """
+
+    def __init__(self, intents=DEFAULT_INTENTS, send=None, fuzzy_cutoff=0.8, number_range=(0, 255)):
+        self.intents = list(intents)
+        self.send = send
+        self.number_range = number_range
+        self.trie = {}
+        self.vocabulary = set()
+        for intent in self.intents:
+            for phrase in intent.phrases:
+                node = self.trie
+                for word in phrase.split():
+                    node = node.setdefault(word, {})
+                    if word != NUMBER:
+                        self.vocabulary.add(word)
+                node[None] = intent
+        self.fillers = FILLER_WORDS
+        self._correct = lru_cache(maxsize=1024)(self._closest_word)
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.lock = threading.Lock()
+        self.hits = {}
+        self.lookups = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def replies(self):
+        """Canned replies, e.g. to pre-warm the TTS cache."""
+        return [intent.reply for intent in self.intents if intent.reply]
+
+    def match(self, text):
+        """
+        :return: IntentMatch, or None if the transcript is not a (single) command.
+        """
+        start = time.perf_counter()
+        result = self._match(normalize(text))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self.lock:
+            self.lookups += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            if result is not None:
+                self.hits[result[0].name] = self.hits.get(result[0].name, 0) + 1
+        return None if result is None else IntentMatch(*result, elapsed_ms=elapsed_ms)
+
+    def execute(self, match):
+        """Send the commands of a match."""
+        for device, command in match.commands:
+            if self.send is not None:
+                self.send(device, command)
+
+    def _closest_word(self, word):
+        if len(word) < 3:
+            return None
+        close = difflib.get_close_matches(word, self.vocabulary, n=1, cutoff=self.fuzzy_cutoff)
+        return close[0] if close else None
+
+    def _canonical(self, words):
+        """Map words onto the trie vocabulary: exact, split-word repair ("for word"), then fuzzy."""
+        out = []
+        i = 0
+        while i < len(words):
+            word = words[i]
+            if word in self.vocabulary or word.isdigit() or word in self.fillers:
+                out.append(word)
+            elif i + 1 < len(words) and words[i] + words[i + 1] in self.vocabulary:
+                out.append(words[i] + words[i + 1])
+                i += 1
+            elif i + 1 < len(words) and self._correct(words[i] + words[i + 1]) and not self._correct(word):
+                out.append(self._correct(words[i] + words[i + 1]))
+                i += 1
+            else:
+                out.append(self._correct(word) or word)
+            i += 1
+        return out
+
+    def _match(self, words):
+        words = self._canonical(words)
+        found = None
+        number = None
+        i = 0
+        while i < len(words):
+            # Longest phrase starting at i
+            node, j, best, slot = self.trie, i, None, None
+            while j < len(words):
+                word = words[j]
+                if word in node:
+                    node = node[word]
+                elif NUMBER in node and word.isdigit():
+                    node, slot = node[NUMBER], int(word)
+                else:
+                    break
+                j += 1
+                if None in node:
+                    best = (node[None], j, slot)
+            if best is not None:
+                intent, end, slot = best
+                if found is not None and found is not intent:
+                    return None  # two different commands: let the LLM sort it out
+                found = intent
+                if slot is not None:
+                    number = min(max(slot, self.number_range[0]), self.number_range[1])
+                i = end
+            elif words[i] in self.fillers:
+                i += 1
+            else:
+                return None  # a word no command explains: open-ended chat
+        return None if found is None else (found, number)
+
+    def stats(self):
+        with self.lock:
+            hits = sum(self.hits.values())
+            return {
+                "lookups": self.lookups,
+                "hits": hits,
+                "hit_rate": hits / self.lookups if self.lookups else 0.0,
+                "mean_ms": self.total_ms / self.lookups if self.lookups else 0.0,
+                "max_ms": self.max_ms,
+                "by_intent": dict(self.hits),
+            }
+
+    def report(self):
+        s = self.stats()
+        by_intent = ", ".join(f"{name} {count}" for name, count in sorted(s["by_intent"].items()))
+        return (f"⚡ Local intents: {s['hits']}/{s['lookups']} utterances ({s['hit_rate']:.0%}) | "
+                f"match mean {s['mean_ms'] * 1000:.0f} µs, max {s['max_ms'] * 1000:.0f} µs"
+                + (f" | {by_intent}" if by_intent else ""))
@@ -0,0 +1,291 @@
+"""
+Streaming LLM replies for the chatbots: read the OpenRouter (OpenAI-compatible) SSE stream,
+cut it into sentences and synthesize/play each sentence while the rest is still generating.
+"""
+
+import json
+import re
+import threading
+import time
+from queue import Queue
+from common.http_client import get_client
+from common.playback import AudioPlayer
+from common.tts_cache import get_cache
+
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# End of a sentence: terminal punctuation (plus closing quotes/brackets) followed by whitespace,
+# or a line break
+SENTENCE_END = re.compile(r"[.!?…]+[\"')\]*]*\s+|\n+")
+
+
+def stream_chat(api_key, messages, model="meta-llama/llama-3-8b-instruct", max_tokens=120, temperature=0.95,
+                url=OPENROUTER_URL, client=None):
+    """
+    Request a chat completion with stream=True and yield the reply as it arrives.
+
+    Parameters:
+    - api_key: OpenRouter API key.
+    - messages: Chat messages ({"role", "content"} dicts).
+    - url: Completions endpoint; point it at mock_llm_server.py to test offline.
+    - client: HttpClient to send the request with (default: the shared one).
+
+    Yields:
+    - Text deltas, in order.
+    """
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "HTTP-Referer": "http://localhost",
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream",
+    }
+    data = {
+        "model": model,
+        "messages": messages,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "stream": True,
+    }
+    client = client or get_client()
+    with client.post(url, endpoint="openrouter_stream", headers=headers, json=data, stream=True) as response:
+        if response.status_code != 200:
+            raise RuntimeError(f"LLM request failed ({response.status_code}): {response.text[:200]}")
+        # Decode as UTF-8 ourselves: requests assumes ISO-8859-1 for text/event-stream
+        for raw in response.iter_lines():
+            line = raw.decode("utf-8")
+            # SSE: "data: {...}" events; lines starting with ':' are keep-alive comments
+            if not line or not line.startswith("data:"):
+                continue
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                return
+            event = json.loads(payload)
+            if "error" in event:
+                raise RuntimeError(event["error"].get("message", "LLM stream error"))
+            for choice in event.get("choices", []):
+                delta = choice.get("delta", {}).get("content")
+                if delta:
+                    yield delta
+
+
+class SentenceSplitter:
+    """
+    Incremental sentence splitter: feed() text deltas, get back the sentences they complete.
+
+    Parameters:
+    - min_length: Shorter sentences are merged with the next one, so TTS is not called for "Oh."
+    """
+
+    def __init__(self, min_length=12):
+        self.min_length = min_length
+        self.buffer = ""
+
+    def feed(self, delta):
+        """Add a delta; returns the list of sentences completed by it (stripped)."""
+        self.buffer += delta
+        sentences = []
+        search_from = 0
+        while True:
+            match = SENTENCE_END.search(self.buffer, search_from)
+            if match is None:
+                break
+            if len(self.buffer[:match.end()].strip()) < self.min_length:
+                search_from = match.end()
+                continue
+            sentences.append(self.buffer[:match.end()].strip())
+            self.buffer = self.buffer[match.end():]
+            search_from = 0
+        return sentences
+
+    def flush(self):
+        """The unterminated remainder, or None if there is nothing left."""
+        rest, self.buffer = self.buffer.strip(), ""
+        return rest or None
+
+
+def iter_sentences(deltas, min_length=12):
+    """
+    Regroup a stream of text deltas into sentences.
+
+    Parameters:
+    - deltas: Iterable of text fragments.
+    - min_length: Shorter sentences are merged with the next one, so TTS is not called for "Oh."
+
+    Yields:
+    - Sentences, stripped. The remainder is yielded when the stream ends.
+    """
+    splitter = SentenceSplitter(min_length)
+    for delta in deltas:
+        yield from splitter.feed(delta)
+    rest = splitter.flush()
+    if rest:
+        yield rest
+
+
+class SpeechPipeline:
+    """
+    Synthesize and play sentences in order on two worker threads, so sentence n+1 is being
+    synthesized while sentence n plays.
+
+    Parameters:
+    - synthesize: Function text -> audio (whatever play() accepts).
+    - play: Function audio -> None, blocking until playback ends.
+    - prepare_ahead: Maximum number of synthesized sentences waiting for playback.
+    """
+
+    def __init__(self, synthesize, play, prepare_ahead=2):
+        self.synthesize = synthesize
+        self.play = play
+        self.start_time = time.perf_counter()
+        self.first_audio_time = None
+        self.errors = []
+        self.sentences = Queue()
+        self.audio = Queue(maxsize=prepare_ahead)
+        self.synthesis_thread = threading.Thread(target=self._synthesis_loop, daemon=True)
+        self.playback_thread = threading.Thread(target=self._playback_loop, daemon=True)
+        self.synthesis_thread.start()
+        self.playback_thread.start()
+
+    def say(self, text):
+        """Queue a sentence; returns immediately."""
+        self.sentences.put(text)
+
+    def close(self):
+        """Wait until every queued sentence has been played."""
+        self.sentences.put(None)
+        self.synthesis_thread.join()
+        self.playback_thread.join()
+
+    @property
+    def time_to_first_audio(self):
+        """Seconds from creation to the start of the first playback, or None if nothing played."""
+        return None if self.first_audio_time is None else self.first_audio_time - self.start_time
+
+    def _synthesis_loop(self):
+        while True:
+            text = self.sentences.get()
+            if text is None:
+                self.audio.put(None)
+                return
+            try:
+                self.audio.put(self.synthesize(text))
+            except Exception as e:
+                print("Voice error:", e)
+                self.errors.append(e)
+
+    def _playback_loop(self):
+        while True:
+            audio = self.audio.get()
+            if audio is None:
+                return
+            if self.first_audio_time is None:
+                self.first_audio_time = time.perf_counter()
+            try:
+                self.play(audio)
+            except Exception as e:
+                print("Voice error:", e)
+                self.errors.append(e)
+
+
+# === CHATBOT HELPERS ===
+
+# Stream the LLM reply and start speaking after the first sentence
+STREAM_LLM = True
+
+# Expression tags the persona puts in its replies; shown on screen, not spoken
+EXPRESSION = re.compile(r"\b(wink|smile|frown|blush)\b")
+FALLBACK_REPLY = " I'm glitching hard, babe. Try again later."
+
+
+def ask_llm_stream(api_key, system_prompt, prompt, url=OPENROUTER_URL, log=print):
+    """Yield the LLM reply to one prompt as it is generated; FALLBACK_REPLY if the request fails."""
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt}
+    ]
+    try:
+        yield from stream_chat(api_key, messages, url=url)
+    except Exception as e:
+        log(f"LLM error: {e}")
+        yield FALLBACK_REPLY
+
+
+def speak_sentences(deltas, say, log=print):
+    """
+    Regroup a streamed reply into sentences, drop the expression tags and asterisks and say()
+    each sentence.
+
+    Returns:
+    - The first expression tag of the reply, or None.
+    """
+    expression = None
+    for sentence in iter_sentences(deltas):
+        expression_match = EXPRESSION.search(sentence)
+        if expression_match and expression is None:
+            expression = expression_match.group(1)
+            log(f"Expression: {expression}")
+        spoken = EXPRESSION.sub("", sentence).replace("*", "").strip()
+        if spoken:
+            log(f"KIDA says: {spoken}")
+            say(spoken)
+    return expression
+
+
+class CachedVoice:
+    """
+    Text to speech through the phrase cache (common.tts_cache), played on an AudioPlayer.
+
+    Parameters:
+    - player: common.playback.AudioPlayer.
+    - cache: common.tts_cache cache.
+    - engine, voice: Cache keys of the TTS service and voice, e.g. ("gtts", "en").
+    - tts: Function text -> audio bytes, called on a cache miss.
+    """
+
+    def __init__(self, player, cache, engine, voice, tts):
+        self.player = player
+        self.cache = cache
+        self.engine = engine
+        self.voice = voice
+        self.tts = tts
+
+    def synthesize(self, text):
+        return self.player.decode(self.cache.get_bytes(text, self.engine, self.voice, lambda: self.tts(text)))
+
+    def play_audio(self, pcm):
+        self.player.play(pcm).wait()
+
+    def queue_audio(self, pcm):
+        """Queue a sentence behind the one playing; returns when it starts, so sentences play back to back."""
+        self.player.play(pcm).started.wait()
+
+    def prewarm(self, phrases):
+        self.cache.prewarm(phrases, self.engine, self.voice, self.tts)
+
+    def speak_stream(self, deltas, log=print):
+        """Speak a streamed reply sentence by sentence: the next sentence is synthesized while one plays."""
+        speech = SpeechPipeline(self.synthesize, self.queue_audio)
+        expression = speak_sentences(deltas, speech.say, log)
+        speech.close()
+        self.player.wait_idle()
+        if speech.time_to_first_audio is not None:
+            log(f"⏱️ First audio after {speech.time_to_first_audio:.2f}s")
+        return expression
+
+
+def make_voice(engine, voice, synthesize):
+    """
+    The chatbots' speech output: the shared HTTP session (keep-alive connections, retries,
+    latency stats), the on-disk phrase cache and one AudioPlayer stream.
+
+    Parameters:
+    - engine, voice: Cache keys of the TTS service and voice, e.g. ("gtts", "en").
+    - synthesize: Function (text, client) -> audio bytes, called on a cache miss with the
+      shared HttpClient.
+
+    Returns:
+    - (HttpClient, CachedVoice)
+    """
+    http = get_client()
+    return http, CachedVoice(AudioPlayer(), get_cache(), engine, voice, lambda text: synthesize(text, http))
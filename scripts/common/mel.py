@@ -0,0 +1,273 @@
+"""NumPy log-Mel spectrogram frontend for Whisper, without torch."""
+
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+
+# Same hyperparameters as common.audio_utils, duplicated so this module never imports torch
+SAMPLE_RATE = 16000
+N_FFT = 400
+HOP_LENGTH = 160
+
+
+@lru_cache(maxsize=None)
+def hann_window(n_fft: int = N_FFT) -> np.ndarray:
+    """
+    Periodic Hann window, identical to torch.hann_window(n_fft).
+    """
+    n = np.arange(n_fft, dtype=np.float64)
+    window = 0.5 - 0.5 * np.cos(2.0 * np.pi * n / n_fft)
+    window = window.astype(np.float32)
+    window.flags.writeable = False
+    return window
+
+
+@lru_cache(maxsize=None)
+def mel_filters(n_mels: int) -> np.ndarray:
+    """
+    Load the mel filterbank matrix (n_mels, N_FFT // 2 + 1) from assets/mel_filters.npz.
+    """
+    assert n_mels in {80, 128}, f"Unsupported n_mels: {n_mels}"
+
+    filters_path = os.path.join(os.path.dirname(__file__), "assets", "mel_filters.npz")
+    with np.load(filters_path, allow_pickle=False) as f:
+        filters = np.ascontiguousarray(f[f"mel_{n_mels}"], dtype=np.float32)
+    filters.flags.writeable = False
+    return filters
+
+
+def frame_signal(padded: np.ndarray, n_fft: int = N_FFT, hop_length: int = HOP_LENGTH) -> np.ndarray:
+    """
+    Read-only (n_frames, n_fft) view of overlapping frames, built with stride tricks (no copy).
+    """
+    n_frames = 1 + (len(padded) - n_fft) // hop_length
+    stride = padded.strides[0]
+    return np.lib.stride_tricks.as_strided(
+        padded, shape=(n_frames, n_fft), strides=(hop_length * stride, stride), writeable=False
+    )
+
+
+class MelFrontend:
+    """
+    Log-Mel spectrogram computed with numpy.fft.rfft.
+
+    Matches common.audio_utils.log_mel_spectrogram (center=True, reflect padding, periodic
+    Hann window, last STFT frame dropped). Scratch buffers are kept between calls and only
+    reallocated when the input length changes, which is once for fixed-length chunks.
+    An instance is not thread-safe; use one per thread.
+    """
+
+    def __init__(self, n_mels: int = 80):
+        self.n_mels = n_mels
+        self.window = hann_window(N_FFT)
+        self.filters = mel_filters(n_mels)
+        self._n_samples = None
+
+    def _allocate(self, n_samples):
+        pad = N_FFT // 2
+        n_frames = 1 + n_samples // HOP_LENGTH
+        self._padded = np.zeros(n_samples + 2 * pad, dtype=np.float32)
+        self._windowed = np.zeros((n_frames, N_FFT), dtype=np.float32)
+        self._power = np.zeros((n_frames - 1, N_FFT // 2 + 1), dtype=np.float32)
+        self._mel = np.zeros((self.n_mels, n_frames - 1), dtype=np.float32)
+        self._n_samples = n_samples
+
+    def _reflect_pad(self, audio):
+        pad = N_FFT // 2
+        n = len(audio)
+        padded = self._padded
+        if n <= pad + 1:
+            padded[:] = np.pad(audio, pad, mode="reflect")
+            return padded
+        padded[pad:pad + n] = audio
+        padded[:pad] = audio[pad:0:-1]
+        padded[pad + n:] = audio[n - 2:n - 2 - pad:-1]
+        return padded
+
+    def power_spectrum(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Squared STFT magnitudes, shape (n_frames, N_FFT // 2 + 1). The last frame is dropped.
+        The returned array is reused by the next call.
+        """
+        audio = np.asarray(audio, dtype=np.float32)
+        if len(audio) != self._n_samples:
+            self._allocate(len(audio))
+
+        frames = frame_signal(self._reflect_pad(audio))
+        np.multiply(frames, self.window, out=self._windowed)
+        spectrum = np.fft.rfft(self._windowed[:-1], axis=-1)
+        np.square(spectrum.real, out=self._power)
+        self._power += np.square(spectrum.imag)
+        return self._power
+
+    def __call__(self, audio: np.ndarray, padding: int = 0) -> np.ndarray:
+        """
+        Compute the log-Mel spectrogram.
+
+        Parameters
+        ----------
+        audio: np.ndarray, shape = (n_samples,)
+            Audio waveform in 16 kHz
+
+        padding: int
+            Number of zero samples to pad to the right
+
+        Returns
+        -------
+        np.ndarray, shape = (n_mels, n_frames)
+            A new float32 array that contains the Mel spectrogram
+        """
+        if padding > 0:
+            audio = np.pad(audio, (0, padding))
+        power = self.power_spectrum(audio)
+        np.matmul(self.filters, power.T, out=self._mel)
+        return normalize_log_mel(self._mel)
+
+
+def normalize_log_mel(mel_spec: np.ndarray) -> np.ndarray:
+    """
+    Apply Whisper's log10 compression, 8 dB dynamic range clamp and rescaling.
+    """
+    log_spec = np.log10(np.maximum(mel_spec, 1e-10))
+    np.maximum(log_spec, log_spec.max() - 8.0, out=log_spec)
+    log_spec += 4.0
+    log_spec /= 4.0
+    return log_spec
+
+
+_local = threading.local()
+
+
+def log_mel_spectrogram(audio: np.ndarray, n_mels: int = 80, padding: int = 0) -> np.ndarray:
+    """
+    Compute the log-Mel spectrogram with a per-thread cached MelFrontend.
+
+    Drop-in replacement for common.audio_utils.log_mel_spectrogram on NumPy input.
+    """
+    frontends = getattr(_local, "frontends", None)
+    if frontends is None:
+        frontends = _local.frontends = {}
+    frontend = frontends.get(n_mels)
+    if frontend is None:
+        frontend = frontends[n_mels] = MelFrontend(n_mels)
+    return frontend(audio, padding=padding)
+
+
+def pad_or_trim(array: np.ndarray, length: int) -> np.ndarray:
+    """
+    Pad or trim a 1-D audio array to `length` samples.
+    """
+    if len(array) > length:
+        return array[:length]
+    if len(array) < length:
+        return np.pad(array, (0, length - len(array)))
+    return array
+
+
+LOG_MEL_FLOOR = -10.0  # log10 of the 1e-10 clamp, i.e. the value of digital silence
+
+
+class IncrementalMelBuffer:
+    """
+    Rolling log10-Mel matrix that only computes STFT frames for newly appended audio.
+
+    Frame f is centered on sample start_sample + f * HOP_LENGTH; the stream is zero-padded
+    on the left instead of reflect-padded. Columns are written twice into a buffer of
+    2 * capacity_frames, so any window of up to capacity_frames recent frames is a
+    contiguous view and can be sliced without copying.
+
+    Compared with computing each overlapping chunk on its own, frames near chunk edges see
+    the neighbouring audio instead of reflect/zero padding; everything else is identical.
+    """
+
+    def __init__(self, capacity_frames: int = 3000, n_mels: int = 80):
+        self.capacity = capacity_frames
+        self.n_mels = n_mels
+        self.window = hann_window(N_FFT)
+        self.filters = mel_filters(n_mels)
+        self._log_mel = np.full((n_mels, 2 * capacity_frames), LOG_MEL_FLOOR, dtype=np.float32)
+        self.reset()
+
+    def reset(self, start_sample: int = 0):
+        """
+        Drop all frames and restart the stream at the given absolute sample index.
+        """
+        self.start_sample = start_sample
+        self.frames_written = 0
+        self._pending = np.zeros(N_FFT // 2, dtype=np.float32)
+
+    def append(self, samples: np.ndarray) -> int:
+        """
+        Append audio and compute the STFT frames it completes.
+
+        :return: Number of new frames.
+        """
+        pending = np.concatenate([self._pending, np.asarray(samples, dtype=np.float32)])
+        if len(pending) < N_FFT:
+            self._pending = pending
+            return 0
+
+        frames = frame_signal(pending)
+        n_frames = len(frames)
+        spectrum = np.fft.rfft(frames * self.window, axis=-1)
+        power = np.square(spectrum.real, dtype=np.float32)
+        power += np.square(spectrum.imag)
+        log_mel = np.log10(np.maximum(self.filters @ power.T, 1e-10))
+        self._write(log_mel)
+
+        self._pending = pending[n_frames * HOP_LENGTH:]
+        return n_frames
+
+    def _write(self, columns):
+        n_columns = columns.shape[1]
+        if n_columns > self.capacity:
+            self.frames_written += n_columns - self.capacity
+            columns = columns[:, -self.capacity:]
+            n_columns = self.capacity
+
+        pos = self.frames_written % self.capacity
+        first = min(n_columns, self.capacity - pos)
+        for base in (0, self.capacity):
+            self._log_mel[:, base + pos:base + pos + first] = columns[:, :first]
+            self._log_mel[:, base:base + n_columns - first] = columns[:, first:]
+        self.frames_written += n_columns
+
+    def frame_index(self, sample: int) -> int:
+        """
+        Index of the frame centered on (or just before) an absolute sample index.
+        """
+        return (sample - self.start_sample) // HOP_LENGTH
+
+    def view(self, start_frame: int, n_frames: int) -> np.ndarray:
+        """
+        Read-only (n_mels, n_frames) view of un-normalized log10-Mel frames, without copying.
+        The frames must still be in the buffer and already computed.
+        """
+        oldest = max(0, self.frames_written - self.capacity)
+        if start_frame < oldest or start_frame + n_frames > self.frames_written:
+            raise IndexError(f"Frames [{start_frame}, {start_frame + n_frames}) not in buffer "
+                             f"[{oldest}, {self.frames_written})")
+        pos = start_frame % self.capacity
+        view = self._log_mel[:, pos:pos + n_frames]
+        view.flags.writeable = False
+        return view
+
+    def chunk(self, start_frame: int, n_frames: int) -> np.ndarray:
+        """
+        Normalized log-Mel chunk of exactly n_frames, like log_mel_spectrogram on a zero-padded chunk.
+        Frames that were evicted or not computed yet are treated as silence.
+
+        :return: New float32 array of shape (n_mels, n_frames).
+        """
+        out = np.full((self.n_mels, n_frames), LOG_MEL_FLOOR, dtype=np.float32)
+        first = max(start_frame, self.frames_written - self.capacity, 0)
+        last = min(start_frame + n_frames, self.frames_written)
+        if last > first:
+            out[:, first - start_frame:last - start_frame] = self.view(first, last - first)
+        np.maximum(out, out.max() - 8.0, out=out)
+        out += 4.0
+        out /= 4.0
+        return out
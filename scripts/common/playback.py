@@ -0,0 +1,186 @@
+"""
+In-memory audio playback for the chatbots.
+
+TTS output is decoded to float32 PCM in memory and queued on one long-lived sounddevice output
+stream. Clips follow each other in the same audio callback, so consecutive sentences play
+without a gap, and each clip signals its start and end with events instead of being polled.
+"""
+
+import io
+import subprocess
+import threading
+import time
+from collections import deque
+import numpy as np
+
+
+PLAYBACK_RATE = 24000  # gTTS output rate; other sources are resampled to it
+
+
+def decode_audio(source, sample_rate=PLAYBACK_RATE, channels=1):
+    """
+    Decode an audio file (mp3, wav...) to PCM.
+
+    :param source: Encoded bytes, or a file path.
+    :param sample_rate: Output rate; the audio is resampled if needed.
+    :param channels: Output channels (1: down-mixed to mono).
+    :return: float32 array of shape (frames, channels).
+    """
+    try:
+        import soundfile as sf
+        pcm, rate = sf.read(io.BytesIO(source) if isinstance(source, bytes) else source,
+                            dtype="float32", always_2d=True)
+    except (ImportError, RuntimeError):
+        # libsndfile < 1.1 cannot read mp3: let ffmpeg decode and resample
+        return _decode_ffmpeg(source, sample_rate, channels)
+
+    if pcm.shape[1] != channels:
+        pcm = np.repeat(pcm.mean(axis=1, keepdims=True), channels, axis=1)
+    if rate != sample_rate and len(pcm):
+        frames = int(round(len(pcm) * sample_rate / rate))
+        positions = np.arange(frames) * (rate / sample_rate)
+        pcm = np.stack([np.interp(positions, np.arange(len(pcm)), pcm[:, c]) for c in range(channels)], axis=1)
+    return np.ascontiguousarray(pcm, dtype=np.float32)
+
+
+def _decode_ffmpeg(source, sample_rate, channels):
+    data = source if isinstance(source, bytes) else None
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", "pipe:0" if data is not None else source,
+           "-f", "f32le", "-ac", str(channels), "-ar", str(sample_rate), "-"]
+    try:
+        out = subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='replace')}") from e
+    return np.frombuffer(out, np.float32).reshape(-1, channels).copy()
+
+
+class Clip:
+    """A queued PCM buffer. started/done are set by the audio callback."""
+
+    def __init__(self, pcm):
+        self.pcm = pcm
+        self.position = 0
+        self.started = threading.Event()
+        self.done = threading.Event()
+        self.cancelled = False
+        self.start_time = None
+
+    def wait(self, timeout=None):
+        """Block until the clip has been played (or cancelled)."""
+        return self.done.wait(timeout)
+
+
+class AudioPlayer:
+    """
+    Queue of PCM clips played back to back on a single output stream.
+
+    Parameters:
+    - sample_rate: Stream rate; clips must be decoded at this rate (see decode_audio).
+    - channels: Stream channels.
+    - blocksize: Frames per audio callback (latency vs. CPU).
+    - device: sounddevice output device (None: default).
+
+    The stream is opened on the first play() and kept open; it outputs silence while the
+    queue is empty.
+    """
+
+    def __init__(self, sample_rate=PLAYBACK_RATE, channels=1, blocksize=1024, device=None):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.device = device
+        self.clips = deque()
+        self.current = None
+        self.lock = threading.Lock()
+        self.stream_lock = threading.Lock()
+        self.idle = threading.Event()
+        self.idle.set()
+        self.stream = None
+        self.underflows = 0
+
+    def decode(self, source):
+        """Decode TTS output (bytes or path) for this player."""
+        return decode_audio(source, self.sample_rate, self.channels)
+
+    def play(self, pcm):
+        """
+        Queue a clip behind the ones already playing; returns immediately.
+
+        :param pcm: float32 array (frames, channels) or (frames,) at the player rate.
+        :return: Clip; wait on clip.started / clip.done (or clip.wait()).
+        """
+        pcm = np.asarray(pcm, dtype=np.float32)
+        if pcm.ndim == 1:
+            pcm = pcm[:, None]
+        if pcm.shape[1] != self.channels:
+            pcm = np.repeat(pcm.mean(axis=1, keepdims=True), self.channels, axis=1)
+        clip = Clip(pcm)
+        self._ensure_stream()
+        with self.lock:
+            self.idle.clear()
+            self.clips.append(clip)
+        return clip
+
+    def play_and_wait(self, pcm):
+        self.play(pcm).wait()
+
+    def wait_idle(self, timeout=None):
+        """Block until every queued clip has been played."""
+        return self.idle.wait(timeout)
+
+    def stop(self):
+        """Drop the current and queued clips; their done events are set with cancelled=True."""
+        with self.lock:
+            dropped = list(self.clips)
+            self.clips.clear()
+            if self.current is not None:
+                dropped.append(self.current)
+                self.current = None
+            self.idle.set()
+        for clip in dropped:
+            clip.cancelled = True
+            clip.started.set()
+            clip.done.set()
+
+    def close(self):
+        self.stop()
+        with self.stream_lock:
+            if self.stream is not None:
+                self.stream.stop()
+                self.stream.close()
+                self.stream = None
+
+    def _ensure_stream(self):
+        with self.stream_lock:
+            if self.stream is not None:
+                return
+            import sounddevice as sd
+            stream = sd.OutputStream(samplerate=self.sample_rate, channels=self.channels, dtype="float32",
+                                     blocksize=self.blocksize, device=self.device, callback=self._callback)
+            stream.start()
+            self.stream = stream
+
+    def _callback(self, outdata, frames, time_info, status):
+        if status.output_underflow:
+            self.underflows += 1
+        filled = 0
+        with self.lock:
+            while filled < frames:
+                clip = self.current
+                if clip is None:
+                    if not self.clips:
+                        break
+                    clip = self.current = self.clips.popleft()
+                    clip.start_time = time.perf_counter()
+                    clip.started.set()
+                n = min(frames - filled, len(clip.pcm) - clip.position)
+                outdata[filled:filled + n] = clip.pcm[clip.position:clip.position + n]
+                clip.position += n
+                filled += n
+                if clip.position >= len(clip.pcm):
+                    # Handed to the device; it is audible for one more output latency
+                    self.current = None
+                    clip.done.set()
+            if self.current is None and not self.clips:
+                self.idle.set()
+        outdata[filled:] = 0
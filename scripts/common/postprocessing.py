@@ -2,87 +2,146 @@
 
 import numpy as np
 import re
+from functools import lru_cache
+from common.decoding import RepetitionPenalty, PUNCTUATION_TOKENS
 
 
-excluded_tokens = [11, 13]  # Punctuation tokens to exclude from repetition penalty
+excluded_tokens = PUNCTUATION_TOKENS  # Punctuation tokens to exclude from repetition penalty
+
+
+@lru_cache(maxsize=8)
+def _repetition_penalty(vocab_size, penalty, last_window):
+    return RepetitionPenalty(vocab_size, penalty=penalty, last_window=last_window, excluded_tokens=excluded_tokens)
+
 
 def apply_repetition_penalty(logits, generated_tokens, penalty=1.5, last_window=8):
     """
     Apply repetition penalty to the logits.
     Args:
-        logits: The logits from the model (shape: (vocab_size,)).
+        logits: The logits from the model (shape: (1, vocab_size)).
         generated_tokens: List of previously generated tokens.
         penalty: The penalty factor (higher values discourage repetitions).
     Returns:
-        logits: The logits with repetition penalty applied.
+        logits: A new array of shape (vocab_size,) with repetition penalty applied.
     """
     logits = np.squeeze(logits, axis=0)
-    recent_tokens = generated_tokens[-last_window:] if len(generated_tokens) >= last_window else generated_tokens
-
-    # Combine the tokens from both windows
-    recent_tokens = set(recent_tokens)
-
-    for token in recent_tokens:
-        if token not in excluded_tokens:
-            logits[token] /= penalty
-    return logits
+    return _repetition_penalty(len(logits), penalty, last_window)(logits, generated_tokens)
 
 def temperature_sampling(logits, temperature=0.0):
     """
     Apply temperature sampling to the logits.
     """
     # Boost the logits for punctuation tokens
-    for punct_idx in excluded_tokens:
-        if punct_idx < len(logits):
-            logits[punct_idx] *= 1.2
+    punct = _punctuation_indices(len(logits))
+    logits = np.array(logits, dtype=np.float64)
+    logits[punct] *= 1.2
 
     if temperature == 0.0:
         return np.argmax(logits)  # Greedy decoding
     # Subtract max for numerical stability
     logits = logits - np.max(logits)
     logits = logits / temperature
-    probs = np.exp(logits) / np.sum(np.exp(logits))  # Softmax
+    probs = np.exp(logits)
+    probs /= np.sum(probs)  # Softmax
     if np.isnan(probs).any():
         print("Warning: Probabilities contain NaN values. Falling back to greedy decoding.")
         return np.argmax(logits)  # Fall back to greedy decoding
-    # Ensure probabilities sum to 1
-    probs = probs / np.sum(probs)
     next_token = np.random.choice(len(probs), p=probs)  # Sample from the distribution
     return next_token
 
 
+@lru_cache(maxsize=8)
+def _punctuation_indices(vocab_size):
+    return np.array([t for t in excluded_tokens if t < vocab_size], dtype=np.int64)
+
+
+SENTENCE_DELIMITERS = ('.', '?')
+
+
+def _delimited_substrings(sentence):
+    """Every substring of a normalized sentence that ends with a sentence delimiter."""
+    return {
+        sentence[start:end + 1]
+        for end, char in enumerate(sentence) if char in SENTENCE_DELIMITERS
+        for start in range(end + 1)
+    }
+
+
+class RepetitionFilter:
+    """
+    Detect repeated sentences in a transcript in time linear in the number of sentences.
+
+    A sentence is a repetition when it is a substring of an earlier sentence or contains one
+    (case-insensitive), which catches both exact duplicates and the looping output Whisper
+    produces on silence. Each sentence is normalized once and hashed into two sets:
+    - the normalized sentences seen so far;
+    - every substring of those sentences that ends with a delimiter.
+    Every sentence except possibly the last one of a transcript ends with a delimiter, so both
+    containment checks become set lookups instead of a scan over all earlier sentences.
+    """
+
+    def __init__(self):
+        self.sentences = []
+        self.normalized = set()
+        self.substrings = set()
+        self.unterminated = []  # normalized sentences without a final delimiter, checked by scanning
+
+    def _is_repetition(self, normalized):
+        if not self.sentences:
+            return False
+        if normalized.endswith(SENTENCE_DELIMITERS):
+            if normalized in self.substrings:
+                return True
+        elif any(normalized in earlier for earlier in self.normalized):
+            return True  # only the unterminated last sentence of a transcript takes this path
+        if any(earlier in normalized for earlier in self.unterminated):
+            return True
+        return not _delimited_substrings(normalized).isdisjoint(self.normalized)
+
+    def is_repetition(self, sentence):
+        """
+        Check a sentence against the sentences added so far.
+
+        :param sentence: Sentence text.
+        :return: True if it repeats (or is repeated by) an earlier sentence.
+        """
+        return self._is_repetition(sentence.lower().strip())
+
+    def add(self, sentence):
+        """
+        Add a sentence unless it is a repetition.
+
+        :param sentence: Sentence text.
+        :return: True if the sentence was added, False if it is a repetition.
+        """
+        normalized = sentence.lower().strip()
+        if self._is_repetition(normalized):
+            return False
+        self.sentences.append(sentence.strip())
+        self.normalized.add(normalized)
+        self.substrings |= _delimited_substrings(normalized)
+        if not normalized.endswith(SENTENCE_DELIMITERS):
+            self.unterminated.append(normalized)
+        return True
+
+    def text(self):
+        """Join the kept sentences, ending with a proper delimiter."""
+        cleaned_transcription = ' '.join(self.sentences)
+        # Ensure the last character is a proper delimiter (e.g., '.' or '?')
+        if not cleaned_transcription.endswith(SENTENCE_DELIMITERS):
+            cleaned_transcription += '.'
+        return cleaned_transcription
+
+
 def clean_transcription(transcription):
-    # Split the transcription into sentences using both '.' and '?' as delimiters
-    sentences = re.split(r'(?<=[.?])\s+', transcription)
-    
-    # Initialize a list to store unique sentences
-    unique_sentences = []
-    
-    # Iterate through the sentences
-    for sentence in sentences:
-        # Check if any part of the current sentence has already appeared in the unique sentences
-        for unique_sentence in unique_sentences:
-            # Normalize both sentences for comparison
-            normalized_current = sentence.lower().strip()
-            normalized_unique = unique_sentence.lower().strip()
-            
-            # Check if the current sentence is a substring of the unique sentence or vice versa
-            if normalized_current in normalized_unique or normalized_unique in normalized_current:
-                # If a repetition is found, stop processing and return the cleaned transcription
-                cleaned_transcription = ' '.join(unique_sentences)
-                #cleaned_transcription = '. '.join(unique_sentences)
-                # Ensure the last character is a proper delimiter (e.g., '.' or '?')
-                if not cleaned_transcription.endswith(('.', '?')):
-                    cleaned_transcription += '.'
-                return cleaned_transcription
-        
-        # If no repetition is found, add the current sentence to the unique list
-        unique_sentences.append(sentence.strip())
-    
-    # If no repetition is found, join all sentences and return
-    #cleaned_transcription = '. '.join(unique_sentences)
-    cleaned_transcription = ' '.join(unique_sentences)
-    # Ensure the last character is a proper delimiter (e.g., '.' or '?')
-    if not cleaned_transcription.endswith(('.', '?')):
-        cleaned_transcription += '.'
-    return cleaned_transcription
+    """
+    Cut a transcription at the first repeated sentence.
+
+    Sentences are split on '.' and '?'. Processing stops at the first sentence that is a
+    substring of an earlier one or contains one, and the kept sentences are returned.
+    """
+    repetition_filter = RepetitionFilter()
+    for sentence in re.split(r'(?<=[.?])\s+', transcription):
+        if not repetition_filter.add(sentence):
+            break
+    return repetition_filter.text()
@@ -1,11 +1,12 @@
 """Preprocessing functions for Whisper audio data."""
 
-import common.audio_utils
+import common.mel
+import common.vad
 import numpy as np
 import logging
 
 
-def preprocess(audio, is_nhwc=False, chunk_length = 10, chunk_offset=0, max_duration = 60, overlap=0.0):
+def preprocess(audio, is_nhwc=False, chunk_length = 10, chunk_offset=0, max_duration = 60, overlap=0.0, use_torch=False):
     """
     Generate the mel spectrograms
     
@@ -15,9 +16,10 @@ def preprocess(audio, is_nhwc=False, chunk_length = 10, chunk_offset=0, max_dura
     - chunk_offset: Position - in seconds - to start processing the audio. This is useful for skipping silence at the beginning of the audio.
     - max_duration: Max duration of the audio sample to process.
     - overlap: Overlap between chunks. This is useful for continuous audio processing. Add some overlap (e.g. 0.2) when processing an audio longer than 10 seonds.
+    - use_torch: Use the original torch STFT instead of the NumPy frontend (imports torch).
     """
     # Limit the audio duration
-    sample_rate = common.audio_utils.SAMPLE_RATE
+    sample_rate = common.mel.SAMPLE_RATE
     max_samples = max_duration * sample_rate
     offset = int(chunk_offset * sample_rate)
 
@@ -27,6 +29,10 @@ def preprocess(audio, is_nhwc=False, chunk_length = 10, chunk_offset=0, max_dura
     step = int(segment_samples * (1 - overlap))
 
     audio = audio[offset:max_samples]
+
+    if overlap > 0 and not use_torch:
+        return preprocess_incremental(audio, is_nhwc=is_nhwc, segment_samples=segment_samples, step=step)
+
     mel_spectrograms = []
 
     for start in range(0, len(audio), step):
@@ -36,25 +42,71 @@ def preprocess(audio, is_nhwc=False, chunk_length = 10, chunk_offset=0, max_dura
         chunk = audio[start:end]
 
         # Ensure the chunk is 10s long (Whisper requires this)
-        chunk = common.audio_utils.pad_or_trim(chunk, int(segment_duration * sample_rate))
+        chunk = common.mel.pad_or_trim(chunk, int(segment_duration * sample_rate))
 
         # Convert to Mel spectrogram
-        mel = common.audio_utils.log_mel_spectrogram(chunk).to("cpu")
+        if use_torch:
+            from common.audio_utils import log_mel_spectrogram as torch_log_mel_spectrogram
+            mel = torch_log_mel_spectrogram(chunk).to("cpu")
+        else:
+            mel = common.mel.log_mel_spectrogram(chunk)
         # Run the encoder
 
-        mel = np.expand_dims(mel, axis=0)  # Add new axis to match shape (1, 80, 1, 1000)
-        #print(mel.shape)
-        mel = np.expand_dims(mel, axis=2) 
-        #print(mel.shape)
+        mel_spectrograms.append(format_mel(mel, is_nhwc))
+
+    return mel_spectrograms
+
 
-        if is_nhwc:
-            mel = np.transpose(mel, [0, 2, 3, 1])
+def preprocess_incremental(audio, is_nhwc=False, segment_samples=160000, step=160000):
+    """
+    Generate the mel spectrograms of overlapping chunks, computing each STFT frame only once.
 
-        mel_spectrograms.append(mel)
+    Parameters:
+    - audio: The audio sample, already trimmed.
+    - segment_samples: Chunk length in samples.
+    - step: Distance between chunk starts in samples. Rounded down to a whole number of mel frames.
+    """
+    hop_length = common.mel.HOP_LENGTH
+    step = max(hop_length, step // hop_length * hop_length)
+    chunk_frames = segment_samples // hop_length
+    starts = range(0, len(audio), step)
+    if len(starts) == 0:
+        return []
+
+    # Zero-pad the tail so the last chunk and its final frame are complete
+    end_of_stream = starts[-1] + segment_samples + common.mel.N_FFT // 2
+    audio = np.pad(audio, (0, max(0, end_of_stream - len(audio))))
+
+    # Only the frames of the current chunk plus one step are kept around
+    mel_buffer = common.mel.IncrementalMelBuffer(capacity_frames=chunk_frames + step // hop_length + 1)
+    fed = 0
+    mel_spectrograms = []
+    for start in starts:
+        needed = start + segment_samples + common.mel.N_FFT // 2
+        if needed > fed:
+            mel_buffer.append(audio[fed:needed])
+            fed = needed
+        mel = mel_buffer.chunk(start // hop_length, chunk_frames)
+        mel_spectrograms.append(format_mel(mel, is_nhwc))
 
     return mel_spectrograms
 
 
+def format_mel(mel, is_nhwc=False):
+    """
+    Reshape a (n_mels, n_frames) mel spectrogram to the encoder input layout.
+    Parameters:
+    - mel: The mel spectrogram.
+    - is_nhwc: Return (1, 1, n_frames, n_mels) instead of (1, n_mels, 1, n_frames).
+    """
+    mel = np.expand_dims(mel, axis=0)  # Add new axis to match shape (1, 80, 1, 1000)
+    mel = np.expand_dims(mel, axis=2)
+
+    if is_nhwc:
+        mel = np.transpose(mel, [0, 2, 3, 1])
+    return mel
+
+
 def apply_gain(audio, gain_db):
     """
     Apply gain to the audio signal.
@@ -74,28 +126,29 @@ def improve_input_audio(audio, vad=True, low_audio_gain = True):
     - vad: Boolean indicating whether to apply voice activity detection (VAD).
     - low_audio_gain: Boolean indicating whether to apply gain if the audio level is low.
     """
-    
-    # print(f"Max audio level: {np.max(audio)}")
-    if (low_audio_gain == True) and (np.max(audio) < 0.1):
-        if np.max(audio) < 0.1:
-            audio = apply_gain(audio, gain_db=20)  # Increase by 15 dB
-        elif np.max(audio) < 0.2:
-            audio = apply_gain(audio, gain_db=10)  # Increase by 10 dB
-        print(f"New max audio level: {np.max(audio)}")
+    peak = np.max(audio)
+    # print(f"Max audio level: {peak}")
+    if low_audio_gain and peak < 0.1:
+        audio = apply_gain(audio, gain_db=20)  # Increase by 20 dB
+        print(f"New max audio level: {peak * 10}")
 
     start_time = 0
     if vad:
-        start_time = detect_first_speech(audio, common.audio_utils.SAMPLE_RATE, threshold=0.2, frame_duration=0.2)
-        if start_time is not None:
+        segments = common.vad.detect_speech_segments(audio, common.mel.SAMPLE_RATE)
+        if segments:
+            start_time = round(segments[0][0], 1)
             logging.info(f"Speech detected at {start_time:.2f} seconds.")
         else:
-            logging.info("No speech detected.")
+            # No segment (e.g. a steady level): start at the loudest part, as before, or at 0
+            start_time = detect_first_speech(audio, common.mel.SAMPLE_RATE, threshold=0.2, frame_duration=0.2) or 0
+            logging.info("No speech segment detected.")
     return audio, start_time
 
 
 def detect_first_speech(audio_data, sample_rate, threshold=0.2, frame_duration=0.02):
     """
     Detect the first time when human speech occurs in preloaded audio data.
+    See common.vad.detect_speech_segments for all segments with an adaptive noise floor.
 
     Parameters:
     - audio_data: NumPy array containing the audio samples.
@@ -113,23 +166,20 @@ def detect_first_speech(audio_data, sample_rate, threshold=0.2, frame_duration=0
     # Calculate frame size in samples
     frame_size = int(frame_duration * sample_rate)
 
-    # Split the audio into frames
-    frames = [audio_data[i:i + frame_size] for i in range(0, len(audio_data), frame_size)]
-
-    # Calculate the energy of each frame
-    energy = [np.sum(np.abs(frame)**2) / len(frame) for frame in frames]
-
-    # Normalize energy to [0, 1]
-    max_energy = max(energy)
+    # Energy of each full frame, plus the trailing partial frame
+    frames = common.vad.frame_audio(audio_data, frame_size)
+    energy, _ = common.vad.frame_features(frames)
+    tail = audio_data[len(frames) * frame_size:]
+    if len(tail):
+        energy = np.append(energy, np.dot(tail, tail) / len(tail))
+    if len(energy) == 0:
+        return None
+
+    # Detect the first frame with energy above the threshold, relative to the loudest frame
+    max_energy = energy.max()
     if max_energy > 0:
-        energy = [e / max_energy for e in energy]
-    #print(energy)
-    # Detect the first frame with energy above the threshold. TODO add noise floor estimation for the threshold.
-    for i, e in enumerate(energy):
-        if e > threshold:
-            start_time = i * frame_duration
-            #start_time_rounded = math.floor(start_time)
-            start_time_rounded = round(start_time, 1)
-            return start_time_rounded
-
-    return None  # No speech detected
\ No newline at end of file
+        energy = energy / max_energy
+    above = np.flatnonzero(energy > threshold)
+    if len(above) == 0:
+        return None  # No speech detected
+    return round(above[0] * frame_duration, 1)
@@ -0,0 +1,275 @@
+"""
+Compact binary sensor protocol for the Arduino link.
+
+The sketches print their readings as text ("MOTION:0 | PHOTO:512 | ..."), about 70 bytes per
+sample at 9600 baud, which the Pi then takes apart again with split() chains. After receiving
+"BINARY" the sketches send fixed-layout little-endian records instead, several per frame:
+
+    A5 5A | type | length | payload: 1..n records (length bytes) | CRC-16 (big-endian)
+
+The CRC is CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF, what binascii.crc_hqx computes) over
+type, length and payload. Text lines (alerts, scan results, boot messages) can still appear
+between frames, and a sketch without binary support simply keeps sending text: FrameDecoder
+returns those lines for the legacy parser, so one reader handles both protocols.
+"""
+
+import binascii
+import random
+import struct
+import numpy as np
+
+
+SYNC = b"\xa5\x5a"
+HEADER_SIZE = 4  # sync (2), type, length
+CRC_SIZE = 2
+MAX_PAYLOAD = 255
+MAX_LINE = 256  # text without a newline beyond this is line noise
+
+FRAME_DEV00 = 0x01  # ardiuno00: distance sensors, servo, motor speed, button
+FRAME_DEV01 = 0x02  # ardiuno01: motion, light, UV, metal, ball switch, line follower
+
+# Line follower bits of the dev01 "line" field
+LF_LEFT, LF_MID, LF_RIGHT = 0x01, 0x02, 0x04
+
+# Record layouts; keep in sync with SensorFrame in the sketches
+RECORD_FIELDS = {
+    FRAME_DEV00: ("millis", "laser", "ultrasonic0", "ultrasonic1", "servo", "speed", "button"),
+    FRAME_DEV01: ("millis", "motion", "photo", "uv", "metal", "ball", "line"),
+}
+RECORD_STRUCTS = {
+    FRAME_DEV00: struct.Struct("<IhhhBBB"),
+    FRAME_DEV01: struct.Struct("<IBHHHBB"),
+}
+RECORD_DTYPES = {
+    FRAME_DEV00: np.dtype([("millis", "<u4"), ("laser", "<i2"), ("ultrasonic0", "<i2"), ("ultrasonic1", "<i2"),
+                           ("servo", "u1"), ("speed", "u1"), ("button", "u1")]),
+    FRAME_DEV01: np.dtype([("millis", "<u4"), ("motion", "u1"), ("photo", "<u2"), ("uv", "<u2"), ("metal", "<u2"),
+                           ("ball", "u1"), ("line", "u1")]),
+}
+FRAME_DEVICES = {FRAME_DEV00: "dev00", FRAME_DEV01: "dev01"}
+
+
+def crc16(data):
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def encode_frame(frame_type, records):
+    """
+    :param records: Record tuples in RECORD_FIELDS order (at most MAX_PAYLOAD bytes in total).
+    :return: Frame bytes.
+    """
+    record = RECORD_STRUCTS[frame_type]
+    payload = b"".join(record.pack(*r) for r in records)
+    if not payload or len(payload) > MAX_PAYLOAD:
+        raise ValueError(f"{len(records)} records do not fit in one frame")
+    body = bytes((frame_type, len(payload))) + payload
+    return SYNC + body + struct.pack(">H", crc16(body))
+
+
+class Frame:
+    """A decoded frame: its type and raw payload of one or more records."""
+
+    __slots__ = ("type", "payload")
+
+    def __init__(self, frame_type, payload):
+        self.type = frame_type
+        self.payload = payload
+
+    @property
+    def device(self):
+        return FRAME_DEVICES[self.type]
+
+    def __len__(self):
+        return len(self.payload) // RECORD_STRUCTS[self.type].size
+
+    def records(self):
+        """Record tuples, oldest first."""
+        return list(RECORD_STRUCTS[self.type].iter_unpack(self.payload))
+
+    def latest(self):
+        """The newest record as a tuple."""
+        record = RECORD_STRUCTS[self.type]
+        return record.unpack_from(self.payload, len(self.payload) - record.size)
+
+    def latest_dict(self):
+        return dict(zip(RECORD_FIELDS[self.type], self.latest()))
+
+    def array(self):
+        """All records as a NumPy structured array (a view of the payload, no copy)."""
+        return np.frombuffer(self.payload, RECORD_DTYPES[self.type])
+
+
+class FrameDecoder:
+    """
+    Incremental decoder for a serial stream mixing binary frames and text lines.
+
+    feed() takes whatever bytes the port returned and gives back the complete frames and lines
+    found so far; partial data is kept for the next call. A frame whose CRC does not match is
+    skipped by resynchronizing on the next sync marker.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.frames = 0
+        self.records = 0
+        self.lines = 0
+        self.crc_errors = 0
+        self.dropped_bytes = 0
+
+    def feed(self, data):
+        """
+        :param data: Bytes read from the port.
+        :return: List of Frame and str (text line without line ending), in arrival order.
+        """
+        buf = self.buffer
+        buf += data
+        out = []
+        pos = 0
+        while True:
+            sync = buf.find(SYNC, pos)
+            text_end = len(buf) if sync < 0 else sync
+            while pos < text_end:
+                newline = buf.find(b"\n", pos, text_end)
+                if newline < 0:
+                    break
+                self._line(buf[pos:newline], out)
+                pos = newline + 1
+
+            if sync < 0:
+                if len(buf) - pos > MAX_LINE:
+                    # No newline in sight: noise. Keep the last byte, it may start a sync marker
+                    self.dropped_bytes += len(buf) - pos - 1
+                    pos = len(buf) - 1
+                break
+            if pos < sync:
+                # Bytes without a line ending in front of a frame (e.g. the rest of a bad frame)
+                self.dropped_bytes += sync - pos
+                pos = sync
+            if len(buf) - sync < HEADER_SIZE:
+                break
+            frame_type, length = buf[sync + 2], buf[sync + 3]
+            end = sync + HEADER_SIZE + length + CRC_SIZE
+            if end > len(buf):
+                break
+            record = RECORD_STRUCTS.get(frame_type)
+            if (record is not None and length and length % record.size == 0
+                    and crc16(buf[sync + 2:end - CRC_SIZE]) == (buf[end - 2] << 8 | buf[end - 1])):
+                out.append(Frame(frame_type, bytes(buf[sync + HEADER_SIZE:end - CRC_SIZE])))
+                self.frames += 1
+                self.records += length // record.size
+                pos = end
+            else:
+                self.crc_errors += 1
+                pos = sync + 1
+        del buf[:pos]
+        return out
+
+    def _line(self, raw, out):
+        line = raw.decode("utf-8", errors="replace").strip()
+        if "\ufffd" in line:
+            self.dropped_bytes += len(raw) + 1  # binary garbage, not a line the sketch printed
+        elif line:
+            out.append(line)
+            self.lines += 1
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "records": self.records,
+            "lines": self.lines,
+            "crc_errors": self.crc_errors,
+            "dropped_bytes": self.dropped_bytes,
+        }
+
+
+# === HOST-SIDE SIMULATOR ===
+
+def format_text(frame_type, record, previous=None):
+    """A record as the sketch prints it in text mode, alerts included (see format_alerts)."""
+    if frame_type == FRAME_DEV00:
+        _, laser, us0, us1, _, _, _ = record
+        return f"LASER:{laser} ULTRASONIC0:{us0} ULTRASONIC1:{us1}\r\n"
+    _, motion, photo, uv, metal, ball, line = record
+    text = (f"MOTION:{motion} | PHOTO:{photo} | UV:{uv} | METAL:{metal} | BALL:{ball} | "
+            f"LF[L:{int(bool(line & LF_LEFT))} M:{int(bool(line & LF_MID))} R:{int(bool(line & LF_RIGHT))}]\r\n")
+    return text + format_alerts(frame_type, record, previous)
+
+
+def format_alerts(frame_type, record, previous=None):
+    """
+    Alert lines the dev01 sketch prints after a reading, in both modes: only when motion, metal
+    or the ball switch comes on, i.e. was off in the previous record (None: at boot).
+    """
+    if frame_type != FRAME_DEV01:
+        return ""
+    _, motion, _, _, metal, ball, _ = record
+    _, was_motion, _, _, was_metal, was_ball, _ = previous or (0, 0, 0, 0, 0, 0, 0)
+    return (("⚠️ Motion detected!\r\n" if motion and not was_motion else "")
+            + ("⚡ METAL DETECTED!\r\n" if metal > 350 >= was_metal else "")
+            + ("Ball switch triggered!\r\n" if ball and not was_ball else ""))
+
+
+class SensorSimulator:
+    """
+    Synthetic output of ardiuno00 / ardiuno01 in either protocol, for testing the decoder and
+    benchmarking without a board.
+
+    Parameters:
+    - device: "dev00" or "dev01".
+    - period_ms: Time between samples.
+    - seed: Random seed, so runs are reproducible.
+    """
+
+    def __init__(self, device="dev01", period_ms=50, seed=0):
+        self.frame_type = FRAME_DEV00 if device == "dev00" else FRAME_DEV01
+        self.period_ms = period_ms
+        self.random = random.Random(seed)
+        self.millis = 0
+        self.laser, self.us0, self.us1 = 400, 80, 80
+        self.photo, self.uv, self.metal = 512, 120, 200
+
+    def _walk(self, value, step, low, high):
+        return min(max(value + self.random.randint(-step, step), low), high)
+
+    def sample(self):
+        """Next record tuple (RECORD_FIELDS order)."""
+        self.millis += self.period_ms
+        r = self.random
+        if self.frame_type == FRAME_DEV00:
+            self.laser = self._walk(self.laser, 25, 30, 1200)
+            self.us0 = self._walk(self.us0, 4, 2, 300)
+            self.us1 = self._walk(self.us1, 4, 2, 300)
+            laser = -1 if r.random() < 0.02 else self.laser  # out of range
+            return (self.millis, laser, self.us0, self.us1, 90, 200, int(r.random() < 0.01))
+        self.photo = self._walk(self.photo, 20, 0, 1023)
+        self.uv = self._walk(self.uv, 10, 0, 1023)
+        self.metal = self._walk(self.metal, 15, 0, 1023)
+        line = r.choice((LF_MID, LF_MID, LF_LEFT | LF_MID, LF_MID | LF_RIGHT, 0))
+        return (self.millis, int(r.random() < 0.05), self.photo, self.uv, self.metal, int(r.random() < 0.01), line)
+
+    def text(self, record, previous=None):
+        """A record as the sketch prints it in text mode, alerts included."""
+        return format_text(self.frame_type, record, previous)
+
+    def alerts(self, record, previous=None):
+        """Alert lines the dev01 sketch prints in both modes."""
+        return format_alerts(self.frame_type, record, previous)
+
+    def stream(self, samples, binary=True, batch=1):
+        """
+        Serial output for a number of samples.
+
+        :param binary: Frames (with alert lines in between) instead of text lines.
+        :param batch: Records per frame in binary mode.
+        :return: (bytes, list of records)
+        """
+        records = [self.sample() for _ in range(samples)]
+        previous = [None] + records[:-1]
+        if not binary:
+            return "".join(self.text(r, p) for r, p in zip(records, previous)).encode("utf-8"), records
+        chunks = []
+        for i in range(0, len(records), batch):
+            group = records[i:i + batch]
+            chunks.append(encode_frame(self.frame_type, group))
+            chunks.append("".join(self.alerts(r, p) for r, p in zip(group, previous[i:i + batch])).encode("utf-8"))
+        return b"".join(chunks), records
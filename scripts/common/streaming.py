@@ -0,0 +1,266 @@
+"""Streaming microphone capture and VAD-gated transcription for Whisper."""
+
+import threading
+import time
+import numpy as np
+import sounddevice as sd
+import common.mel
+from common.mel import IncrementalMelBuffer
+from common.preprocessing import format_mel
+from common.postprocessing import clean_transcription
+from common.vad import EnergyVAD
+
+
+SAMPLE_RATE = common.mel.SAMPLE_RATE
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size ring buffer of mono float32 samples addressed by absolute sample index.
+
+    The writer (the sounddevice callback) never blocks on the reader; samples older than
+    the buffer capacity are overwritten.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=np.float32)
+        self.total_written = 0
+        self.lock = threading.Lock()
+        self.data_available = threading.Condition(self.lock)
+
+    def write(self, samples):
+        """
+        Append samples to the buffer.
+
+        :param samples: 1-D array of float32 samples.
+        """
+        n = len(samples)
+        with self.lock:
+            # Only the last capacity samples survive; they go where they would have been written
+            tail = samples[-self.capacity:]
+            start = (self.total_written + n - len(tail)) % self.capacity
+            first = min(len(tail), self.capacity - start)
+            self.buffer[start:start + first] = tail[:first]
+            self.buffer[:len(tail) - first] = tail[first:]
+            self.total_written += n
+            self.data_available.notify_all()
+
+    def read(self, start, end):
+        """
+        Copy the samples in [start, end) out of the buffer.
+
+        :param start: Absolute index of the first sample. Clamped to the oldest sample still held.
+        :param end: Absolute index one past the last sample.
+        :return: 1-D float32 array.
+        """
+        with self.lock:
+            start = max(start, self.total_written - self.capacity)
+            end = min(end, self.total_written)
+            if end <= start:
+                return np.zeros(0, dtype=np.float32)
+            indices = np.arange(start, end) % self.capacity
+            return self.buffer[indices]
+
+    def wait_for(self, index, timeout=None):
+        """
+        Block until at least `index` samples have been written.
+
+        :return: Total number of samples written so far.
+        """
+        with self.lock:
+            self.data_available.wait_for(lambda: self.total_written >= index, timeout=timeout)
+            return self.total_written
+
+
+class UtteranceSegmenter:
+    """
+    Cut a stream of VAD frames into utterances.
+
+    Parameters:
+    - vad: Frame classifier with `frame_size` and `is_speech(frame)`.
+    - min_speech_duration: Speech needed before an utterance is opened, in seconds.
+    - silence_duration: Trailing silence that closes an utterance, in seconds.
+    - pre_roll: Audio kept before the detected onset, in seconds.
+    - max_duration: Utterances are cut at this length, in seconds.
+    """
+
+    def __init__(self, vad, sample_rate=SAMPLE_RATE, min_speech_duration=0.09, silence_duration=0.6,
+                 pre_roll=0.2, max_duration=10):
+        self.vad = vad
+        self.frame_size = vad.frame_size
+        self.min_speech_frames = max(1, int(min_speech_duration * sample_rate / self.frame_size))
+        self.silence_frames = max(1, int(silence_duration * sample_rate / self.frame_size))
+        self.pre_roll = int(pre_roll * sample_rate)
+        self.max_samples = int(max_duration * sample_rate)
+        self.reset()
+
+    def reset(self):
+        self.speech_run = 0
+        self.silence_run = 0
+        self.utterance_start = None
+
+    def process(self, frame, frame_start):
+        """
+        Feed one frame.
+
+        :param frame: Frame samples.
+        :param frame_start: Absolute index of the first sample of the frame.
+        :return: (start, end) absolute sample range of a finished utterance, or None.
+        """
+        speech = self.vad.is_speech(frame)
+        frame_end = frame_start + self.frame_size
+
+        if self.utterance_start is None:
+            self.speech_run = self.speech_run + 1 if speech else 0
+            if self.speech_run >= self.min_speech_frames:
+                onset = frame_end - self.speech_run * self.frame_size
+                self.utterance_start = max(0, onset - self.pre_roll)
+                self.silence_run = 0
+            return None
+
+        self.silence_run = 0 if speech else self.silence_run + 1
+        if self.silence_run >= self.silence_frames or frame_end - self.utterance_start >= self.max_samples:
+            utterance = (self.utterance_start, frame_end)
+            self.reset()
+            return utterance
+        return None
+
+
+class StreamingTranscriber:
+    """
+    Transcribe microphone audio utterance by utterance, without temp files or subprocesses.
+
+    A sounddevice callback writes into an AudioRingBuffer. A worker thread feeds new audio to an
+    IncrementalMelBuffer and runs the VAD over it; as soon as an utterance ends, its mel frames
+    are sliced out of the rolling buffer and sent to the Whisper pipeline.
+
+    Parameters:
+    - pipeline: HailoWhisperPipeline (anything with submit(mel) -> Future).
+    - chunk_length: Encoder input length in seconds (10 for tiny, 5 for base).
+    - is_nhwc: Mel layout expected by the encoder.
+    - on_transcription: Optional callback called with each transcription (not with those flushed
+      while transcribing).
+    """
+
+    def __init__(self, pipeline, chunk_length=10, is_nhwc=True, on_transcription=None,
+                 buffer_duration=30, vad=None, device=None):
+        self.pipeline = pipeline
+        self.chunk_length = chunk_length
+        self.is_nhwc = is_nhwc
+        self.on_transcription = on_transcription
+        self.device = device
+        self.ring = AudioRingBuffer(int(buffer_duration * SAMPLE_RATE))
+        self.vad = vad if vad is not None else EnergyVAD(SAMPLE_RATE)
+        self.segmenter = UtteranceSegmenter(self.vad, max_duration=chunk_length)
+        self.mel = IncrementalMelBuffer(capacity_frames=int(buffer_duration * SAMPLE_RATE) // common.mel.HOP_LENGTH)
+        self.chunk_frames = chunk_length * SAMPLE_RATE // common.mel.HOP_LENGTH
+        self.read_pos = 0
+        self.generation = 0
+        self.state_lock = threading.Lock()
+        self.results = []
+        self.results_ready = threading.Condition()
+        self.running = False
+        self.stream = None
+        self.thread = None
+
+    def _audio_callback(self, indata, frames, time_info, status):
+        if status:
+            print("Status:", status)
+        self.ring.write(indata[:, 0] if indata.ndim > 1 else indata)
+
+    def start(self):
+        """Open the microphone and start the VAD worker."""
+        self.running = True
+        self.stream = sd.InputStream(samplerate=SAMPLE_RATE,
+                                     channels=1,
+                                     dtype="float32",
+                                     device=self.device,
+                                     callback=self._audio_callback)
+        self.stream.start()
+        self.thread = threading.Thread(target=self._vad_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Close the microphone and stop the worker."""
+        self.running = False
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def flush(self):
+        """Drop any audio captured so far, e.g. while the robot was talking."""
+        with self.state_lock:
+            self.read_pos = self.ring.total_written
+            self.segmenter.reset()
+            self.mel.reset(self.read_pos)
+            self.generation += 1
+        with self.results_ready:
+            self.results.clear()
+
+    def _vad_loop(self):
+        frame_size = self.vad.frame_size
+        while self.running:
+            written = self.ring.wait_for(self.read_pos + frame_size, timeout=0.5)
+            utterances = []
+            with self.state_lock:
+                # Skip ahead if the worker fell behind the ring capacity
+                if self.read_pos < written - self.ring.capacity:
+                    self.read_pos = written - self.ring.capacity
+                    self.segmenter.reset()
+                    self.mel.reset(self.read_pos)
+
+                n_frames = (written - self.read_pos) // frame_size
+                if n_frames == 0:
+                    continue
+                block_start = self.read_pos
+                block = self.ring.read(block_start, block_start + n_frames * frame_size)
+                self.read_pos += len(block)
+                self.mel.append(block)
+
+                for i in range(n_frames):
+                    frame = block[i * frame_size:(i + 1) * frame_size]
+                    utterance = self.segmenter.process(frame, block_start + i * frame_size)
+                    if utterance is not None:
+                        utterances.append((utterance[1] - utterance[0], self._utterance_mels(*utterance)))
+                generation = self.generation
+
+            for n_samples, mel_spectrograms in utterances:
+                self._transcribe(n_samples, mel_spectrograms, generation)
+
+    def _utterance_mels(self, start, end):
+        """Slice the encoder chunks covering samples [start, end) out of the rolling mel buffer."""
+        start_frame = max(0, self.mel.frame_index(start))
+        end_frame = self.mel.frame_index(end)
+        return [
+            format_mel(self.mel.chunk(frame, self.chunk_frames), self.is_nhwc)
+            for frame in range(start_frame, max(end_frame, start_frame + 1), self.chunk_frames)
+        ]
+
+    def _transcribe(self, n_samples, mel_spectrograms, generation):
+        start = time.time()
+        futures = [self.pipeline.submit(mel) for mel in mel_spectrograms]
+        text = " ".join(clean_transcription(future.result()) for future in futures).strip()
+        print(f"⏱️ Utterance of {n_samples / SAMPLE_RATE:.1f}s transcribed in {time.time() - start:.2f}s")
+
+        with self.results_ready:
+            if generation != self.generation:
+                return  # flushed while transcribing
+            self.results.append(text)
+            self.results_ready.notify_all()
+        if self.on_transcription is not None:
+            self.on_transcription(text)
+
+    def listen(self, timeout=None):
+        """
+        Wait for the next transcribed utterance.
+
+        :param timeout: Seconds to wait, or None to wait forever.
+        :return: Transcription text, or None on timeout.
+        """
+        with self.results_ready:
+            if not self.results_ready.wait_for(lambda: self.results, timeout=timeout):
+                return None
+            return self.results.pop(0)
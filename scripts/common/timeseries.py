@@ -0,0 +1,353 @@
+"""
+Sensor time series: fixed-size NumPy ring buffers with downsampled history.
+
+Every channel keeps its raw samples (time.monotonic() timestamp and value) plus 1 s and 1 min
+aggregates (count, mean, min, max per bucket), each in a Ring of fixed size, so memory does not
+grow however long the robot runs. Queries return read-only NumPy views into the rings instead
+of copies, and the mean / standard deviation of any window come from running sums in O(1).
+Readings that mean "no reading" (below a channel's `low`, like the laser's -1) are kept as NaN
+in the raw samples and left out of the sums, the statistics and the buckets.
+"""
+
+import math
+import time
+import numpy as np
+
+
+# sum, sumsq, n: running totals of the valid values (v is NaN for a missing reading)
+RAW_DTYPE = np.dtype([("t", "f8"), ("v", "f8"), ("sum", "f8"), ("sumsq", "f8"), ("n", "f8")])
+BUCKET_DTYPE = np.dtype([("t", "f8"), ("count", "u4"), ("mean", "f8"), ("min", "f8"), ("max", "f8")])
+
+# Batches of at least this many samples are appended through NumPy (cumsum, slice writes); for
+# fewer, the fixed cost of the array operations is more than appending them one by one
+VECTOR_MIN = 5
+
+# Downsampled levels: name -> (bucket seconds, buckets kept): one hour of seconds, one day of minutes
+RESOLUTIONS = {"1s": (1.0, 3600), "1min": (60.0, 1440)}
+
+
+class Ring:
+    """
+    Fixed-size ring of records with contiguous, zero-copy views of the newest ones.
+
+    Records are written to the upper half of a 2 * capacity array, at capacity + i; each time
+    the head wraps around, the completed lap is copied to the lower half in one go. So the newest
+    n records are always one slice of the array ending at capacity + head and never wrap around:
+    last() and since() return read-only views. A view stays valid until `capacity` newer
+    records have been written; copy it to keep it longer.
+    One writer per ring; readers do not lock (the head moves only after the record is written).
+    """
+
+    def __init__(self, dtype, capacity):
+        self.capacity = capacity
+        self.data = np.zeros(2 * capacity, dtype)
+        # All-float records can also be written as rows of a plain 2-D view: far cheaper slices
+        floats = all(self.data.dtype[name] == np.float64 for name in self.data.dtype.names)
+        self.rows = self.data.view("f8").reshape(len(self.data), -1) if floats else None
+        self.head = 0  # next write position, 0..capacity-1
+        self.count = 0  # records written in total
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, record):
+        i = self.head
+        capacity = self.capacity
+        self.data[capacity + i] = record
+        if i + 1 < capacity:
+            self.head = i + 1
+        else:
+            self.data[:capacity] = self.data[capacity:]
+            self.head = 0
+        self.count += 1
+
+    def extend(self, records):
+        """
+        Append several records with one slice write (two if the head wraps around). For an
+        all-float dtype they can be an (n, fields) float array, written through the rows view.
+        """
+        n = len(records)
+        capacity = self.capacity
+        data, i = (self.rows if records.ndim == 2 else self.data), self.head
+        if n > capacity:
+            records = records[n - capacity:]  # the older ones would be overwritten anyway
+            i = (i + n - capacity) % capacity
+        end = i + len(records)
+        if end < capacity:
+            data[capacity + i:capacity + end] = records
+            self.head = end
+        else:
+            first = capacity - i
+            data[capacity + i:] = records[:first]
+            data[:capacity] = data[capacity:]
+            data[capacity:capacity + end - capacity] = records[first:]
+            self.head = end - capacity
+        self.count += n
+
+    def last(self, n=None):
+        """View of the newest n records (all kept records if None), oldest first."""
+        size = len(self)
+        n = size if n is None else min(n, size)
+        end = self.head + self.capacity
+        view = self.data[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def since(self, t):
+        """View of the records with t >= the given time."""
+        view = self.last()
+        return view[np.searchsorted(view["t"], t):]
+
+
+class Downsampler:
+    """Aggregates samples into fixed-time buckets; completed buckets go to a Ring."""
+
+    def __init__(self, seconds, size):
+        self.seconds = seconds
+        self.ring = Ring(BUCKET_DTYPE, size)
+        self.start = None  # open bucket: start time, count, total, min, max
+        self.n = 0
+        self.total = 0.0
+        self.lo = self.hi = 0.0
+
+    def add(self, t, v):
+        if self.start is None or t >= self.start + self.seconds:
+            self.flush()
+            self.start = math.floor(t / self.seconds) * self.seconds
+            self.n, self.total, self.lo, self.hi = 0, 0.0, v, v
+        self.n += 1
+        self.total += v
+        if v < self.lo:
+            self.lo = v
+        elif v > self.hi:
+            self.hi = v
+
+    def merge(self, count, total, lo, hi):
+        """Add `count` samples, given by their total, min and max, that fall into the open bucket."""
+        self.n += count
+        self.total += total
+        if lo < self.lo:
+            self.lo = lo
+        if hi > self.hi:
+            self.hi = hi
+
+    def flush(self):
+        if self.n:
+            self.ring.append((self.start, self.n, self.total / self.n, self.lo, self.hi))
+            self.n = 0
+
+    def current(self):
+        """The open (incomplete) bucket as a record tuple, None if empty."""
+        if not self.n:
+            return None
+        return self.start, self.n, self.total / self.n, self.lo, self.hi
+
+
+def _raw_rows(times, values, low, totals):
+    """
+    Raw ring rows (t, v, sum, sumsq, n) of several channels sampled at the same times.
+    :param times: (samples,) float array.
+    :param values: (channels, samples) float array.
+    :param low: (channels, 1) lowest valid reading of each channel (-inf: all are valid).
+    :param totals: (channels, 3) running sum, sumsq and n before these samples.
+    :return: (channels, samples, 5) float array.
+    """
+    valid = values >= low  # NaN compares False: missing as well
+    clean = np.where(valid, values, 0.0)
+    rows = np.empty(values.shape + (5,))
+    rows[..., 0] = times
+    rows[..., 1] = np.where(valid, values, math.nan)
+    sums = rows[..., 2:]
+    sums[..., 0] = clean
+    sums[..., 1] = clean * clean
+    sums[..., 2] = valid
+    sums[:, 0] += totals
+    np.cumsum(sums, axis=1, out=sums)
+    return rows
+
+
+def _extend(channels, times, values, low):
+    """Append samples taken at the same times to several channels, with one NumPy pass for all."""
+    rows = _raw_rows(times, values, low, np.array([[c._sum, c._sumsq, c._n] for c in channels]))
+    stored = rows[..., 1]
+    lows = np.fmin.reduce(stored, axis=1).tolist()  # fmin / fmax skip the NaNs
+    highs = np.fmax.reduce(stored, axis=1).tolist()
+    for channel, channel_rows, totals, lo, hi in zip(channels, rows, rows[:, -1, 2:].tolist(), lows, highs):
+        channel._write(channel_rows, totals, lo, hi, times)
+
+
+class ChannelHistory:
+    """
+    History of one sensor channel.
+
+    Parameters:
+    - capacity: Raw samples kept (4096: about 3.5 minutes at 20 Hz).
+    - resolutions: Downsampled levels, see RESOLUTIONS.
+    - low: Readings below it mean "no reading" and are stored as NaN (None: all are valid).
+    """
+
+    def __init__(self, capacity=4096, resolutions=RESOLUTIONS, low=None):
+        self.raw = Ring(RAW_DTYPE, capacity)
+        self.levels = {name: Downsampler(seconds, size) for name, (seconds, size) in resolutions.items()}
+        self.low = low
+        self._low = -math.inf if low is None else low
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._n = 0
+
+    def __len__(self):
+        return len(self.raw)
+
+    def append(self, t, v):
+        v = float(v)
+        if not v >= self._low:  # NaN compares False: missing as well
+            self.raw.append((t, math.nan, self._sum, self._sumsq, self._n))
+            return
+        self._sum += v
+        self._sumsq += v * v
+        self._n += 1
+        self.raw.append((t, v, self._sum, self._sumsq, self._n))
+        for level in self.levels.values():
+            level.add(t, v)
+
+    def extend(self, times, values):
+        """append() for arrays: running sums by cumsum, one slice write to the ring."""
+        times = np.asarray(times, dtype="f8")
+        if len(times) < VECTOR_MIN:
+            for t, v in zip(times.tolist(), np.asarray(values).tolist()):
+                self.append(t, v)
+        else:
+            _extend((self,), times, np.asarray(values, dtype="f8")[None], np.array([[self._low]]))
+
+    def _write(self, rows, totals, lo, hi, times):
+        """
+        Store this channel's rows from _raw_rows(): totals are the running (sum, sumsq, n) after
+        them, lo and hi the min and max of their valid values, times the (ascending) times array.
+        """
+        self.raw.extend(rows)
+        count = int(totals[2] - self._n)
+        total = totals[0] - self._sum
+        self._sum, self._sumsq, self._n = totals
+        if not count:
+            return
+        end = float(times[-1])
+        for level in self.levels.values():
+            if level.start is not None and end < level.start + level.seconds:
+                level.merge(count, total, lo, hi)
+            else:  # the batch reaches into a new bucket
+                for t, v in zip(times.tolist(), rows[:, 1].tolist()):
+                    if v == v:
+                        level.add(t, v)
+
+    def latest(self):
+        """(time, value) of the newest sample (NaN: no reading), None if there is none."""
+        if not self.raw.count:
+            return None
+        record = self.raw.data[self.raw.head + self.raw.capacity - 1]
+        return float(record["t"]), float(record["v"])
+
+    def window(self, seconds=None, n=None, now=None):
+        """
+        Raw samples as a read-only view (fields t, v; v is NaN for a missing reading), newest last.
+        :param seconds: Only the samples of the last `seconds` (relative to now).
+        :param n: Only the newest n samples.
+        """
+        if seconds is not None:
+            return self.raw.since((time.monotonic() if now is None else now) - seconds)
+        return self.raw.last(n)
+
+    def history(self, resolution="1s", seconds=None, now=None):
+        """
+        Completed buckets of a resolution in RESOLUTIONS (fields t, count, mean, min, max) as a
+        read-only view, or the raw samples for "raw". The open bucket is in current().
+        """
+        if resolution == "raw":
+            return self.window(seconds, now=now)
+        ring = self.levels[resolution].ring
+        if seconds is None:
+            return ring.last()
+        return ring.since((time.monotonic() if now is None else now) - seconds)
+
+    def current(self, resolution="1s"):
+        return self.levels[resolution].current()
+
+    def stats(self, seconds=None, n=None, now=None):
+        """
+        Statistics of the valid readings in a window of raw samples (default: all kept): count,
+        mean, std, min, max, and missing (samples without a reading).
+        Only mean and std are O(1), from the running sums; min and max scan the window (NumPy).
+        The sums are exact for integer readings (all the sensors give) up to 2**53.
+        :return: dict, or None if the window has no valid reading.
+        """
+        view = self.window(seconds, n, now)
+        if not len(view):
+            return None
+        first, last = view[0], view[-1]
+        # Totals before the window: the first sample's running totals minus its own value
+        v0 = float(first["v"])
+        if v0 != v0:
+            v0, n0 = 0.0, int(first["n"])
+        else:
+            n0 = int(first["n"]) - 1
+        count = int(last["n"]) - n0
+        if not count:
+            return None
+        total = last["sum"] - (first["sum"] - v0)
+        sumsq = last["sumsq"] - (first["sumsq"] - v0 * v0)
+        mean = total / count
+        values = view["v"]
+        return {
+            "count": count,
+            "missing": len(view) - count,
+            "mean": float(mean),
+            "std": math.sqrt(max(sumsq / count - mean * mean, 0.0)),
+            "min": float(np.nanmin(values)),
+            "max": float(np.nanmax(values)),
+            "span_s": float(last["t"] - first["t"]),
+        }
+
+
+class SensorHistory:
+    """
+    ChannelHistory of every sensor, fed by state.SensorState.update() (on the Arduino reader
+    threads, one writer per channel) and read by the UI, the Flask API and the controllers.
+
+        state.history["laser"].stats(seconds=5)        # {"count": .., "mean": .., "std": .., ...}
+        state.history["laser"].window(seconds=2)["v"]  # raw values, zero-copy
+        state.history["photo"].history("1min")         # per-minute count / mean / min / max
+
+    :param low: Channel -> lowest valid reading, see ChannelHistory.
+    """
+
+    def __init__(self, names, capacity=4096, resolutions=RESOLUTIONS, low=None):
+        low = low or {}
+        self.channels = {name: ChannelHistory(capacity, resolutions, low.get(name)) for name in names}
+        self._low = {}  # channel names of an extend() -> their lows as a column
+
+    def __getitem__(self, name):
+        return self.channels[name]
+
+    def __contains__(self, name):
+        return name in self.channels
+
+    def record(self, t, readings):
+        """Append one reading per channel, e.g. record(now, {"laser": 412, "ultrasonic0": 35})."""
+        for name, value in readings.items():
+            if value is not None:
+                self.channels[name].append(t, value)
+
+    def extend(self, times, readings):
+        """
+        Append several samples per channel: readings maps name -> values matching times.
+        The rows of all the channels are computed together, then each ring gets one slice write.
+        """
+        times = np.asarray(times, dtype="f8")
+        if len(times) < VECTOR_MIN or not readings:
+            for name, values in readings.items():
+                self.channels[name].extend(times, values)
+            return
+        names = tuple(readings)
+        if names not in self._low:
+            self._low[names] = np.array([[self.channels[name]._low] for name in names])
+        _extend([self.channels[name] for name in names], times,
+                 np.array(list(readings.values()), dtype="f8"), self._low[names])
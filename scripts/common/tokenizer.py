@@ -0,0 +1,175 @@
+"""
+Offline token decoding for Whisper.
+
+The Hugging Face tokenizer is only needed to turn generated token IDs back into text, and
+importing `transformers` (plus the hub lookup in `from_pretrained`) costs seconds at startup.
+The byte-level BPE vocabulary of each variant is exported once to a small decode table in the
+decoder assets (build_tokenizer_cache.py, the only step that needs `transformers` and the
+network); every start loads that table with NumPy (memory-mapped), works offline and never
+imports `transformers`. A missing table is an error, not a download.
+"""
+
+import json
+import os
+import threading
+import numpy as np
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 "resources", "decoder_assets")
+TABLE_VERSION = 1
+
+# Same replacements as transformers' clean_up_tokenization()
+CLEANUP_REPLACEMENTS = [
+    (" .", "."), (" ?", "?"), (" !", "!"), (" ,", ","), (" ' ", "'"),
+    (" n't", "n't"), (" 'm", "'m"), (" 's", "'s"), (" 've", "'ve"), (" 're", "'re"),
+]
+
+
+def tokenizer_cache_dir(variant, cache_dir=None):
+    """Directory holding the decode table of a Whisper variant."""
+    return os.path.join(cache_dir or DEFAULT_CACHE_DIR, variant, "tokenizer")
+
+
+def bytes_to_unicode():
+    """
+    The GPT-2 mapping from bytes to the printable characters used in the BPE vocabulary.
+
+    Returns:
+    - Dictionary {byte value: character}.
+    """
+    printable = (list(range(ord("!"), ord("~") + 1)) + list(range(ord("¡"), ord("¬") + 1))
+                 + list(range(ord("®"), ord("ÿ") + 1)))
+    chars = printable[:]
+    n = 0
+    for b in range(256):
+        if b not in printable:
+            printable.append(b)
+            chars.append(256 + n)
+            n += 1
+    return dict(zip(printable, map(chr, chars)))
+
+
+class WhisperTokenDecoder:
+    """
+    Decode Whisper token IDs to text from a flat byte table.
+
+    Token i is blob[offsets[i]:offsets[i + 1]]. It exposes the two things the pipeline uses from
+    the Hugging Face tokenizer: `eos_token_id` and `decode(ids, skip_special_tokens=True)`.
+    """
+
+    def __init__(self, blob, offsets, special, eos_token_id, clean_up_tokenization_spaces=False):
+        self.blob = blob
+        self.offsets = offsets
+        self.special = special
+        self.eos_token_id = eos_token_id
+        self.clean_up_tokenization_spaces = clean_up_tokenization_spaces
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Load a decode table written by build_tokenizer_cache().
+
+        :param directory: Cache directory of the variant.
+        :return: WhisperTokenDecoder.
+        """
+        with open(os.path.join(directory, "decode_table.json")) as f:
+            meta = json.load(f)
+        if meta.get("version") != TABLE_VERSION:
+            raise ValueError(f"Unsupported decode table version in {directory}")
+        return cls(
+            np.load(os.path.join(directory, "token_bytes.npy"), mmap_mode="r"),
+            np.load(os.path.join(directory, "token_offsets.npy"), mmap_mode="r"),
+            np.load(os.path.join(directory, "special_tokens.npy")),
+            meta["eos_token_id"],
+            meta["clean_up_tokenization_spaces"],
+        )
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def decode(self, token_ids, skip_special_tokens=True):
+        """
+        Convert token IDs to text.
+
+        :param token_ids: Iterable of token IDs.
+        :param skip_special_tokens: Drop special tokens (start/end of transcript, language, timestamps...).
+        :return: Decoded text.
+        """
+        pieces = []
+        for token in token_ids:
+            token = int(token)
+            if not 0 <= token < len(self) or (skip_special_tokens and self.special[token]):
+                continue
+            pieces.append(self.blob[self.offsets[token]:self.offsets[token + 1]].tobytes())
+        text = b"".join(pieces).decode("utf-8", errors="replace")
+        if self.clean_up_tokenization_spaces:
+            for old, new in CLEANUP_REPLACEMENTS:
+                text = text.replace(old, new)
+        return text
+
+
+def build_tokenizer_cache(variant, directory):
+    """
+    Export the decode table of openai/whisper-{variant}. Needs `transformers`, and network
+    access unless the model is already in the Hugging Face cache; run once per variant by
+    build_tokenizer_cache.py.
+
+    :param variant: Whisper variant ("tiny" or "base").
+    :param directory: Output directory.
+    """
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(f"openai/whisper-{variant}")
+    byte_decoder = {c: b for b, c in bytes_to_unicode().items()}
+    special_ids = set(tokenizer.all_special_ids)
+    vocab_size = len(tokenizer)
+
+    pieces = []
+    special = np.zeros(vocab_size, dtype=bool)
+    for token_id, token in enumerate(tokenizer.convert_ids_to_tokens(list(range(vocab_size)))):
+        # Added tokens (>= the base BPE vocabulary) are the special and timestamp tokens
+        if token_id >= tokenizer.vocab_size or token_id in special_ids:
+            special[token_id] = True
+            pieces.append((token or "").encode("utf-8"))
+        else:
+            pieces.append(bytes(byte_decoder[c] for c in token))
+    offsets = np.zeros(vocab_size + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(p) for p in pieces])
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "token_bytes.npy"), np.frombuffer(b"".join(pieces), dtype=np.uint8))
+    np.save(os.path.join(directory, "token_offsets.npy"), offsets)
+    np.save(os.path.join(directory, "special_tokens.npy"), special)
+    # Written last: its presence marks a complete table
+    with open(os.path.join(directory, "decode_table.json"), "w") as f:
+        json.dump({
+            "version": TABLE_VERSION,
+            "variant": variant,
+            "eos_token_id": tokenizer.eos_token_id,
+            "clean_up_tokenization_spaces": bool(getattr(tokenizer, "clean_up_tokenization_spaces", False)),
+        }, f)
+
+
+_tokenizers = {}
+_tokenizers_lock = threading.Lock()
+
+
+def load_tokenizer(variant, cache_dir=None):
+    """
+    Return the token decoder of a Whisper variant, from its decode table.
+
+    :param variant: Whisper variant ("tiny" or "base").
+    :param cache_dir: Root of the decoder assets (default: scripts/resources/decoder_assets).
+    :return: WhisperTokenDecoder, shared between callers.
+    :raises FileNotFoundError: The table has not been built (see build_tokenizer_cache.py).
+    """
+    directory = tokenizer_cache_dir(variant, cache_dir)
+    with _tokenizers_lock:
+        if directory not in _tokenizers:
+            if not os.path.exists(os.path.join(directory, "decode_table.json")):
+                raise FileNotFoundError(
+                    f"No Whisper decode table for '{variant}' in {directory}. Build it once, with "
+                    f"transformers and network access: python build_tokenizer_cache.py --variant {variant}")
+            _tokenizers[directory] = WhisperTokenDecoder.load(directory)
+        return _tokenizers[directory]
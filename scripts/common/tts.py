@@ -0,0 +1,73 @@
+"""
+Text-to-speech requests over the shared HTTP client.
+
+gTTS and the ElevenLabs SDK open a new connection for every call. These helpers send the same
+requests through common.http_client, so TTS reuses kept-alive connections and gets the same
+retries, timeouts and latency histograms as the LLM calls.
+"""
+
+import base64
+import io
+import re
+from common.http_client import get_client
+
+
+ELEVENLABS_TTS_URL = "https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+# Premade voices by name; any other value is used as a voice ID
+ELEVENLABS_VOICES = {
+    "Rachel": "21m00Tcm4TlvDq8N1Xg6",
+    "Bella": "EXAVITQu4vr4xnSDxMaL",
+    "Elli": "MF3mGyEYCl7XYWbV9V6O",
+}
+
+_GTTS_AUDIO = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+
+def google_tts(text, lang="en", tld="com", client=None):
+    """
+    Synthesize speech with Google Translate TTS (the gTTS backend).
+
+    :param text: Text to speak.
+    :param client: HttpClient (default: the shared one).
+    :return: MP3 bytes.
+    """
+    from gtts import gTTS
+    client = client or get_client()
+    tts = gTTS(text, lang=lang, tld=tld)
+    if not hasattr(tts, "_prepare_requests"):
+        # gTTS version without the request builder: let it open its own connection
+        fp = io.BytesIO()
+        tts.write_to_fp(fp)
+        return fp.getvalue()
+    audio = []
+    # gTTS splits long text into several requests; build them with gTTS, send them ourselves
+    for prepared in tts._prepare_requests():
+        response = client.send(prepared, endpoint="gtts")
+        response.raise_for_status()
+        for line in response.iter_lines(chunk_size=1024):
+            match = _GTTS_AUDIO.search(line.decode("utf-8"))
+            if match:
+                audio.append(base64.b64decode(match.group(1).encode("ascii")))
+    if not audio:
+        raise RuntimeError("Google TTS returned no audio")
+    return b"".join(audio)
+
+
+def elevenlabs_tts(text, api_key, voice="Rachel", model_id="eleven_monolingual_v1", client=None):
+    """
+    Synthesize speech with the ElevenLabs REST API.
+
+    :param voice: Premade voice name (see ELEVENLABS_VOICES) or voice ID.
+    :param client: HttpClient (default: the shared one).
+    :return: MP3 bytes.
+    """
+    client = client or get_client()
+    response = client.post(
+        ELEVENLABS_TTS_URL.format(voice_id=ELEVENLABS_VOICES.get(voice, voice)),
+        endpoint="elevenlabs",
+        headers={"xi-api-key": api_key, "Accept": "audio/mpeg"},
+        json={"text": text, "model_id": model_id},
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"ElevenLabs TTS failed ({response.status_code}): {response.text[:200]}")
+    return response.content
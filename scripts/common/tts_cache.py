@@ -0,0 +1,205 @@
+"""
+On-disk TTS cache shared by the chatbots.
+
+Synthesized audio is stored under a hash of (engine, voice, normalized text), so a phrase is
+sent to the TTS service once and then played from the SD card. The cache is bounded by total
+size and evicts least recently used files first; the usage order survives restarts through
+the file modification times.
+"""
+
+import hashlib
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 "resources", "tts_cache")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Lines the chatbots say without asking the LLM, synthesized at boot
+CANNED_PHRASES = (
+    "You gonna say something or just stare at me?",
+    "Oops. System hiccup. Try again, babe.",
+    "Going dark. Goodbye, commander.",
+    "I'm glitching hard, babe. Try again later.",
+    "I got lost in thought. Try again, sugar.",
+)
+
+
+def normalize_text(text):
+    """Text as it is keyed: NFC, whitespace collapsed. Case and punctuation change the speech, so they are kept."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class TTSCache:
+    """
+    Content-addressed TTS audio files with LRU eviction by total bytes.
+
+    Parameters:
+    - directory: Where the audio files live (created if missing).
+    - max_bytes: Size budget; the least recently used files are deleted beyond it.
+    - extension: File extension of the stored audio.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, extension=".mp3"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self.total_bytes = 0
+        self.inflight = {}  # key -> Event set when its synthesis finishes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def key(text, engine, voice):
+        payload = "\x1f".join((engine, voice or "", normalize_text(text)))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key + self.extension)
+
+    def get(self, text, engine, voice, synthesize):
+        """
+        Path of the cached audio for text, synthesizing it on a miss.
+
+        :param engine: TTS engine name ("gtts", "elevenlabs"...).
+        :param voice: Voice / language the audio was made with.
+        :param synthesize: Function () -> audio bytes, called only on a miss. Concurrent
+                           requests for the same phrase wait for a single synthesis.
+        :return: Path of the audio file. Another thread's insert may evict it before it is
+                 opened; use get_bytes() to play it.
+        """
+        return self._get(text, engine, voice, synthesize, read=False)
+
+    def get_bytes(self, text, engine, voice, synthesize):
+        """Like get(), returning the audio bytes, read before the file can be evicted."""
+        return self._get(text, engine, voice, synthesize, read=True)
+
+    def _get(self, text, engine, voice, synthesize, read):
+        key = self.key(text, engine, voice)
+        while True:
+            with self.lock:
+                if key in self.entries:
+                    path = self.path_for(key)
+                    try:
+                        os.utime(path)  # keeps the LRU order across restarts
+                        if read:
+                            # Under the lock, so _evict() cannot delete it meanwhile
+                            with open(path, "rb") as f:
+                                audio = f.read()
+                        self.entries.move_to_end(key)
+                        self.hits += 1
+                        return audio if read else path
+                    except FileNotFoundError:
+                        # Deleted behind our back: forget it and synthesize again
+                        self.total_bytes -= self.entries.pop(key)
+                pending = self.inflight.get(key)
+                if pending is None:
+                    self.misses += 1
+                    self.inflight[key] = threading.Event()
+            if pending is not None:
+                pending.wait()
+                continue
+            try:
+                audio = synthesize()
+                path = self._store(key, audio)
+                return audio if read else path
+            finally:
+                with self.lock:
+                    self.inflight.pop(key).set()
+
+    def contains(self, text, engine, voice):
+        with self.lock:
+            return self.key(text, engine, voice) in self.entries
+
+    def prewarm(self, phrases, engine, voice, synthesize, background=True):
+        """
+        Make sure phrases are cached, e.g. the canned lines at boot.
+
+        :param synthesize: Function text -> audio bytes.
+        :param background: Run on a daemon thread and return it, so boot is not delayed.
+        """
+        def warm():
+            for phrase in phrases:
+                try:
+                    self.get(phrase, engine, voice, lambda: synthesize(phrase))
+                except Exception as e:
+                    print(f"⚠️ TTS pre-warm failed for {phrase!r}: {e}")
+
+        if not background:
+            warm()
+            return None
+        thread = threading.Thread(target=warm, daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _store(self, key, audio):
+        if not audio:
+            raise RuntimeError("TTS returned no audio")
+        path = self.path_for(key)
+        # Write then rename: a crash never leaves a truncated file under a valid key
+        partial = path + ".part"
+        with open(partial, "wb") as f:
+            f.write(audio)
+        os.replace(partial, path)
+        with self.lock:
+            self.total_bytes += len(audio) - self.entries.pop(key, 0)
+            self.entries[key] = len(audio)
+            self._evict()
+        return path
+
+    def _evict(self):
+        # Called with the lock held; the newest entry is kept even if it alone exceeds the budget
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            key, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(self.path_for(key))
+            except FileNotFoundError:
+                pass
+
+    def _load_index(self):
+        files = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".part"):
+                os.remove(path)  # left over by an interrupted write
+            elif name.endswith(self.extension):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, name[:-len(self.extension)], stat.st_size))
+        for _, key, size in sorted(files):
+            self.entries[key] = size
+            self.total_bytes += size
+        with self.lock:
+            self._evict()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    The process-wide cache for a directory, created on first use.
+    """
+    with _caches_lock:
+        if directory not in _caches:
+            _caches[directory] = TTSCache(directory, max_bytes)
+        return _caches[directory]
@@ -0,0 +1,159 @@
+"""Voice activity detection for Whisper audio data."""
+
+import numpy as np
+
+
+class EnergyVAD:
+    """
+    Frame-level energy VAD with an adaptive noise floor, for streaming audio.
+
+    Parameters:
+    - sample_rate: Sample rate of the audio.
+    - frame_duration: Duration of each analysis frame in seconds.
+    - speech_ratio: A frame is speech when its energy exceeds noise_floor * speech_ratio.
+    - min_energy: Absolute energy below which a frame is never speech.
+    - noise_adaptation: Smoothing factor used to track the noise floor on non-speech frames.
+    """
+
+    def __init__(self, sample_rate=16000, frame_duration=0.03, speech_ratio=4.0, min_energy=1e-5,
+                 noise_adaptation=0.05):
+        self.frame_size = int(frame_duration * sample_rate)
+        self.speech_ratio = speech_ratio
+        self.min_energy = min_energy
+        self.noise_adaptation = noise_adaptation
+        self.noise_floor = None
+
+    def is_speech(self, frame):
+        """
+        Classify one frame and update the noise floor.
+
+        Parameters:
+        - frame: NumPy array with frame_size samples.
+
+        Returns:
+        - True if the frame contains speech.
+        """
+        energy = float(np.dot(frame, frame)) / len(frame)
+        if self.noise_floor is None:
+            self.noise_floor = max(energy, self.min_energy)
+            return False
+
+        speech = energy > self.min_energy and energy > self.noise_floor * self.speech_ratio
+        if not speech:
+            self.noise_floor += self.noise_adaptation * (max(energy, self.min_energy) - self.noise_floor)
+        return speech
+
+    def reset(self):
+        """Forget the noise floor estimate."""
+        self.noise_floor = None
+
+
+def frame_audio(audio, frame_size):
+    """
+    Split audio into non-overlapping frames without copying.
+
+    Parameters:
+    - audio: 1-D NumPy array (stereo input is averaged to mono).
+    - frame_size: Frame length in samples.
+
+    Returns:
+    - (n_frames, frame_size) view. A trailing partial frame is dropped.
+    """
+    if audio.ndim == 2:
+        audio = np.mean(audio, axis=1)
+    n_frames = len(audio) // frame_size
+    return np.lib.stride_tricks.as_strided(
+        audio, shape=(n_frames, frame_size), strides=(frame_size * audio.strides[0], audio.strides[0]),
+        writeable=False
+    )
+
+
+def frame_features(frames):
+    """
+    Compute per-frame energy and zero-crossing rate in one pass over the frames.
+
+    Parameters:
+    - frames: (n_frames, frame_size) array.
+
+    Returns:
+    - energy: Mean squared amplitude per frame.
+    - zcr: Fraction of adjacent sample pairs that change sign, per frame.
+    """
+    energy = np.einsum("ij,ij->i", frames, frames) / frames.shape[1]
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frames.shape[1] - 1)
+    return energy, zcr
+
+
+def estimate_noise_floor(energy_db, window_frames=50, smoothing_frames=5):
+    """
+    Track the noise floor with minimum statistics: the minimum of the smoothed frame energy
+    over a sliding window. Adapts to the background level instead of using a fixed threshold.
+
+    Parameters:
+    - energy_db: Frame energies in dB.
+    - window_frames: Length of the minimum search window, in frames (longer than a word).
+    - smoothing_frames: Moving average applied before taking the minimum.
+
+    Returns:
+    - Noise floor in dB for every frame.
+    """
+    n = len(energy_db)
+    smoothing_frames = max(1, min(smoothing_frames, n))
+    smoothed = np.convolve(energy_db, np.ones(smoothing_frames) / smoothing_frames, mode="same")
+    half = window_frames // 2
+    padded = np.pad(smoothed, (half, window_frames - half - 1), mode="edge")
+    return np.lib.stride_tricks.sliding_window_view(padded, window_frames).min(axis=1)
+
+
+def detect_speech_segments(audio, sample_rate, frame_duration=0.02, margin_db=10.0, max_zcr=0.35,
+                           min_speech_duration=0.1, min_silence_duration=0.3, min_energy_db=-70.0,
+                           noise_window=5.0):
+    """
+    Find the speech segments in preloaded audio data.
+
+    A frame is speech when its energy is margin_db above the adaptive noise floor and its
+    zero-crossing rate looks like speech rather than hiss; very loud frames count regardless
+    of ZCR so fricatives are not dropped. Gaps shorter than min_silence_duration are bridged
+    and segments shorter than min_speech_duration are discarded.
+
+    Parameters:
+    - audio: NumPy array containing the audio samples.
+    - sample_rate: Sample rate of the audio data.
+    - frame_duration: Duration of each frame in seconds (default: 0.02).
+    - margin_db: Required energy above the noise floor, in dB.
+    - max_zcr: Zero-crossing rate above which a quiet frame is treated as noise.
+    - noise_window: Minimum-statistics window in seconds; must be longer than a single utterance.
+
+    Returns:
+    - List of (start_time, end_time) tuples in seconds.
+    """
+    frame_size = int(frame_duration * sample_rate)
+    frames = frame_audio(np.asarray(audio, dtype=np.float32), frame_size)
+    if len(frames) == 0:
+        return []
+
+    energy, zcr = frame_features(frames)
+    energy_db = 10 * np.log10(energy + 1e-12)
+    noise_floor_db = estimate_noise_floor(energy_db, window_frames=max(1, int(noise_window / frame_duration)))
+    above_floor = energy_db - noise_floor_db
+    speech = (energy_db > min_energy_db) & (
+        ((above_floor > margin_db) & (zcr < max_zcr)) | (above_floor > 2 * margin_db)
+    )
+
+    # Run boundaries: starts where speech goes 0 -> 1, ends where it goes 1 -> 0
+    edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return []
+
+    # Bridge short silences, then drop short bursts
+    min_gap = int(round(min_silence_duration / frame_duration))
+    keep = np.concatenate(([True], starts[1:] - ends[:-1] >= min_gap))
+    starts = starts[keep]
+    ends = ends[np.concatenate((keep[1:], [True]))]
+    long_enough = ends - starts >= int(round(min_speech_duration / frame_duration))
+
+    return [(float(s * frame_duration), float(e * frame_duration))
+            for s, e in zip(starts[long_enough], ends[long_enough])]
@@ -7,7 +7,11 @@ SUPPORTED_FORMATS = (".mp3", ".wav", ".ogg")
 
 # Arduino
 ARDUINO_PORT = "/dev/ttyUSB0"
+ARDUINO_PORT_PATTERNS = ("/dev/ttyUSB*", "/dev/ttyACM*")  # probed for the boards (they identify themselves)
 ARDUINO_BAUD = 9600
+ARDUINO_COMMAND_INTERVAL = 0.02  # min seconds between writes to a board; queued commands are batched
+ARDUINO_LOG_COMMANDS = False  # print every write
+ARDUINO_PROTOCOL = "binary"  # "binary": ask the sketches for binary frames (text still understood), "text": legacy lines only
 
 # Camera
 IMAGE_DIR = "images"
@@ -0,0 +1,61 @@
+"""
+KIDA voice chat on the asyncio conversation engine (common/conversation.py).
+
+Replaces the llm_tts_openrouter_* / kida-chatbot* variants: pick the backends in
+conversation.json or on the command line.
+
+    python conversation_engine.py                                   # conversation.json
+    python conversation_engine.py --stt hailo --tts elevenlabs
+    python conversation_engine.py --llm-url http://127.0.0.1:8088/api/v1/chat/completions  # mock_llm_server.py
+
+STT backends: faster-whisper, whisper, hailo. LLM: openrouter. TTS: gtts, elevenlabs, pyttsx3.
+"""
+
+import argparse
+import os
+import warnings
+from common.conversation import load_config, run
+
+warnings.filterwarnings("ignore")
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "conversation.json")
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="KIDA conversation engine")
+    parser.add_argument("--config", type=str, default=DEFAULT_CONFIG_PATH, help="JSON config file")
+    parser.add_argument("--stt", type=str, default=None, help="STT backend")
+    parser.add_argument("--stt-model", type=str, default=None, help="Model / variant of the STT backend")
+    parser.add_argument("--hw-arch", type=str, default=None, help="Hailo architecture (hailo STT)")
+    parser.add_argument("--stream", action="store_true", help="Hailo STT: capture with VAD on the rolling mel buffer")
+    parser.add_argument("--llm-url", type=str, default=None, help="OpenAI-compatible completions endpoint")
+    parser.add_argument("--tts", type=str, default=None, help="TTS backend")
+    return parser.parse_args()
+
+
+def config_from_args(args):
+    overrides = {}
+    if args.stt:
+        overrides["stt"] = {"backend": args.stt}
+    if args.llm_url:
+        overrides["llm"] = {"url": args.llm_url}
+    if args.tts:
+        overrides["tts"] = {"backend": args.tts}
+    config = load_config(args.config if os.path.isfile(args.config) else None, overrides)
+
+    stt = config["stt"]
+    if args.stt_model:
+        stt["variant" if stt["backend"] == "hailo" else "model"] = args.stt_model
+    if args.hw_arch:
+        stt["hw_arch"] = args.hw_arch
+    if args.stream:
+        stt["streaming"] = True
+    return config
+
+
+def main():
+    run(config_from_args(get_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ from stats import stats_lock, system_stats
 from flask import Flask, render_template, jsonify, request
 from stats import stats_lock, system_stats
 import queue
+import time
+import state
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
 command_queue = queue.Queue()
@@ -20,6 +22,29 @@ def home():
 def status():
     return jsonify({'status': 'online', 'robot': 'KIDA', 'message': 'All systems go!'})
 
+@app.route('/sensors')
+def sensors():
+    # Latest value and statistics of the last `seconds` (default 10) of every sensor
+    seconds = request.args.get('seconds', 10.0, type=float)
+    values = state.sensors.snapshot().values
+    return jsonify({name: {'value': getattr(values, name), 'stats': state.history[name].stats(seconds)}
+                    for name in state.SENSOR_FIELDS})
+
+@app.route('/sensors/<name>/history')
+def sensor_history(name):
+    # ?resolution=raw|1s|1min&seconds=600; t is time.monotonic(), compare with 'now'
+    if name not in state.history:
+        return jsonify({'error': f'unknown sensor {name}'}), 404
+    resolution = request.args.get('resolution', '1s')
+    if resolution != 'raw' and resolution not in state.history[name].levels:
+        return jsonify({'error': f'unknown resolution {resolution}'}), 400
+    view = state.history[name].history(resolution, request.args.get('seconds', type=float))
+    fields = ('t', 'v') if resolution == 'raw' else ('t', 'count', 'mean', 'min', 'max')
+    data = {field: view[field].tolist() for field in fields}
+    if resolution == 'raw':
+        data['v'] = [None if v != v else v for v in data['v']]  # NaN: no reading
+    return jsonify({'name': name, 'resolution': resolution, 'now': time.monotonic(), **data})
+
 @app.route('/command', methods=['POST'])
 def receive_command():
     data = request.get_json()
@@ -1,18 +1,37 @@
+import asyncio
+import itertools
 import numpy as np
 import os
+import time
+from collections import deque
+from concurrent.futures import Future
 from hailo_platform import (HEF, VDevice, HailoSchedulingAlgorithm, FormatType)
-from transformers import AutoTokenizer
 from queue import Queue, Empty
-from threading import Thread
+from threading import Thread, Lock
 from common.postprocessing import apply_repetition_penalty
+from whisper_decoder import WhisperDecoder, START_TOKEN_ID
+from common.decoding import make_strategy
+from common.tokenizer import load_tokenizer
+
+
+ENCODER_BUFFERS = 2  # encoder outputs in flight when pipelined: one being decoded, one being encoded
 
 
 class HailoWhisperPipeline:
     """
     A pipeline for running inference using Hailo's Whisper models.
+
+    Chunks are transcribed in submission order. With pipelined=True, the encoder and the decoder
+    run on separate threads, so the encoder of chunk n+1 overlaps the decoder of chunk n.
+    `submit()` returns a Future per chunk (with a `request_id`), so any number of callers and
+    threads can queue chunks and wait on their own results; `transcribe_async()` is the asyncio
+    equivalent.
+    `send_data()`/`get_transcription()` keep the original FIFO interface on top of it.
     """
 
-    def __init__(self, encoder_model_path=None, decoder_model_path=None, variant="tiny", host="arm64", multi_process_service=False):
+    def __init__(self, encoder_model_path=None, decoder_model_path=None, variant="tiny", host="arm64", multi_process_service=False,
+                 incremental_decoding=True, decoding_strategy="greedy", strategy_options=None, tokenizer_cache_dir=None,
+                 pipelined=True):
         if encoder_model_path is None:
             encoder_model_path = "/home/kida-01/Desktop/Kida-Robot/scripts/resources/hefs/h8l/base/base-whisper-encoder-5s_h8l.hef"
         if decoder_model_path is None:
@@ -26,18 +45,27 @@ class HailoWhisperPipeline:
         self.decoding_sequence_length = 32 if self.variant == "tiny" else 24
         self.host = host  # not used in this version
         self.multi_process_service = multi_process_service
+        self.incremental_decoding = incremental_decoding
+        self.pipelined = pipelined  # run the encoder of the next chunk while the current one is decoded
+        self.decoding_strategy = make_strategy(decoding_strategy, **(strategy_options or {}))
+        self.token_times = []  # per-token decoder step times (seconds) of the last chunk
 
-        # Token embedding
+        # Token embedding (memory-mapped: only the rows of generated tokens are ever read)
         self.token_embedding_weight = self._load_token_embedding_weight()
         self.onnx_add_input = self._load_onnx_add_input()
 
         self.constant_output_0 = np.array([1])  # Unsqueeze axis
-        self._load_tokenizer()
-
-        self.data_queue = Queue()
-        self.results_queue = Queue()
+        # The tokenizer is loaded on first use, on the inference thread
+        self.tokenizer_cache_dir = tokenizer_cache_dir
+        self._tokenizer = None
+        self._tokenizer_lock = Lock()
+
+        self.data_queue = Queue()  # (request_id, mel, future)
+        self.request_ids = itertools.count()
+        self.pending = deque()  # futures of send_data(), consumed by get_transcription()
         self.running = True
-        self.thread = Thread(target=self._inference_loop)
+        self._submit_lock = Lock()  # no request is queued after running drops and the queue is cancelled
+        self.thread = Thread(target=self._serve)
         self.thread.start()
 
     def _load_token_embedding_weight(self):
@@ -48,7 +76,7 @@ class HailoWhisperPipeline:
         file_path = os.path.join(base_path,
                          f"resources/decoder_assets/{self.variant}/decoder_tokenization/token_embedding_weight_{self.variant}.npy")
 
-        return np.load(file_path)
+        return np.load(file_path, mmap_mode="r")
 
     def _load_onnx_add_input(self):
         base_path = os.path.dirname(os.path.abspath(__file__))
@@ -56,14 +84,22 @@ class HailoWhisperPipeline:
                                 f"resources/decoder_assets/{self.variant}/decoder_tokenization/onnx_add_input_{self.variant}.npy")
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"[ERROR] Missing required ONNX add input file: {file_path}")
-        return np.load(file_path)
+        return np.load(file_path, mmap_mode="r")
 
 
     def _load_tokenizer(self):
         """
-        Load the tokenizer for the specified variant.
+        Load the tokenizer for the specified variant from the local decode table cache.
         """
-        self.tokenizer = AutoTokenizer.from_pretrained(f"openai/whisper-{self.variant}")
+        with self._tokenizer_lock:
+            if self._tokenizer is None:
+                self._tokenizer = load_tokenizer(self.variant, self.tokenizer_cache_dir)
+        return self._tokenizer
+
+    @property
+    def tokenizer(self):
+        """Token decoder, loaded on first access."""
+        return self._tokenizer or self._load_tokenizer()
 
     def _tokenization(self, decoder_input_ids):
         """
@@ -83,6 +119,26 @@ class HailoWhisperPipeline:
 
         return transpose_output
 
+    def _serve(self):
+        """
+        Run the inference loop and, once it exits (stopped or failed), cancel the queued requests.
+        """
+        try:
+            self._inference_loop()
+        finally:
+            with self._submit_lock:
+                self.running = False
+            self._cancel_queued()
+
+    def _cancel_queued(self):
+        """Cancel the requests still waiting in the queue so no caller waits forever."""
+        while True:
+            try:
+                _, _, future = self.data_queue.get_nowait()
+            except Empty:
+                return
+            future.cancel()
+
     def _inference_loop(self):
         """
         Main inference loop for processing input data and generating transcriptions.
@@ -117,73 +173,194 @@ class HailoWhisperPipeline:
                     encoder_bindings = encoder_configured_infer_model.create_bindings()
                     decoder_bindings = decoder_configured_infer_model.create_bindings()
 
-                    while self.running:
+                    # Encoder outputs go into a small pool of buffers: while the decoder reads one,
+                    # the encoder can already fill the next
+                    free_buffers = Queue()
+                    for _ in range(ENCODER_BUFFERS if self.pipelined else 1):
+                        free_buffers.put(np.zeros(encoder_infer_model.output().shape, dtype=np.float32))
+
+                    decoder = None
+                    if self.incremental_decoding:
+                        decoder = WhisperDecoder(
+                            decoder_configured_infer_model, decoder_infer_model, decoder_bindings,
+                            decoder_model_name, sorted_output_names,
+                            self.token_embedding_weight, self.onnx_add_input,
+                            self.decoding_sequence_length, self.tokenizer.eos_token_id, self.timeout_ms,
+                            strategy=self.decoding_strategy
+                        )
+
+                    def encode(input_mel):
+                        encoder_output = free_buffers.get()
                         try:
-                            # Wait for new data with a timeout to allow clean exit
-                            input_mel = self.data_queue.get(timeout=1)
+                            encoder_bindings.input().set_buffer(np.ascontiguousarray(input_mel))
+                            encoder_bindings.output().set_buffer(encoder_output)
+                            encoder_configured_infer_model.run([encoder_bindings], self.timeout_ms)
+                        except Exception:
+                            free_buffers.put(encoder_output)
+                            raise
+                        return encoder_output
 
-                            transcriptions = []
-                            input_mel = np.ascontiguousarray(input_mel)
-                            encoder_bindings.input().set_buffer(input_mel)
-                            buffer = np.zeros(encoder_infer_model.output().shape).astype(np.float32)
-                            encoder_bindings.output().set_buffer(buffer)
+                    def decode(encoded_features):
+                        try:
+                            if decoder is not None:
+                                generated_tokens = decoder.decode(encoded_features)
+                                self.token_times = decoder.token_times
+                            else:
+                                generated_tokens = self._decode_full_sequence(
+                                    decoder_configured_infer_model, decoder_infer_model, decoder_bindings,
+                                    decoder_model_name, sorted_output_names, encoded_features
+                                )
+                        finally:
+                            free_buffers.put(encoded_features)
+
+                        # Convert token IDs to text
+                        return self.tokenizer.decode(generated_tokens, skip_special_tokens=True)
+
+                    if not self.pipelined:
+                        while self.running:
+                            request = self._next_request()
+                            if request is None:
+                                continue
+                            request_id, input_mel, future = request
+                            try:
+                                future.set_result(decode(encode(input_mel)))
+                            except Exception as e:
+                                self._fail_request(request_id, future, e)
+                        return
+
+                    # Two stages: this thread runs the encoder, a second one the decoder loop
+                    encoded_queue = Queue()
+                    decoder_thread = Thread(target=self._decoder_stage, args=(encoded_queue, decode))
+                    decoder_thread.start()
+                    try:
+                        while self.running:
+                            request = self._next_request()
+                            if request is None:
+                                continue
+                            request_id, input_mel, future = request
+                            try:
+                                encoded_queue.put((request_id, encode(input_mel), future))
+                            except Exception as e:
+                                self._fail_request(request_id, future, e)
+                    finally:
+                        encoded_queue.put(None)  # decode what is already encoded, then exit
+                        decoder_thread.join()
+
+    def _next_request(self):
+        """
+        Wait up to one second for the next request.
 
-                            encoder_configured_infer_model.run([encoder_bindings], self.timeout_ms)
-                            encoded_features = encoder_bindings.output().get_buffer()
+        :return: (request_id, mel, future), or None on timeout or if the request was cancelled.
+        """
+        try:
+            request_id, input_mel, future = self.data_queue.get(timeout=1)
+        except Empty:
+            return None
+        if not future.set_running_or_notify_cancel():
+            return None
+        return request_id, input_mel, future
+
+    def _decoder_stage(self, encoded_queue, decode):
+        """
+        Decoder stage of the pipelined loop: decode encoded chunks in order until None is received.
+        """
+        while True:
+            item = encoded_queue.get()
+            if item is None:
+                return
+            request_id, encoded_features, future = item
+            try:
+                future.set_result(decode(encoded_features))
+            except Exception as e:
+                self._fail_request(request_id, future, e)
+
+    @staticmethod
+    def _fail_request(request_id, future, error):
+        print(f"[ERROR] Transcription of request {request_id} failed: {error}")
+        future.set_exception(error)
+
+    def _decode_full_sequence(self, decoder_configured_infer_model, decoder_infer_model, decoder_bindings,
+                              decoder_model_name, sorted_output_names, encoded_features):
+        """
+        Reference decoder that re-tokenizes the whole sequence and allocates new buffers every step.
+        Kept to compare against the incremental decoder (incremental_decoding=False).
 
-                            # Decoder
-                            start_token_id = [50258]
-                            decoder_input_ids = np.array(
-                                [[start_token_id[0]]], dtype=np.int64
-                            )  # Shape (1,1)
-                            decoder_input_ids = np.concatenate(
-                                [decoder_input_ids, np.zeros((1, self.decoding_sequence_length - 1), dtype=np.int64)], axis=1
-                            )
+        :return: List of generated token IDs.
+        """
+        decoder_input_ids = np.zeros((1, self.decoding_sequence_length), dtype=np.int64)
+        decoder_input_ids[0][0] = START_TOKEN_ID
 
-                            generated_tokens = []
-                            decoder_outputs = None
-                            # Run Decoder Iteratively
-                            for i in range(self.decoding_sequence_length - 1):
-                                tokenized_ids = self._tokenization(decoder_input_ids)
+        generated_tokens = []
+        self.token_times = []
+        # Run Decoder Iteratively
+        for i in range(self.decoding_sequence_length - 1):
+            step_start = time.perf_counter()
+            tokenized_ids = self._tokenization(decoder_input_ids)
 
-                                decoder_bindings.input(f"{decoder_model_name}/input_layer1").set_buffer(encoded_features)
-                                decoder_bindings.input(f"{decoder_model_name}/input_layer2").set_buffer(tokenized_ids)
+            decoder_bindings.input(f"{decoder_model_name}/input_layer1").set_buffer(encoded_features)
+            decoder_bindings.input(f"{decoder_model_name}/input_layer2").set_buffer(tokenized_ids)
 
-                                buffers = [
-                                    np.zeros(decoder_infer_model.output(name).shape).astype(np.float32) for name in sorted_output_names
-                                ]
+            buffers = [
+                np.zeros(decoder_infer_model.output(name).shape).astype(np.float32) for name in sorted_output_names
+            ]
 
-                                for name, buffer in zip(sorted_output_names, buffers):
-                                    decoder_bindings.output(name).set_buffer(buffer)
+            for name, buffer in zip(sorted_output_names, buffers):
+                decoder_bindings.output(name).set_buffer(buffer)
 
-                                decoder_configured_infer_model.run([decoder_bindings], self.timeout_ms)  # run decoder
+            decoder_configured_infer_model.run([decoder_bindings], self.timeout_ms)  # run decoder
 
-                                decoder_outputs = np.concatenate(
-                                    [decoder_bindings.output(name).get_buffer() for name in sorted_output_names], axis=2
-                                )
-                                
-
-                                # Decoder post-processing
-                                repetition_penalty = 1.5
-                                logits = apply_repetition_penalty(decoder_outputs[:, i], generated_tokens, penalty=repetition_penalty)
-                                next_token = np.argmax(logits)
-                                #else:
-                                #   next_token = np.argmax(decoder_outputs[0][:, i])
-
-                                generated_tokens.append(next_token)
-                                decoder_input_ids[0][i + 1] = np.array([[next_token]], dtype=np.int64)
-
-                                if next_token == self.tokenizer.eos_token_id:
-                                    break
-
-                            # Convert token IDs to text
-                            transcription = self.tokenizer.decode(
-                                generated_tokens, skip_special_tokens=True
-                            )
-                            self.results_queue.put(transcription)
-                            transcriptions.append(transcription)
-                        except Empty:
-                            pass  # No data yet, continue looping
+            decoder_outputs = np.concatenate(
+                [decoder_bindings.output(name).get_buffer() for name in sorted_output_names], axis=2
+            )
+
+            # Decoder post-processing
+            repetition_penalty = 1.5
+            logits = apply_repetition_penalty(decoder_outputs[:, i], generated_tokens, penalty=repetition_penalty)
+            next_token = np.argmax(logits)
+
+            generated_tokens.append(next_token)
+            decoder_input_ids[0][i + 1] = next_token
+            self.token_times.append(time.perf_counter() - step_start)
+
+            if next_token == self.tokenizer.eos_token_id:
+                break
+
+        return generated_tokens
+
+    def get_token_timings(self):
+        """
+        Per-token decoder timings of the last transcribed chunk.
+
+        :return: List of step durations in milliseconds.
+        """
+        return [t * 1000 for t in self.token_times]
+
+    def submit(self, data):
+        """
+        Queue a mel spectrogram chunk for transcription.
+
+        :param data: Input data to process.
+        :return: concurrent.futures.Future resolving to the transcription. Its `request_id`
+                 attribute identifies the chunk in logs.
+        """
+        future = Future()
+        future.request_id = next(self.request_ids)
+        with self._submit_lock:
+            if self.running:
+                self.data_queue.put((future.request_id, data, future))
+                return future
+        future.cancel()
+        future.set_running_or_notify_cancel()
+        return future
+
+    async def transcribe_async(self, data):
+        """
+        Transcribe a chunk without blocking the event loop.
+
+        :param data: Input data to process.
+        :return: Transcription result.
+        """
+        return await asyncio.wrap_future(self.submit(data))
 
     def send_data(self, data):
         """
@@ -191,20 +368,22 @@ class HailoWhisperPipeline:
 
         :param data: Input data to process.
         """
-        self.data_queue.put(data)
+        self.pending.append(self.submit(data))
 
     def get_transcription(self):
         """
-        Retrieve the next transcription result.
+        Retrieve the next transcription result, in the order the data was sent.
 
         :return: Transcription result.
         """
-        return self.results_queue.get()
+        return self.pending.popleft().result()
 
     def stop(self):
         """
         Stop the processing loop.
         """
-        self.running = False
+        with self._submit_lock:
+            self.running = False
         self.thread.join()
+        self._cancel_queued()  # submitted while the loop was exiting
 
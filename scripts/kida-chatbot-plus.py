@@ -1,9 +1,9 @@
 import os
 import speech_recognition as sr
 import whisper
-import requests
-from elevenlabs.client import ElevenLabs
-from elevenlabs import play
+from common.llm_streaming import STREAM_LLM, ask_llm_stream, make_voice, OPENROUTER_URL
+from common.tts_cache import CANNED_PHRASES
+from common.tts import elevenlabs_tts
 import pygame
 import threading
 import re
@@ -24,8 +24,7 @@ def load_key(path):
 OPENROUTER_API_KEY = load_key(os.path.join(BASE_DIR, "keys/openrouter-api-key.txt"))
 ELEVEN_API_KEY = load_key(os.path.join(BASE_DIR, "keys/elevenlabs-api-key.txt"))
 
-# ElevenLabs client
-client = ElevenLabs(api_key=ELEVEN_API_KEY)
+SYSTEM_PROMPT = "You are KIDA, a flirty, sarcastic AI tank robot girl. Keep your responses clever, short, and spicy."
 
 # Voice selection
 selected_voice = "Rachel"
@@ -68,6 +67,10 @@ def init_display():
     screen = pygame.display.set_mode((341, 512))  # or dynamically set size later
     update_image(os.path.join(BASE_DIR, "images", "idle.png"))
 
+http, voice = make_voice("elevenlabs", selected_voice,
+                         lambda text, client: elevenlabs_tts(text, ELEVEN_API_KEY, selected_voice, client=client))
+
+
 # === VOICE OUTPUT ===
 def speak(text):
     # Extract expression keywords like "wink", "smile", etc. (you can expand this list)
@@ -84,12 +87,7 @@ def speak(text):
     print("KIDA says:", spoken)
 
     try:
-        audio = client.generate(
-            text=spoken,
-            voice=selected_voice,
-            model="eleven_monolingual_v1"
-        )
-        play(audio)
+        voice.play_audio(voice.synthesize(spoken))
     except Exception as e:
         print("Voice error:", e)
         print(spoken)
@@ -111,7 +109,7 @@ def ask_llm(prompt):
     data = {
         "model": "meta-llama/llama-3-8b-instruct",
         "messages": [
-            {"role": "system", "content": "You are KIDA, a flirty, sarcastic AI tank robot girl. Keep your responses clever, short, and spicy."},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt}
         ],
         "max_tokens": 120,
@@ -119,7 +117,7 @@ def ask_llm(prompt):
     }
 
     try:
-        response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=data, timeout=30)
+        response = http.post(OPENROUTER_URL, endpoint="openrouter", headers=headers, json=data)
         output = response.json()
         print("🔍 LLM raw response:", output)
 
@@ -147,6 +145,7 @@ def transcribe(audio_data):
 # === MAIN LOOP ===
 def main():
     recognizer = sr.Recognizer()
+    voice.prewarm(CANNED_PHRASES)
     print("🔋 KIDA online. Awaiting orders, hotshot.")
 
     while True:
@@ -166,8 +165,12 @@ def main():
                     speak("Going dark. Goodbye, commander.")
                     break
 
-                reply = ask_llm(text)
-                speak(reply)
+                if STREAM_LLM:
+                    voice.speak_stream(ask_llm_stream(OPENROUTER_API_KEY, SYSTEM_PROMPT, text))
+                    update_image(os.path.join(BASE_DIR, "images", "idle.png"))
+                else:
+                    reply = ask_llm(text)
+                    speak(reply)
 
         except sr.WaitTimeoutError:
             print("⏱️ Listening timed out.")
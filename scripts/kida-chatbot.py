@@ -1,15 +1,14 @@
 import os
 import re
-import tempfile
-import subprocess
 import speech_recognition as sr
 import whisper
-import requests
 import os
 os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
 os.environ["SDL_AUDIODRIVER"] = "alsa"
 
-from elevenlabs import ElevenLabs
+from common.llm_streaming import STREAM_LLM, ask_llm_stream, make_voice, OPENROUTER_URL
+from common.tts_cache import CANNED_PHRASES
+from common.tts import elevenlabs_tts
 
 import warnings, sys, os
 
@@ -37,14 +36,17 @@ def load_key(path):
 OPENROUTER_API_KEY = load_key(os.path.join(BASE_DIR, "keys/openrouter-api-key.txt"))
 ELEVEN_API_KEY = load_key(os.path.join(BASE_DIR, "keys/elevenlabs-api-key.txt"))
 
-# ElevenLabs client
-client = ElevenLabs(api_key=ELEVEN_API_KEY)
+SYSTEM_PROMPT = "You are KIDA, a flirty, sarcastic AI tank robot girl. Keep your responses clever, short, and spicy."
 
 # Voice selection
 selected_voice = "Rachel"
 print("🎙️ Using voice:", selected_voice)
 
 
+http, voice = make_voice("elevenlabs", selected_voice,
+                         lambda text, client: elevenlabs_tts(text, ELEVEN_API_KEY, selected_voice, client=client))
+
+
 # === VOICE OUTPUT ===
 def speak(text):
     expression_match = re.search(r"\b(wink|smile|frown|blush)\b", text)
@@ -56,23 +58,13 @@ def speak(text):
     print("KIDA says:", spoken)
 
     try:
-        audio = client.generate(
-            text=spoken,
-            voice=selected_voice,
-            model="eleven_monolingual_v1"
-        )
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as f:
-            f.write(audio)
-            f.flush()
-            subprocess.run(["aplay", "-q", f.name])
+        voice.play_audio(voice.synthesize(spoken))
     except Exception as e:
         print("❌ Voice error:", e)
         print(spoken)
 
     return expression
 
-
-
 # === LLM REQUEST ===
 def ask_llm(prompt):
     headers = {
@@ -84,7 +76,7 @@ def ask_llm(prompt):
     data = {
         "model": "meta-llama/llama-3-8b-instruct",
         "messages": [
-            {"role": "system", "content": "You are KIDA, a flirty, sarcastic AI tank robot girl. Keep your responses clever, short, and spicy."},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt}
         ],
         "max_tokens": 120,
@@ -92,10 +84,7 @@ def ask_llm(prompt):
     }
 
     try:
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers, json=data, timeout=30
-        )
+        response = http.post(OPENROUTER_URL, endpoint="openrouter", headers=headers, json=data)
         output = response.json()
         print("🔍 Full LLM response:", output)  # <-- full debug
 
@@ -128,6 +117,7 @@ def transcribe(audio_data):
 # === MAIN LOOP ===
 def main():
     recognizer = sr.Recognizer()
+    voice.prewarm(CANNED_PHRASES)
     print("🔋 KIDA online. Awaiting orders, hotshot.")
 
     while True:
@@ -145,8 +135,11 @@ def main():
                     speak("Going dark. Goodbye, commander.")
                     break
 
-                reply = ask_llm(text)
-                speak(reply)
+                if STREAM_LLM:
+                    voice.speak_stream(ask_llm_stream(OPENROUTER_API_KEY, SYSTEM_PROMPT, text))
+                else:
+                    reply = ask_llm(text)
+                    speak(reply)
 
         except sr.WaitTimeoutError:
             print("⏱️ Listening timed out.")
@@ -5,7 +5,8 @@ import time
 import logging
 
 # Configuration
-LOOP_DELAY = 0.05               # 50ms loop delay
+SENSOR_TIMEOUT = 1.0            # Warn when no line reading arrives for this long
+LINE_SENSORS = ("lf_left", "lf_mid", "lf_right")
 LINE_THRESHOLD = 500            # Adjust based on your sensor calibration
 TURN_SPEED_MULTIPLIER = 0.8     # Reduce speed when turning
 SEARCH_TIMEOUT = 3.0            # Seconds to search for line before stopping
@@ -21,31 +22,25 @@ search_direction = "RIGHT"      # Start searching right when line is lost
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def read_line_sensors():
+def read_line_sensors(snapshot=None):
     """
-    Read line follower sensor values from state.py
-    Returns tuple of (left, middle, right) sensor values
-    Returns None for any sensor that's not working
+    Read line follower sensor values from state.sensors (or from a snapshot of it)
+    Returns tuple of (left, middle, right) sensor values, from the same update
+    Returns None for any sensor that has not reported yet
     """
-    def parse_sensor(value):
-        if value is None:
-            return None
-        try:
-            # Handle both "Sensor: 500" format and direct numeric values
-            if isinstance(value, str) and ": " in value:
-                return int(value.split(": ")[1])
-            elif isinstance(value, (int, float)):
-                return int(value)
-            else:
-                return int(str(value))
-        except (ValueError, IndexError, AttributeError):
-            return None
-
-    left = parse_sensor(getattr(state, 'lfLeftValue', None))
-    middle = parse_sensor(getattr(state, 'lfMidValue', None))
-    right = parse_sensor(getattr(state, 'lfRightValue', None))
+    values = (snapshot or state.sensors.snapshot()).values
+    return values.lf_left, values.lf_mid, values.lf_right
 
-    return left, middle, right
+def wait_line_sensors(snapshot):
+    """
+    Block until the Arduino reader stores a new line sensor reading.
+    Returns the new snapshot (the same one on timeout, after a warning)
+    """
+    update = state.sensors.wait(snapshot, LINE_SENSORS, timeout=SENSOR_TIMEOUT)
+    if update is None:
+        logger.warning(f"No line sensor reading for {SENSOR_TIMEOUT}s")
+        return snapshot
+    return update
 
 def detect_line_position(left, middle, right):
     """
@@ -150,11 +145,12 @@ def reset_line_lost_state():
     line_lost_time = None
     search_turn_count = 0
 
-def line_follower_step():
+def line_follower_step(snapshot=None):
     """
     Single step of line following logic.
     """
-    left, middle, right = read_line_sensors()
+    snapshot = snapshot or state.sensors.snapshot()
+    left, middle, right = read_line_sensors(snapshot)
     
     # Detect line position
     position, confidence = detect_line_position(left, middle, right)
@@ -167,7 +163,8 @@ def line_follower_step():
     command = calculate_line_following_command(position, confidence)
     
     # Send command to Arduino
-    send_command(command)
+    send_command("dev00", command)
+    state.reactions.record("LineFollower", snapshot, LINE_SENSORS)
     
     # Update system status
     sensor_status = []
@@ -193,14 +190,15 @@ def run_line_follower():
     """
     logger.info("Starting line follower system...")
     
+    snapshot = state.sensors.snapshot()
     try:
         while True:
             try:
-                line_follower_step()
-                time.sleep(LOOP_DELAY)
+                snapshot = wait_line_sensors(snapshot)
+                line_follower_step(snapshot)
             except Exception as e:
                 logger.error(f"Error in line follower step: {e}")
-                send_command("STOP")  # Safety stop on error
+                send_command("dev00", "STOP")  # Safety stop on error
                 time.sleep(0.1)  # Brief pause before retrying
                 
     except KeyboardInterrupt:
@@ -208,9 +206,10 @@ def run_line_follower():
     except Exception as e:
         logger.error(f"Fatal error in line follower: {e}")
     finally:
-        send_command("STOP")
+        send_command("dev00", "STOP")
         state.systemStatus = "LineFollower: STOPPED"
         logger.info("Line follower stopped safely.")
+        print(state.reactions.report())
 
 def calibrate_sensors():
     """
@@ -239,16 +238,18 @@ def test_line_following():
     """
     print("Testing line following for 30 seconds...")
     start_time = time.time()
+    snapshot = state.sensors.snapshot()
     
     try:
         while time.time() - start_time < 30:
-            line_follower_step()
-            time.sleep(LOOP_DELAY)
+            snapshot = wait_line_sensors(snapshot)
+            line_follower_step(snapshot)
     except KeyboardInterrupt:
         pass
     finally:
-        send_command("STOP")
+        send_command("dev00", "STOP")
         print("Line following test complete.")
+        print(state.reactions.report())
 
 # Advanced line following with PID-like behavior
 class PIDLineFollower:
@@ -326,10 +327,12 @@ def run_pid_line_follower():
     Run the advanced PID-based line follower.
     """
     logger.info("Starting PID line follower...")
+    snapshot = state.sensors.snapshot()
     
     try:
         while True:
-            left, middle, right = read_line_sensors()
+            snapshot = wait_line_sensors(snapshot)
+            left, middle, right = read_line_sensors(snapshot)
             command = pid_controller.update(left, middle, right)
             
             if command == "SEARCH":
@@ -337,7 +340,8 @@ def run_pid_line_follower():
             else:
                 reset_line_lost_state()
             
-            send_command(command)
+            send_command("dev00", command)
+            state.reactions.record("PID_LineFollower", snapshot, LINE_SENSORS)
             
             # Status update
             error = pid_controller.calculate_error(left, middle, right)
@@ -345,11 +349,10 @@ def run_pid_line_follower():
             state.systemStatus = status
             print(status)
             
-            time.sleep(LOOP_DELAY)
-            
     except KeyboardInterrupt:
-        send_command("STOP")
+        send_command("dev00", "STOP")
         logger.info("PID line follower stopped safely.")
+        print(state.reactions.report())
 
 if __name__ == "__main__":
     # Choose which line follower to run
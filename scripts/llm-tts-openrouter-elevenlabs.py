@@ -1,9 +1,9 @@
 import os
 import speech_recognition as sr
 import whisper
-import requests
-from elevenlabs.client import ElevenLabs
-from elevenlabs import play
+from common.llm_streaming import STREAM_LLM, ask_llm_stream, make_voice, OPENROUTER_URL
+from common.tts_cache import CANNED_PHRASES
+from common.tts import elevenlabs_tts
 import re
 
 # === CONFIG ===
@@ -22,13 +22,16 @@ def load_key(path):
 OPENROUTER_API_KEY = load_key(os.path.join(BASE_DIR, "keys/openrouter-api-key.txt"))
 ELEVEN_API_KEY = load_key(os.path.join(BASE_DIR, "keys/elevenlabs-api-key.txt"))
 
-# ElevenLabs client
-client = ElevenLabs(api_key=ELEVEN_API_KEY)
+SYSTEM_PROMPT = "You are KIDA, a flirty, sarcastic AI tank robot girl. Keep your responses clever, short, and spicy."
 
 # Voice selection
 selected_voice = "Rachel"
 print("🎙️ Using voice: Rachel")
 
+http, voice = make_voice("elevenlabs", selected_voice,
+                         lambda text, client: elevenlabs_tts(text, ELEVEN_API_KEY, selected_voice, client=client))
+
+
 # === VOICE OUTPUT ===
 def speak(text):
     expression_match = re.search(r"\b(wink|smile|frown|blush)\b", text)
@@ -42,13 +45,7 @@ def speak(text):
     print("KIDA says:", spoken)
 
     try:
-        audio_stream = client.text_to_speech.convert(
-            voice_id=selected_voice,
-            text=spoken,
-            model_id="eleven_monolingual_v1"
-        )
-        audio_bytes = b"".join(audio_stream)
-        play(audio_bytes)
+        voice.play_audio(voice.synthesize(spoken))
     except Exception as e:
         print("Voice error:", e)
         print(spoken)
@@ -66,7 +63,7 @@ def ask_llm(prompt):
     data = {
         "model": "meta-llama/llama-3-8b-instruct",
         "messages": [
-            {"role": "system", "content": "You are KIDA, a flirty, sarcastic AI tank robot girl. Keep your responses clever, short, and spicy."},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt}
         ],
         "max_tokens": 120,
@@ -74,7 +71,7 @@ def ask_llm(prompt):
     }
 
     try:
-        response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=data, timeout=30)
+        response = http.post(OPENROUTER_URL, endpoint="openrouter", headers=headers, json=data)
         output = response.json()
         print("🔍 LLM raw response:", output)
 
@@ -102,6 +99,7 @@ def transcribe(audio_data):
 # === MAIN LOOP ===
 def main():
     recognizer = sr.Recognizer()
+    voice.prewarm(CANNED_PHRASES)
     print("🔋 KIDA online. Awaiting orders, hotshot.")
 
     while True:
@@ -119,8 +117,11 @@ def main():
                     speak("Going dark. Goodbye, commander.")
                     break
 
-                reply = ask_llm(text)
-                speak(reply)
+                if STREAM_LLM:
+                    voice.speak_stream(ask_llm_stream(OPENROUTER_API_KEY, SYSTEM_PROMPT, text))
+                else:
+                    reply = ask_llm(text)
+                    speak(reply)
 
         except sr.WaitTimeoutError:
             print("⏱️ Listening timed out.")
@@ -1,14 +1,13 @@
 import os
 import speech_recognition as sr
-import requests
-from gtts import gTTS
 import re
-import tempfile
-import pygame
 import warnings
 import threading
 from queue import Queue
 from faster_whisper import WhisperModel
+from common.llm_streaming import STREAM_LLM, ask_llm_stream, make_voice, OPENROUTER_URL
+from common.tts_cache import CANNED_PHRASES
+from common.tts import google_tts
 
 warnings.filterwarnings("ignore")
 
@@ -24,11 +23,14 @@ def load_key(path):
 
 OPENROUTER_API_KEY = load_key(os.path.join(BASE_DIR, "keys/openrouter-api-key.txt"))
 
-pygame.mixer.init()
+SYSTEM_PROMPT = "You are KIDA, a flirty, sarcastic AI tank robot girl. Keep your responses clever, short, and spicy."
 
 # === TASK QUEUE ===
 task_queue = Queue()
 
+http, voice = make_voice("gtts", "en", lambda text, client: google_tts(text, client=client))
+
+
 # === VOICE OUTPUT ===
 def speak(text):
     expression_match = re.search(r"\b(wink|smile|frown|blush)\b", text)
@@ -40,13 +42,7 @@ def speak(text):
     print("KIDA says:", spoken)
 
     try:
-        tts = gTTS(spoken)
-        tmp_path = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3").name
-        tts.save(tmp_path)
-        pygame.mixer.music.load(tmp_path)
-        pygame.mixer.music.play()
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
+        voice.play_audio(voice.synthesize(spoken))
     except Exception as e:
         print("Voice error:", e)
         print(spoken)
@@ -64,7 +60,7 @@ def ask_llm(prompt):
     data = {
         "model": "meta-llama/llama-3-8b-instruct",
         "messages": [
-            {"role": "system", "content": "You are KIDA, a flirty, sarcastic AI tank robot girl. Keep your responses clever, short, and spicy."},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt}
         ],
         "max_tokens": 120,
@@ -72,8 +68,7 @@ def ask_llm(prompt):
     }
 
     try:
-        response = requests.post("https://openrouter.ai/api/v1/chat/completions",
-                                 headers=headers, json=data, timeout=30)
+        response = http.post(OPENROUTER_URL, endpoint="openrouter", headers=headers, json=data)
         output = response.json()
         print("🔍 LLM raw response:", output)
 
@@ -114,8 +109,11 @@ def process_tasks():
             speak("Going dark. Goodbye, commander.")
             os._exit(0)
         elif text and text not in ["[Silence]", ""]:
-            reply = ask_llm(text)
-            speak(reply)
+            if STREAM_LLM:
+                voice.speak_stream(ask_llm_stream(OPENROUTER_API_KEY, SYSTEM_PROMPT, text))
+            else:
+                reply = ask_llm(text)
+                speak(reply)
         task_queue.task_done()
 
 threading.Thread(target=process_tasks, daemon=True).start()
@@ -126,6 +124,7 @@ def main():
     recognizer.energy_threshold = 400  # tweak for sensitivity
     recognizer.dynamic_energy_threshold = True
 
+    voice.prewarm(CANNED_PHRASES)
     print("🔋 KIDA online. Awaiting orders, hotshot.")
 
     while True:
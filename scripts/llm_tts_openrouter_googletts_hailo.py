@@ -1,7 +1,5 @@
 import os
 import re
-import time
-import tempfile
 import queue
 import threading
 import argparse
@@ -9,15 +7,16 @@ import sys
 
 import speech_recognition as sr
 import whisper
-import requests
-from gtts import gTTS
-import pygame
 
 # --- Hailo imports ---
 from hailo_whisper_pipeline import HailoWhisperPipeline
 from common.audio_utils import load_audio
 from common.preprocessing import preprocess, improve_input_audio
 from common.postprocessing import clean_transcription
+from common.streaming import StreamingTranscriber
+from common.llm_streaming import STREAM_LLM, ask_llm_stream, make_voice, OPENROUTER_URL
+from common.tts_cache import CANNED_PHRASES
+from common.tts import google_tts
 from whisper_hef_registry import HEF_REGISTRY
 
 # === CONFIG ===
@@ -35,12 +34,18 @@ def log_to_ui(message):
     except queue.Full:
         pass
 
+def log(message):
+    print(message)
+    log_to_ui(message)
+
 def load_key(path):
     with open(path, "r") as f:
         return f.readline().strip()
 
 OPENROUTER_API_KEY = load_key(OPENROUTER_API_KEY_PATH)
 
+SYSTEM_PROMPT = "You are KIDA, a flirty, sarcastic AI tank robot girl. Keep your responses clever, short, and spicy."
+
 # === ARGUMENT PARSER ===
 def get_args():
     parser = argparse.ArgumentParser(description="Whisper Hailo Pipeline")
@@ -68,6 +73,11 @@ def get_args():
         action="store_true",
         help="Enable multi-process service to run other models in addition to Whisper"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the microphone into Hailo Whisper instead of recording clips to input.wav"
+    )
     return parser.parse_args()
 
 args = get_args()
@@ -92,7 +102,8 @@ else:
     model = whisper.load_model("base", download_root=WHISPER_MODEL_DIR)
 
 # === VOICE OUTPUT ===
-pygame.mixer.init()
+http, voice = make_voice("gtts", "en", lambda text, client: google_tts(text, client=client))
+
 
 def speak(text):
     expression_match = re.search(r"\b(wink|smile|frown|blush)\b", text)
@@ -107,13 +118,7 @@ def speak(text):
     log_to_ui(f"KIDA says: {spoken}")
 
     try:
-        tts = gTTS(spoken)
-        tmp_path = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3").name
-        tts.save(tmp_path)
-        pygame.mixer.music.load(tmp_path)
-        pygame.mixer.music.play()
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
+        voice.play_audio(voice.synthesize(spoken))
     except Exception as e:
         print("Voice error:", e)
         log_to_ui(f"Voice error: {e}")
@@ -131,14 +136,14 @@ def ask_llm(prompt):
     data = {
         "model": "meta-llama/llama-3-8b-instruct",
         "messages": [
-            {"role": "system", "content": "You are KIDA, a flirty, sarcastic AI tank robot girl. Keep your responses clever, short, and spicy."},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt}
         ],
         "max_tokens": 120,
         "temperature": 0.95
     }
     try:
-        response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=data, timeout=30)
+        response = http.post(OPENROUTER_URL, endpoint="openrouter", headers=headers, json=data)
         output = response.json()
         print("🔍 LLM raw response:", output)
         log_to_ui("🔍 LLM raw response received")
@@ -177,21 +182,61 @@ def transcribe(audio_data):
             chunk_offset=chunk_offset
         )
 
-        full_transcription = ""
-        for mel in mel_spectrograms:
-            hailo_whisper.send_data(mel)
-            time.sleep(0.2)  # Give time to process
-            raw_transcription = hailo_whisper.get_transcription()
-            clean_text = clean_transcription(raw_transcription)
-            full_transcription += clean_text + " "
-        return full_transcription.strip()
+        # Queue every chunk at once; results come back per request, in order
+        futures = [hailo_whisper.submit(mel) for mel in mel_spectrograms]
+        return " ".join(clean_transcription(future.result()) for future in futures).strip()
     else:
         result = model.transcribe(AUDIO_FILE)
         return result["text"]
 
+# === STREAMING MAIN LOOP ===
+def main_streaming():
+    transcriber = StreamingTranscriber(hailo_whisper, chunk_length=10 if VARIANT == "tiny" else 5)
+    transcriber.start()
+    voice.prewarm(CANNED_PHRASES)
+    print("🔋 KIDA online. Awaiting orders, hotshot.")
+    log_to_ui("🔋 KIDA online. Awaiting orders, hotshot.")
+
+    try:
+        while True:
+            try:
+                # Ignore anything the mic picked up while KIDA was talking
+                transcriber.flush()
+                print("🎤 Listening...")
+                log_to_ui("🎤 Listening...")
+                text = transcriber.listen(timeout=10)
+                if text is None:
+                    print("⏱️ Listening timed out.")
+                    log_to_ui("⏱️ Listening timed out.")
+                    speak("You gonna say something or just stare at me?")
+                    continue
+                print("You said:", text)
+                log_to_ui(f"You said: {text}")
+
+                if text.lower().strip(" .!?") in ["quit", "exit", "shutdown"]:
+                    speak("Going dark. Goodbye, commander.")
+                    break
+
+                if STREAM_LLM:
+                    voice.speak_stream(ask_llm_stream(OPENROUTER_API_KEY, SYSTEM_PROMPT, text, log=log), log=log)
+                else:
+                    reply = ask_llm(text)
+                    speak(reply)
+
+            except Exception as e:
+                print("Error:", e)
+                log_to_ui(f"Error: {e}")
+                speak("Oops. System hiccup. Try again, babe.")
+    finally:
+        transcriber.stop()
+
 # === MAIN LOOP ===
 def main():
+    if USE_HAILO and args.stream:
+        return main_streaming()
+
     recognizer = sr.Recognizer()
+    voice.prewarm(CANNED_PHRASES)
     print("🔋 KIDA online. Awaiting orders, hotshot.")
     log_to_ui("🔋 KIDA online. Awaiting orders, hotshot.")
 
@@ -212,8 +257,11 @@ def main():
                     speak("Going dark. Goodbye, commander.")
                     break
 
-                reply = ask_llm(text)
-                speak(reply)
+                if STREAM_LLM:
+                    voice.speak_stream(ask_llm_stream(OPENROUTER_API_KEY, SYSTEM_PROMPT, text, log=log), log=log)
+                else:
+                    reply = ask_llm(text)
+                    speak(reply)
 
         except sr.WaitTimeoutError:
             print("⏱️ Listening timed out.")
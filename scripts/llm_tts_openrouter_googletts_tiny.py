@@ -1,14 +1,12 @@
 import os
 import speech_recognition as sr
 import whisper
-import requests
-from gtts import gTTS
 import re
-import tempfile
 import time
-import pygame
-import tempfile
 import re
+from common.llm_streaming import STREAM_LLM, ask_llm_stream, make_voice, OPENROUTER_URL
+from common.tts_cache import CANNED_PHRASES
+from common.tts import google_tts
 
 import warnings
 warnings.filterwarnings("ignore")
@@ -29,7 +27,10 @@ def load_key(path):
 
 OPENROUTER_API_KEY = load_key(os.path.join(BASE_DIR, "keys/openrouter-api-key.txt"))
 
-pygame.mixer.init()
+SYSTEM_PROMPT = "You are KIDA, a flirty, sarcastic AI tank robot girl. Keep your responses clever, short, and spicy."
+
+http, voice = make_voice("gtts", "en", lambda text, client: google_tts(text, client=client))
+
 
 # === VOICE OUTPUT USING GOOGLE TTS ===
 def speak(text):
@@ -47,17 +48,7 @@ def speak(text):
     print("KIDA says:", spoken)
 
     try:
-        tts = gTTS(spoken)
-        tmp_path = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3").name
-        tts.save(tmp_path)
-
-        
-        pygame.mixer.music.load(tmp_path)
-        pygame.mixer.music.play()
-
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
-
+        voice.play_audio(voice.synthesize(spoken))
     except Exception as e:
         print("Voice error:", e)
         print(spoken)
@@ -75,7 +66,7 @@ def ask_llm(prompt):
     data = {
         "model": "meta-llama/llama-3-8b-instruct",
         "messages": [
-            {"role": "system", "content": "You are KIDA, a flirty, sarcastic AI tank robot girl. Keep your responses clever, short, and spicy."},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt}
         ],
         "max_tokens": 120,
@@ -83,7 +74,7 @@ def ask_llm(prompt):
     }
 
     try:
-        response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=data, timeout=30)
+        response = http.post(OPENROUTER_URL, endpoint="openrouter", headers=headers, json=data)
         output = response.json()
         print("🔍 LLM raw response:", output)
 
@@ -111,6 +102,7 @@ def transcribe(audio_data):
 # === MAIN LOOP ===
 def main():
     recognizer = sr.Recognizer()
+    voice.prewarm(CANNED_PHRASES)
     print("🔋 KIDA online. Awaiting orders, hotshot.")
 
     while True:
@@ -128,8 +120,11 @@ def main():
                     speak("Going dark. Goodbye, commander.")
                     break
 
-                reply = ask_llm(text)
-                speak(reply)
+                if STREAM_LLM:
+                    voice.speak_stream(ask_llm_stream(OPENROUTER_API_KEY, SYSTEM_PROMPT, text))
+                else:
+                    reply = ask_llm(text)
+                    speak(reply)
 
         except sr.WaitTimeoutError:
             print("⏱️ Listening timed out.")
@@ -1,11 +1,12 @@
 import os
 import speech_recognition as sr
-import requests
 import re
 import warnings
 import time
 from faster_whisper import WhisperModel
 import pyttsx3
+from common.llm_streaming import STREAM_LLM, ask_llm_stream, speak_sentences, OPENROUTER_URL
+from common.http_client import get_client
 
 warnings.filterwarnings("ignore")
 
@@ -22,6 +23,10 @@ def load_key(path):
 
 OPENROUTER_API_KEY = load_key(os.path.join(BASE_DIR, "keys/openrouter-api-key.txt"))
 
+http = get_client()
+
+SYSTEM_PROMPT = "You are KIDA, a flirty, sarcastic AI tank robot girl. Keep your responses clever, short, and spicy."
+
 # Initialize pyttsx3 TTS engine
 engine = pyttsx3.init()
 engine.setProperty("rate", 175)  # speaking speed
@@ -57,7 +62,7 @@ def ask_llm(prompt):
     data = {
         "model": "meta-llama/llama-3-8b-instruct",
         "messages": [
-            {"role": "system", "content": "You are KIDA, a flirty, sarcastic AI tank robot girl. Keep your responses clever, short, and spicy."},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt}
         ],
         "max_tokens": 120,
@@ -65,8 +70,7 @@ def ask_llm(prompt):
     }
 
     try:
-        response = requests.post("https://openrouter.ai/api/v1/chat/completions",
-                                 headers=headers, json=data, timeout=30)
+        response = http.post(OPENROUTER_URL, endpoint="openrouter", headers=headers, json=data)
         output = response.json()
         print("🔍 LLM raw response:", output)
 
@@ -79,6 +83,30 @@ def ask_llm(prompt):
         print("LLM error:", e)
         return "I'm glitching hard, babe. Try again later."
 
+def speak_stream(prompt):
+    """
+    Speak the LLM reply sentence by sentence as it streams in. pyttsx3 synthesizes while it
+    speaks and its engine must stay on this thread, so sentences are spoken here in turn; the
+    rest of the reply keeps arriving in the socket buffer meanwhile.
+    """
+    start = time.perf_counter()
+    first_audio = None
+
+    def say(spoken):
+        nonlocal first_audio
+        if first_audio is None:
+            first_audio = time.perf_counter() - start
+            print(f"⏱️ First audio after {first_audio:.2f}s")
+        try:
+            engine.say(spoken)
+            engine.runAndWait()
+        except Exception as e:
+            print("Voice error:", e)
+
+    expression = speak_sentences(ask_llm_stream(OPENROUTER_API_KEY, SYSTEM_PROMPT, prompt), say)
+    time.sleep(0.5)  # pause to avoid mic picking up speaker output
+    return expression
+
 def transcribe(audio_data):
     with open(AUDIO_FILE, "wb") as f:
         f.write(audio_data.get_wav_data())
@@ -131,8 +159,11 @@ def main():
                 speak("Going dark. Goodbye, commander.")
                 break
 
-            reply = ask_llm(text)
-            speak(reply)
+            if STREAM_LLM:
+                speak_stream(text)
+            else:
+                reply = ask_llm(text)
+                speak(reply)
 
         except Exception as e:
             print("Error:", e)
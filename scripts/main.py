@@ -13,7 +13,7 @@ from ultralytics import YOLO
 import os
 import urllib.request
 
-import llm_tts_openrouter_pytts as voice_ai
+import conversation_engine as voice_ai
 
 def signal_handler(sig, frame):
     print("👋 Exiting...")
@@ -0,0 +1,154 @@
+import json, os, re
+from collections import deque
+
+# Rough token count for Llama-style BPE (about 4 characters per token in English, never fewer
+# tokens than words); good enough to keep requests under budget without loading a tokenizer
+_WORDS = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text):
+    return max(len(_WORDS.findall(text)), (len(text) + 3) // 4) + 4  # +4: per-message overhead
+
+
+class ConversationMemory:
+    """
+    Chat history packed into a token budget.
+
+    Recent messages are kept verbatim in a sliding window; when the window exceeds its budget
+    the oldest exchanges are evicted into a short extractive summary. Token counts are computed
+    once per message and kept with it, so building a request only accounts for the new turns.
+    User and personality memories (mood, last command, greetings...) go into the system message.
+    """
+
+    REQUEST_RESERVE = 160  # tokens kept free for the system prompt and the new user message
+
+    def __init__(self, filepath="conversation_history.json", token_budget=768, summary_budget=96,
+                 user_memory=None, personality_memory=None, count_tokens=estimate_tokens):
+        self.filepath = filepath
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.user_memory = user_memory
+        self.personality_memory = personality_memory
+        self.count_tokens = count_tokens
+        self.window = deque()  # {"role", "content", "tokens"}, oldest first
+        self.window_tokens = 0
+        self.summary = deque()  # one short line per evicted exchange, oldest first
+        self.summary_counts = deque()  # tokens of each summary line
+        self.summary_tokens = 0
+        self._profile = (None, "", 0)  # (source data, text, tokens)
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.filepath):
+            with open(self.filepath, "r") as f:
+                data = json.load(f)
+            for line in data.get("summary", []):
+                self._add_summary(line)
+            for message in data.get("window", []):
+                self._append(message["role"], message["content"], message.get("tokens"))
+
+    def save(self):
+        with open(self.filepath, "w") as f:
+            json.dump({"summary": list(self.summary), "window": list(self.window)}, f, indent=4)
+
+    def add_exchange(self, user_text, reply_text):
+        """Record one user message and KIDA's reply, evicting old exchanges past the budget."""
+        self._append("user", user_text)
+        self._append("assistant", reply_text)
+        if self.user_memory is not None:
+            self.user_memory.set_last_command(user_text)
+        self.save()
+
+    def build_messages(self, system_prompt, user_text):
+        """
+        Messages for the next request: system prompt with profile and summary, then as many of
+        the most recent messages as fit in the budget, then the new user message.
+        """
+        system = system_prompt
+        profile, profile_tokens = self._profile_text()
+        if profile:
+            system += "\n" + profile
+        if self.summary:
+            system += "\nEarlier in this conversation: " + " ".join(self.summary)
+        user = {"role": "user", "content": user_text}
+        used = self.count_tokens(system_prompt) + profile_tokens + self.summary_tokens + self.count_tokens(user_text)
+
+        history = []
+        if used + self.window_tokens <= self.token_budget:
+            history = [{"role": m["role"], "content": m["content"]} for m in self.window]
+        else:
+            # Only when the new message itself is unusually long: take the newest that fit
+            for message in reversed(self.window):
+                if used + message["tokens"] > self.token_budget:
+                    break
+                used += message["tokens"]
+                history.append({"role": message["role"], "content": message["content"]})
+            history.reverse()
+            if history and history[0]["role"] == "assistant":
+                history.pop(0)  # do not start on a reply to a message that was cut
+        return [{"role": "system", "content": system}] + history + [user]
+
+    def clear(self):
+        self.window.clear()
+        self.window_tokens = 0
+        self.summary.clear()
+        self.summary_counts.clear()
+        self.summary_tokens = 0
+        self.save()
+
+    def _history_budget(self):
+        # What is left for verbatim messages once the fixed parts are accounted for
+        return max(0, self.token_budget - self.summary_budget - self._profile_text()[1] - self.REQUEST_RESERVE)
+
+    def _append(self, role, content, tokens=None):
+        tokens = tokens if tokens is not None else self.count_tokens(content)
+        self.window.append({"role": role, "content": content, "tokens": tokens})
+        self.window_tokens += tokens
+        while self.window_tokens > self._history_budget() and len(self.window) > 2:
+            self._evict_exchange()
+
+    def _evict_exchange(self):
+        user = self.window.popleft()
+        self.window_tokens -= user["tokens"]
+        reply = None
+        if self.window and self.window[0]["role"] == "assistant":
+            reply = self.window.popleft()
+            self.window_tokens -= reply["tokens"]
+        if user["role"] == "user":
+            self._add_summary(self._gist(user["content"], reply["content"] if reply else ""))
+
+    @staticmethod
+    def _gist(user_text, reply_text, words=12):
+        def first_sentence(text):
+            sentence = re.split(r"(?<=[.!?])\s", text.strip(), maxsplit=1)[0]
+            return " ".join(sentence.split()[:words])
+        gist = f'user said "{first_sentence(user_text)}"'
+        if reply_text:
+            gist += f', you said "{first_sentence(reply_text)}"'
+        return gist + "."
+
+    def _add_summary(self, line):
+        tokens = self.count_tokens(line)
+        self.summary.append(line)
+        self.summary_counts.append(tokens)
+        self.summary_tokens += tokens
+        while self.summary_tokens > self.summary_budget and len(self.summary) > 1:
+            self.summary.popleft()
+            self.summary_tokens -= self.summary_counts.popleft()
+
+    def _profile_text(self):
+        data = (json.dumps(self.user_memory.data, sort_keys=True) if self.user_memory else "",
+                self.personality_memory.get_mood() if self.personality_memory else "")
+        if data != self._profile[0]:
+            facts = []
+            if self.personality_memory is not None:
+                facts.append(f"Your current mood: {self.personality_memory.get_mood()}.")
+            if self.user_memory is not None:
+                user = self.user_memory.data
+                if user.get("favorite_greetings"):
+                    facts.append("The user's favorite greetings: " + ", ".join(user["favorite_greetings"][-3:]) + ".")
+                if user.get("times_petted"):
+                    facts.append(f"The user has petted you {user['times_petted']} times.")
+            text = " ".join(facts)
+            self._profile = (data, text, self.count_tokens(text) if text else 0)
+        return self._profile[1], self._profile[2]
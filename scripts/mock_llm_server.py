@@ -0,0 +1,119 @@
+"""
+Local stand-in for the OpenRouter chat completions endpoint, for testing the chatbots offline.
+
+Serves POST /api/v1/chat/completions, both as one JSON response and as an SSE stream
+("stream": true), with configurable time-to-first-token and per-token delay. Connections are
+kept alive (HTTP/1.1, chunked streaming). fail_every=n answers every n-th request with a 503,
+to exercise client retries.
+
+    python mock_llm_server.py --port 8088
+    # then use http://127.0.0.1:8088/api/v1/chat/completions as the completions URL
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Non-ASCII on purpose (curly apostrophe, ellipsis, emoji), like real replies
+DEFAULT_REPLY = ("Well, look who finally showed up. I was starting to think you forgot about me, hotshot. "
+                 "I’m a tank with a heart of steel and a mouth to match… "
+                 "So, what are we blowing up today? Don’t worry, just kidding. Mostly. 😉 wink")
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes: without TCP_NODELAY a kept-alive connection waits
+    # for the client's delayed ACK (~40 ms) on every response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            failing = server.fail_every and server.requests % server.fail_every == 0
+        if failing:
+            self._send_json(503, {"error": {"message": "Mock overload", "code": 503}})
+            return
+
+        time.sleep(server.first_token_ms / 1000)
+        tokens = [word + " " for word in server.reply.split(" ")]
+        if not request.get("stream"):
+            time.sleep(server.token_ms * len(tokens) / 1000)
+            self._send_json(200, {"choices": [{"message": {"role": "assistant", "content": server.reply}}]})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self._write_chunk(": OPENROUTER PROCESSING\n\n")
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(server.token_ms / 1000)
+            event = {"choices": [{"index": 0, "delta": {"content": token}}]}
+            self._write_chunk(f"data: {json.dumps(event, ensure_ascii=False)}\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(port=0, first_token_ms=400.0, token_ms=30.0, reply=DEFAULT_REPLY, fail_every=0):
+    """
+    Start the mock server on a background thread.
+
+    :param port: TCP port (0 picks a free one).
+    :param first_token_ms: Delay before the first token (or before the full reply).
+    :param token_ms: Delay between streamed tokens.
+    :param fail_every: Answer every n-th request with 503 Service Unavailable (0: never).
+    :return: (server, url of the completions endpoint). Call server.shutdown() to stop it.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockLLMHandler)
+    server.daemon_threads = True
+    server.first_token_ms = first_token_ms
+    server.token_ms = token_ms
+    server.reply = reply
+    server.fail_every = fail_every
+    server.requests = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/v1/chat/completions"
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Mock OpenRouter chat completions server")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--first-token-ms", type=float, default=400.0)
+    parser.add_argument("--token-ms", type=float, default=30.0)
+    parser.add_argument("--fail-every", type=int, default=0, help="Answer every n-th request with a 503")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = get_args()
+    server, url = start_server(args.port, args.first_token_ms, args.token_ms, fail_every=args.fail_every)
+    print(f"🤖 Mock LLM listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
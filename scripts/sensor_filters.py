@@ -0,0 +1,84 @@
+# sensor_filters.py
+"""
+Filter stage between the Arduino readings and the obstacle controller.
+
+Each time dev00 stores distance readings, the stage takes the new samples of every distance
+channel from its ring in state.history (all records of a batched binary frame, not only the
+newest), runs them through a MedianKalman filter and publishes value and confidence to
+state.filtered, where controllers wait() on them like on state.sensors.
+"""
+
+import threading
+import state
+from common.filters import MedianKalman
+
+MIN_US_VALID = 5  # cm; closer ultrasonic readings are missed echoes
+
+# Channel -> MedianKalman parameters. Laser in mm (-1: out of range), ultrasonic in cm
+DISTANCE_FILTERS = {
+    "laser": dict(k=3, process_noise=100.0 ** 2, measurement_noise=10.0 ** 2, low=0, tolerance=20.0),
+    "ultrasonic0": dict(k=3, process_noise=10.0 ** 2, measurement_noise=1.5 ** 2, low=MIN_US_VALID, tolerance=3.0),
+    "ultrasonic1": dict(k=3, process_noise=10.0 ** 2, measurement_noise=1.5 ** 2, low=MIN_US_VALID, tolerance=3.0),
+}
+
+
+class FilterStage:
+    """
+    Filters new ring samples of some channels and publishes the estimates.
+
+    Parameters:
+    - filters: Channel -> MedianKalman parameters.
+    - source: SensorHistory to read (state.history).
+    - target: SensorState with fields <name> and <name>_confidence (state.filtered).
+    """
+
+    def __init__(self, filters=DISTANCE_FILTERS, source=None, target=None):
+        self.source = source or state.history
+        self.target = target or state.filtered
+        self.filters = {name: MedianKalman(**params) for name, params in filters.items()}
+        self.seen = {name: self.source[name].raw.count for name in filters}  # ring samples done
+        self.lock = threading.Lock()
+        self.unsubscribe = None
+
+    def start(self):
+        """Run process() on the Arduino reader thread after each update of the channels."""
+        if self.unsubscribe is None:
+            with self.lock:
+                self.seen = {name: self.source[name].raw.count for name in self.filters}  # from now on
+            self.unsubscribe = state.sensors.subscribe(lambda snapshot: self.process(), self.filters)
+        return self
+
+    def stop(self):
+        if self.unsubscribe is not None:
+            self.unsubscribe()
+            self.unsubscribe = None
+
+    def process(self):
+        """Filter the samples added to the rings since the last call; returns what was published."""
+        readings = {}
+        with self.lock:
+            for name, f in self.filters.items():
+                ring = self.source[name].raw
+                count = ring.count
+                new = count - self.seen[name]
+                if not new:
+                    continue
+                self.seen[name] = count
+                samples = ring.last(new)  # more than the ring holds: the oldest are gone
+                for t, v in zip(samples["t"].tolist(), samples["v"].tolist()):
+                    estimate = f.update(t, v)
+                readings[name] = estimate.value
+                readings[name + "_confidence"] = estimate.confidence
+            if readings:
+                self.target.update(**readings)
+        return readings
+
+
+stage = None  # FilterStage of the distance filters, created by start()
+
+
+def start():
+    global stage
+    if stage is None:
+        stage = FilterStage()
+    return stage.start()
@@ -1,26 +1,217 @@
 # state.py
+import threading
+import time
+from collections import deque, namedtuple
+from common.timeseries import SensorHistory
 
-# --- Basic Sensors ---
-photoValue       = "PHOTO: N/A"
-uvValue          = "UV: N/A"
-metalValue       = "METAL: N/A"
-ballSwitchValue  = "BALL: N/A"
-motionValue      = "MOTION: N/A"
-
-# --- Line Follower (3 sensors) ---
-lfLeftValue      = "LF_LEFT: N/A"
-lfMidValue       = "LF_MID: N/A"
-lfRightValue     = "LF_RIGHT: N/A"
-
-# --- Distance Sensors ---
-laserValue       = "LASER: N/A" #For Obstacle Avoidance
-ultrasonic0Value  = "ULTRASONIC 0: N/A" #Uses the servo For Obstacle Avoidance
-ultrasonic1Value  = "ULTRASONIC 1: N/A" #For Obstacle Avoidance
-
-# --- Actuators & Controls ---
-servoPosValue    = "SERVO: N/A" #For Obstacle Avoidance
-buttonValue      = "BUTTON: N/A"
-motorSpeedValue  = "SPEED: N/A" #For Obstacle Avoidance & User Control
+# --- Sensor channels (numeric; None until the first reading) ---
+SENSOR_FIELDS = (
+    # Basic sensors (dev01)
+    "photo", "uv", "metal", "ball", "motion",
+    # Line follower, 3 sensors (dev01)
+    "lf_left", "lf_mid", "lf_right",
+    # Distance sensors (dev00): laser in mm, ultrasonic in cm. For Obstacle Avoidance
+    "laser", "ultrasonic0", "ultrasonic1",
+    # Actuators & controls (dev00)
+    "servo", "button", "speed",
+)
+# Labels used when the values are shown on screen
+SENSOR_LABELS = {
+    "photo": "PHOTO", "uv": "UV", "metal": "METAL", "ball": "BALL", "motion": "MOTION",
+    "lf_left": "LF_LEFT", "lf_mid": "LF_MID", "lf_right": "LF_RIGHT",
+    "laser": "LASER", "ultrasonic0": "ULTRASONIC0", "ultrasonic1": "ULTRASONIC1",
+    "servo": "SERVO", "button": "BUTTON", "speed": "SPEED",
+}
+# Lowest valid reading per channel; the history stores lower ones (the laser's -1: out of range) as
+# missing instead of as values
+SENSOR_LOW = {"laser": 0}
+FILTERED_FIELDS = ("laser", "ultrasonic0", "ultrasonic1",
+                   "laser_confidence", "ultrasonic0_confidence", "ultrasonic1_confidence")
+
+Sensors = namedtuple("Sensors", SENSOR_FIELDS)
+
+# One consistent view of all sensors:
+# - seq: incremented by every update
+# - time: time.monotonic() of the last update
+# - values: Sensors of numbers (None: no reading yet)
+# - stamps: Sensors of the time.monotonic() each value was read (0.0: never)
+Snapshot = namedtuple("Snapshot", ("seq", "time", "values", "stamps"))
+
+
+class SensorState:
+    """
+    Latest reading of every sensor.
+
+    Each update publishes a new immutable Snapshot by swapping a single reference, so readers
+    never lock and always see the fields of one update together. Writers (one reader thread
+    per Arduino) are serialized with a lock so they do not lose each other's fields.
+
+    Controllers do not need to poll: wait() blocks until a new reading arrives, and subscribe()
+    registers a callback run on the Arduino reader thread right after each update.
+
+    With a SensorHistory, every reading is also appended to its channel's time series.
+
+    :param fields: Channel names (default: the Arduino sensors, SENSOR_FIELDS).
+    """
+
+    def __init__(self, fields=SENSOR_FIELDS, history=None):
+        self.fields = tuple(fields)
+        self.history = history
+        self._index = {name: i for i, name in enumerate(self.fields)}
+        self._type = Sensors if self.fields == SENSOR_FIELDS else namedtuple("Readings", self.fields)
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._subscribers = ()  # (callback, field indexes or None); replaced, never mutated
+        self._snapshot = Snapshot(0, 0.0, self._type(*[None] * len(self.fields)),
+                                  self._type(*[0.0] * len(self.fields)))
+
+    def update(self, **readings):
+        """Store readings, e.g. update(laser=412, ultrasonic0=35); returns the new sequence number."""
+        now = time.monotonic()
+        with self._lock:
+            snapshot = self._snapshot
+            values = list(snapshot.values)
+            stamps = list(snapshot.stamps)
+            for name, value in readings.items():
+                i = self._index[name]
+                values[i] = value
+                stamps[i] = now
+            self._snapshot = new = Snapshot(snapshot.seq + 1, now, self._type._make(values), self._type._make(stamps))
+            if self.history is not None:
+                self.history.record(now, readings)
+            self._changed.notify_all()
+        for callback, indexes in self._subscribers:
+            if indexes is None or any(self._index[name] in indexes for name in readings):
+                try:
+                    callback(new)
+                except Exception as e:
+                    print(f"⚠️ Sensor subscriber {getattr(callback, '__name__', callback)} failed: {e}")
+        return new.seq
+
+    def wait(self, since=None, names=None, timeout=None):
+        """
+        Block until a reading newer than the snapshot `since` arrives.
+
+        :param since: Snapshot the caller last acted on (None: the current one).
+        :param names: Only wake up for these sensors (None: any).
+        :param timeout: Seconds.
+        :return: The new Snapshot, or None on timeout.
+        """
+        since = since or self._snapshot
+        indexes = None if names is None else [self._index[name] for name in names]
+
+        def updated():
+            snapshot = self._snapshot
+            if snapshot.seq == since.seq:
+                return False
+            return indexes is None or any(snapshot.stamps[i] != since.stamps[i] for i in indexes)
+
+        with self._changed:
+            if not self._changed.wait_for(updated, timeout):
+                return None
+            return self._snapshot
+
+    def subscribe(self, callback, names=None):
+        """
+        Call callback(snapshot) after every update touching one of `names` (None: any).
+        It runs on the Arduino reader thread, so it must be quick. Returns an unsubscribe function.
+        """
+        entry = (callback, None if names is None else frozenset(self._index[name] for name in names))
+        with self._lock:
+            self._subscribers += (entry,)
+
+        def unsubscribe():
+            with self._lock:
+                self._subscribers = tuple(s for s in self._subscribers if s is not entry)
+        return unsubscribe
+
+    def snapshot(self):
+        return self._snapshot
+
+    def read(self, *names):
+        """Values of several sensors from the same snapshot, e.g. read("laser", "ultrasonic0")."""
+        values = self._snapshot.values
+        return tuple(values[self._index[name]] for name in names)
+
+    def get(self, name):
+        return self._snapshot.values[self._index[name]]
+
+    def age(self, name, now=None):
+        """Seconds since the sensor was last read (None if it never was)."""
+        stamp = self._snapshot.stamps[self._index[name]]
+        if not stamp:
+            return None
+        return (time.monotonic() if now is None else now) - stamp
+
+    @property
+    def seq(self):
+        return self._snapshot.seq
+
+    def display(self, names=None):
+        """Display strings such as "LASER: 412" / "LASER: N/A"."""
+        values = self._snapshot.values
+        return [f"{SENSOR_LABELS.get(name, name.upper())}: "
+                f"{'N/A' if values[self._index[name]] is None else values[self._index[name]]}"
+                for name in (self.fields if names is None else names)]
+
+
+class ReactionStats:
+    """
+    Sensor-to-actuation latency per controller: time from the arrival of the reading a
+    decision was based on to the command being sent. Percentiles over the last `window` samples.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.lock = threading.Lock()
+        self.samples = {}  # controller -> deque of latencies (ms)
+        self.counts = {}
+        self.max_ms = {}
+
+    def record(self, controller, snapshot, names=None):
+        """Call right after sending the command decided from snapshot (and its sensors `names`)."""
+        arrived = snapshot.time if names is None else max(getattr(snapshot.stamps, name) for name in names)
+        latency_ms = (time.monotonic() - arrived) * 1000
+        with self.lock:
+            if controller not in self.samples:
+                self.samples[controller] = deque(maxlen=self.window)
+                self.counts[controller] = 0
+                self.max_ms[controller] = 0.0
+            self.samples[controller].append(latency_ms)
+            self.counts[controller] += 1
+            self.max_ms[controller] = max(self.max_ms[controller], latency_ms)
+        return latency_ms
+
+    def summary(self, controller):
+        with self.lock:
+            latencies = sorted(self.samples.get(controller, ()))
+            count, max_ms = self.counts.get(controller, 0), self.max_ms.get(controller, 0.0)
+        if not latencies:
+            return {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        return {
+            "count": count,
+            "p50_ms": latencies[len(latencies) // 2],
+            "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            "max_ms": max_ms,
+        }
+
+    def report(self):
+        with self.lock:
+            controllers = sorted(self.samples)
+        lines = []
+        for controller in controllers:
+            s = self.summary(controller)
+            lines.append(f"⏱️ {controller}: sensor-to-command p50 {s['p50_ms']:.2f} ms | "
+                         f"p95 {s['p95_ms']:.2f} ms | max {s['max_ms']:.2f} ms | {s['count']} commands")
+        return "\n".join(lines)
+
+
+history = SensorHistory(SENSOR_FIELDS, low=SENSOR_LOW)
+sensors = SensorState(history=history)
+# Distances after the median / Kalman stage (sensor_filters.py): None when there is no valid
+# reading, confidence 0..1
+filtered = SensorState(FILTERED_FIELDS)
+reactions = ReactionStats()
 
 # --- Debug/Status ---
 systemStatus     = "SYSTEM: Booting..."
@@ -178,11 +178,7 @@ def run_ui(model=None, mode="cam", task="detect", tracker_path=None):
             )
             cached_sensor_surface = small_font.render(sensor_text, True, (0, 255, 0))
 
-            arduino_texts = [
-                getattr(state, "dev0_photoValue", "Photo: N/A"),
-                getattr(state, "dev0_uvValue", "UV: N/A"),
-                getattr(state, "dev0_laserValue", "Laser: N/A"),
-            ]
+            arduino_texts = state.sensors.display(("photo", "uv", "laser"))
             arduino_line = "   ".join(arduino_texts)
             cached_arduino_surface = small_font.render(arduino_line, True, (255, 255, 255))
 
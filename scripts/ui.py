@@ -187,12 +187,10 @@ def run_ui(model=None, mode="cam", task="detect", tracker_path=None):
             f"Battery: {percent:.1f}%"
         )
 
-        arduino_attrs = [
-            "photoValue","uvValue","metalValue","ballSwitchValue","motionValue",
-            "lfLeftValue","lfMidValue","lfRightValue","laserValue","ultrasonic0Value","ultrasonic1Value",
-            "servoPosValue","buttonValue","motorSpeedValue","systemStatus",
-        ]
-        arduino_texts = [str(getattr(state, attr, f"{attr.upper()}: N/A")) for attr in arduino_attrs]
+        arduino_texts = state.sensors.display() + [state.systemStatus]
+        laser = state.history["laser"].stats(seconds=5)
+        if laser:
+            arduino_texts.insert(-1, f"LASER 5s: avg {laser['mean']:.0f} min {laser['min']:.0f}")
         arduino_line = "   ".join(arduino_texts)
 
         status_text = (
@@ -150,12 +150,7 @@ def run_ui(model=None, mode="cam", task="detect"):
             f"Battery: {percent:.1f}%"
         )
 
-        arduino_attrs = [
-            "photoValue","uvValue","metalValue","ballSwitchValue","motionValue",
-            "lfLeftValue","lfMidValue","lfRightValue","laserValue","ultrasonic0Value","ultrasonic1Value",
-            "servoPosValue","buttonValue","motorSpeedValue","systemStatus",
-        ]
-        arduino_texts = [str(getattr(state, attr, f"{attr.upper()}: N/A")) for attr in arduino_attrs]
+        arduino_texts = state.sensors.display() + [state.systemStatus]
         arduino_line = "   ".join(arduino_texts)
 
         status_text = (
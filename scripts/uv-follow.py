@@ -1,14 +1,16 @@
-import time
 from arduino import send_command
-import state  # assuming this module updates dev0_uvValue continuously
+import state  # state.sensors is updated continuously by the Arduino reader threads
 
-def uv_follow_loop(poll_interval=0.2):
+def uv_follow_loop(timeout=1.0):
+    """Decide on every new UV reading (woken by the Arduino reader, no polling)."""
     last_command = None
+    snapshot = state.sensors.snapshot()
     while True:
-        try:
-            uv_value = int(getattr(state, "dev0_uvValue", 0))
-        except Exception:
-            uv_value = 0
+        update = state.sensors.wait(snapshot, ("uv",), timeout=timeout)
+        if update is None:
+            continue
+        snapshot = update
+        uv_value = snapshot.values.uv or 0
 
         if uv_value > 100:
             command = "FORWARD"
@@ -17,14 +19,14 @@ def uv_follow_loop(poll_interval=0.2):
 
         if command != last_command:
             print(f"UV={uv_value}, sending command: {command}")
-            send_command("dev0", command)
+            send_command("dev00", command)
+            state.reactions.record("uv-follow", snapshot, ("uv",))
             last_command = command
 
-        time.sleep(poll_interval)
-
 
 if __name__ == "__main__":
     try:
         uv_follow_loop()
     except KeyboardInterrupt:
         print("UV follow stopped by user")
+        print(state.reactions.report())
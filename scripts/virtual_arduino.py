@@ -0,0 +1,434 @@
+"""
+Virtual Arduino boards on pseudo-terminals, for running arduino.py and the controllers without
+the robot.
+
+A VirtualArduino opens a pty pair and acts like ardiuno00 / ardiuno01 on its end: it prints
+the boot banner and sensor lines (or binary frames after "BINARY"), answers ID, SCANLEFT /
+SCANRIGHT and the light commands, and records every command it receives with its arrival time. The other end is a
+regular serial port path for arduino.connect_arduino() or arduino.DeviceManager(ports=[...]);
+stop() unplugs the board. Sensor data comes from:
+
+- a scenario: a small simulated world reacting to the motion commands, e.g. obstacles to
+  avoid (ObstacleScenario) or a line to follow (LineScenario); boards of one robot share it;
+- a log recorded from a real board ("seconds<TAB>line" per line), replayed at real or
+  accelerated speed.
+
+    python virtual_arduino.py --scenario obstacle          # prints the port paths
+    python virtual_arduino.py --replay dev01.tsv --speed 10
+    python virtual_arduino.py --record /dev/ttyUSB1 --out dev01.tsv
+"""
+
+import argparse
+import math
+import os
+import pty
+import random
+import select
+import threading
+import time
+import tty
+from common.serial_protocol import (FRAME_DEV00, FRAME_DEV01, LF_LEFT, LF_MID, LF_RIGHT, SensorSimulator, encode_frame,
+                                    format_alerts, format_text)
+
+
+# === SCENARIOS ===
+
+class Scenario:
+    """
+    What the sensors see. Follows the motion commands sent to dev00; devices the scenario does
+    not model produce random-walk readings (SensorSimulator).
+    """
+
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+        self.direction = "STOP"
+        self.speed = 200
+        self.lock = threading.Lock()  # boards sample from their own threads
+        self.last_step = None
+        self.simulators = {"dev00": SensorSimulator("dev00", seed=seed), "dev01": SensorSimulator("dev01", seed=seed)}
+
+    def command(self, command):
+        with self.lock:
+            if command in ("FORWARD", "BACKWARD", "LEFT", "RIGHT", "STOP"):
+                self.direction = command
+            elif command.startswith("SPEED:"):
+                self.speed = min(max(int(command[6:] or 0), 0), 255)
+
+    def sample(self, device, millis):
+        """Advance the world to now and read the sensors of a device."""
+        with self.lock:
+            now = time.monotonic()
+            if self.last_step is not None:
+                self.step(now - self.last_step)
+            self.last_step = now
+            return self.record(device, millis)
+
+    def step(self, dt):
+        """Advance the world by dt seconds (lock held)."""
+
+    def record(self, device, millis):
+        """Sensor record of a device (serial_protocol.RECORD_FIELDS order)."""
+        return (millis,) + self.simulators[device].sample()[1:]
+
+    def scan(self, side):
+        """Distance (cm) measured by SCANLEFT / SCANRIGHT."""
+        return self.random.randint(20, 200)
+
+
+class ObstacleScenario(Scenario):
+    """
+    Obstacles ahead at random distances. Driving forward closes in on them (speed 255 is about
+    380 mm/s), turning for turn_time seconds faces free space and a new obstacle further away.
+    The side ultrasonic sensors see random clearances, one of them sometimes blocked. Records when an obstacle gets closer
+    than alert_mm (the reaction deadline starts there) and every collision.
+    """
+
+    def __init__(self, seed=0, alert_mm=40, turn_time=0.5):
+        super().__init__(seed)
+        self.alert_mm = alert_mm
+        self.turn_time = turn_time
+        self.turning = 0.0
+        self.alerts = []  # time.monotonic() when an obstacle crossed alert_mm
+        self.collisions = 0
+        self._new_obstacle()
+
+    def _new_obstacle(self):
+        self.distance = self.random.uniform(300, 1200)  # mm
+        # Side clearances (cm); at most one side blocked, so there is always a way out
+        self.left, self.right = self.random.choice(((60, 120), (120, 60), (120, 120), (15, 120), (120, 15)))
+        self.crashed = False
+
+    def step(self, dt):
+        direction, speed = self.direction, self.speed
+        before = self.distance
+        mm_per_s = speed * 1.5
+        if direction == "FORWARD":
+            self.distance -= mm_per_s * dt
+        elif direction == "BACKWARD":
+            self.distance += mm_per_s * dt
+        if direction in ("LEFT", "RIGHT"):
+            self.turning += dt
+            if self.turning >= self.turn_time:
+                self.turning = 0.0
+                self._new_obstacle()
+                return
+        else:
+            self.turning = 0.0
+        if before >= self.alert_mm > self.distance:
+            self.alerts.append(time.monotonic())
+        if self.distance <= 0:
+            self.distance = 0.0
+            if not self.crashed:
+                self.crashed = True
+                self.collisions += 1
+
+    def record(self, device, millis):
+        if device != "dev00":
+            return super().record(device, millis)
+        r = self.random
+        laser = -1 if self.distance > 1200 else max(0, int(self.distance + r.gauss(0, 3)))
+        return (millis, laser, max(2, int(self.left + r.gauss(0, 1))), max(2, int(self.right + r.gauss(0, 1))),
+                90, self.speed, 0)
+
+    def scan(self, side):
+        return self.left if side == "LEFT" else self.right
+
+
+class LineScenario(Scenario):
+    """
+    A curving line under the robot. offset (cm) is where the line is relative to the middle
+    sensor (positive: to the right); the track bends it away while driving, LEFT / RIGHT bring it
+    back. dev01 reports which of the three sensors (1.5 cm apart) are over the line.
+    """
+
+    SENSOR_X = (-1.5, 0.0, 1.5)  # left, middle, right (cm)
+    LINE_WIDTH = 1.8  # cm
+
+    def __init__(self, seed=0, turn_rate=6.0, curvature=3.0):
+        super().__init__(seed)
+        self.turn_rate = turn_rate  # cm/s the line moves while turning
+        self.curvature = curvature  # cm/s of drift at full bend
+        self.offset = 0.0
+        self.elapsed = 0.0
+        self.lost_time = 0.0  # seconds with no sensor over the line
+
+    def step(self, dt):
+        direction = self.direction
+        self.elapsed += dt
+        if direction != "STOP":
+            self.offset += self.curvature * math.sin(0.8 * self.elapsed) * dt
+        if direction == "LEFT":
+            self.offset += self.turn_rate * dt
+        elif direction == "RIGHT":
+            self.offset -= self.turn_rate * dt
+        self.offset = min(max(self.offset, -6.0), 6.0)
+        if self._bits() == 0:
+            self.lost_time += dt
+
+    def _bits(self):
+        bits = 0
+        for bit, x in zip((LF_LEFT, LF_MID, LF_RIGHT), self.SENSOR_X):
+            if abs(self.offset - x) < self.LINE_WIDTH / 2:
+                bits |= bit
+        return bits
+
+    def record(self, device, millis):
+        if device != "dev01":
+            return super().record(device, millis)
+        record = super().record(device, millis)
+        return record[:6] + (self._bits(),)
+
+
+SCENARIOS = {"random": Scenario, "obstacle": ObstacleScenario, "line": LineScenario}
+
+
+# === VIRTUAL BOARD ===
+
+class VirtualArduino:
+    """
+    One board on a pty.
+
+    Parameters:
+    - device: "dev00" or "dev01" (output format and commands understood).
+    - scenario: Shared Scenario (None: random readings).
+    - period_ms: Time between sensor samples (the sketches: 200 / 500 ms in text mode).
+    - replay: Path of a recorded log to play instead of the scenario.
+    - speed: Replay speed factor (1.0: real time).
+    - loop: Restart the replay at the end.
+    - baud: Emulated link speed for the board's output (None: as fast as the pty goes).
+    - binary: Start in binary mode, as if "BINARY" had been received.
+    - batch: Records per binary frame.
+    """
+
+    def __init__(self, device="dev00", scenario=None, period_ms=50, replay=None, speed=1.0, loop=False,
+                 baud=9600, binary=False, batch=4):
+        self.device = device
+        self.frame_type = FRAME_DEV00 if device == "dev00" else FRAME_DEV01
+        self.scenario = scenario or Scenario()
+        self.period = period_ms / 1000
+        self.replay = replay
+        self.speed = speed
+        self.loop = loop
+        self.baud = baud
+        self.binary = binary
+        self.batch = batch
+        self.commands = []  # (time.monotonic(), command)
+        self.commands_changed = threading.Condition()
+        self.samples_sent = 0
+        self.lines_sent = 0
+        self.write_lock = threading.Lock()
+        self.running = False
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.slave)  # no echo, no newline translation
+        self.port = os.ttyname(self.slave)
+        self.start_time = time.monotonic()
+        self.threads = []
+
+    BANNERS = {"dev00": "=== Robot Startup ===", "dev01": "=== Multi-Sensor System Ready ==="}
+
+    def start(self):
+        self.running = True
+        self.start_time = time.monotonic()
+        if not self.replay:
+            self.println(self.BANNERS[self.device])
+        for target in (self._commands_loop, self._replay_loop if self.replay else self._sensor_loop):
+            thread = threading.Thread(target=target, name=f"virtual-{self.device}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def stop(self):
+        """Like pulling the USB cable: the host side of the port fails on its next read."""
+        self.running = False
+        for thread in self.threads:
+            if thread is not threading.current_thread():
+                thread.join(1)
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    # --- Output ---
+    def write(self, data):
+        with self.write_lock:
+            if self.baud:
+                time.sleep(len(data) * 10 / self.baud)  # 8N1: 10 bits per byte
+            try:
+                os.write(self.master, data)
+            except OSError:
+                self.running = False
+
+    def println(self, text):
+        self.lines_sent += 1
+        self.write((text + "\r\n").encode("utf-8"))
+
+    def _millis(self):
+        return int((time.monotonic() - self.start_time) * 1000) & 0xFFFFFFFF
+
+    def _sensor_loop(self):
+        pending = []
+        previous = None
+        next_sample = time.monotonic()
+        while self.running:
+            now = time.monotonic()
+            if next_sample > now:
+                time.sleep(next_sample - now)
+            next_sample += self.period
+            record = self.scenario.sample(self.device, self._millis())
+            self.samples_sent += 1
+            if not self.binary:
+                for line in format_text(self.frame_type, record, previous).splitlines():
+                    self.println(line)
+                previous = record
+                continue
+            pending.append(record)
+            if len(pending) >= self.batch:
+                self.write(encode_frame(self.frame_type, pending))
+                pending = []
+            for line in format_alerts(self.frame_type, record, previous).splitlines():
+                self.println(line)
+            previous = record
+
+    def _replay_loop(self):
+        while self.running:
+            start = time.monotonic()
+            with open(self.replay, "r", encoding="utf-8") as f:
+                for entry in f:
+                    stamp, _, line = entry.rstrip("\r\n").partition("\t")
+                    if not line:
+                        continue
+                    delay = start + float(stamp) / self.speed - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    if not self.running:
+                        return
+                    self.samples_sent += 1
+                    self.println(line)
+            if not self.loop:
+                return
+
+    # --- Input ---
+    def _commands_loop(self):
+        buffer = b""
+        while self.running:
+            try:
+                # Poll, so stop() is not left waiting: a blocked read would keep the pty open
+                if not select.select([self.master], [], [], 0.1)[0]:
+                    continue
+                data = os.read(self.master, 1024)
+            except (OSError, ValueError):
+                return
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for raw in lines:
+                command = raw.decode("utf-8", errors="replace").strip().upper()
+                if command:
+                    self._handle(command)
+
+    def _handle(self, command):
+        with self.commands_changed:
+            self.commands.append((time.monotonic(), command))
+            self.commands_changed.notify_all()
+        if command == "ID":
+            self.println(f"ID:{self.device}")
+        elif command == "BINARY":
+            self.binary = True
+        elif command == "TEXT":
+            self.binary = False
+        elif self.device == "dev00":
+            self.scenario.command(command)
+            if command in ("SCANLEFT", "SCANRIGHT"):
+                side = command[4:]
+                distance = self.scenario.scan(side)
+                self.println(f"{side}:{distance}")
+                self.println(f"{command}:{distance}")
+        elif command.startswith("LIGHT_"):
+            part, state = command[6:].rsplit("_", 1)
+            self.println(f"{part.capitalize()} lights {state}")
+
+    def wait_for_command(self, predicate, after=0.0, timeout=None):
+        """
+        First command received after time `after` (time.monotonic()) for which predicate(command)
+        is true; blocks up to timeout. :return: (time, command) or None.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.commands_changed:
+            while True:
+                for stamp, command in self.commands:
+                    if stamp > after and predicate(command):
+                        return stamp, command
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self.commands_changed.wait(remaining)
+
+
+def start_virtual_robot(scenario="random", **kwargs):
+    """
+    Both boards of the robot sharing one scenario, started.
+
+    :param scenario: Scenario instance or name in SCENARIOS.
+    :return: {"dev00": VirtualArduino, "dev01": VirtualArduino}; their .port go to connect_arduino.
+    """
+    if isinstance(scenario, str):
+        scenario = SCENARIOS[scenario]()
+    return {device: VirtualArduino(device, scenario, **kwargs).start() for device in ("dev00", "dev01")}
+
+
+def record_log(port, path, baud=9600, duration=None):
+    """Record what a real board prints, in the replay format ("seconds<TAB>line")."""
+    import serial
+    ser = serial.Serial(port, baud, timeout=1)
+    start = time.monotonic()
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            while duration is None or time.monotonic() - start < duration:
+                line = ser.readline().decode("utf-8", errors="replace").strip()
+                if line:
+                    f.write(f"{time.monotonic() - start:.3f}\t{line}\n")
+    finally:
+        ser.close()
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Virtual Arduino boards on pseudo-terminals")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="random")
+    parser.add_argument("--device", choices=["dev00", "dev01", "both"], default="both")
+    parser.add_argument("--period-ms", type=float, default=50)
+    parser.add_argument("--replay", type=str, default=None, help="Recorded log to play (single device)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed factor")
+    parser.add_argument("--loop", action="store_true", help="Repeat the replay")
+    parser.add_argument("--record", type=str, default=None, help="Record a real board on this port instead")
+    parser.add_argument("--out", type=str, default="arduino.tsv", help="Output of --record")
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+    if args.record:
+        print(f"⏺️ Recording {args.record} to {args.out} (Ctrl+C to stop)")
+        try:
+            record_log(args.record, args.out)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    scenario = SCENARIOS[args.scenario]()
+    devices = ["dev00", "dev01"] if args.device == "both" else [args.device]
+    boards = [VirtualArduino(device, scenario, period_ms=args.period_ms, replay=args.replay, speed=args.speed,
+                             loop=args.loop).start() for device in devices]
+    for board in boards:
+        print(f"🔌 Virtual {board.device} on {board.port}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        for board in boards:
+            print(f"{board.device}: {board.samples_sent} samples sent, commands: "
+                  f"{', '.join(command for _, command in board.commands[-10:]) or 'none'}")
+            board.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Incremental decoding engine for the fixed-sequence Hailo Whisper decoder."""
+
+import time
+import numpy as np
+from common.decoding import RepetitionPenalty, GreedyStrategy, BeamSearch
+
+
+START_TOKEN_ID = 50258
+
+
+class WhisperDecoder:
+    """
+    Decoder that reuses the same input and output buffers for every step.
+
+    The Hailo decoder always consumes the full fixed-length token sequence, so there is no
+    KV cache to keep. Instead, the tokenized input is built once per chunk and only the row
+    of the newly generated token is rewritten before the next step. Logits are copied out
+    for the current position only, into one preallocated vector.
+    """
+
+    def __init__(self, configured_infer_model, infer_model, bindings, model_name, output_names,
+                 token_embedding_weight, onnx_add_input, sequence_length, eos_token_id,
+                 timeout_ms=100000000, repetition_penalty=1.5, strategy=None):
+        self.configured_infer_model = configured_infer_model
+        self.bindings = bindings
+        self.model_name = model_name
+        self.output_names = output_names
+        self.token_embedding_weight = token_embedding_weight
+        self.sequence_length = sequence_length
+        self.eos_token_id = eos_token_id
+        self.timeout_ms = timeout_ms
+        self.strategy = strategy if strategy is not None else GreedyStrategy()
+
+        embedding_dim = token_embedding_weight.shape[1]
+        # Positional bias for every slot of the fixed sequence, shape (sequence_length, embedding_dim)
+        self.bias_rows = np.ascontiguousarray(
+            np.broadcast_to(onnx_add_input, (1, sequence_length, embedding_dim))[0], dtype=np.float32
+        )
+
+        # Tokenized input in the NHWC layout expected by input_layer2: (1, sequence_length, 1, embedding_dim)
+        self.input_ids = np.zeros((1, sequence_length), dtype=np.int64)
+        self.input_ids[0, 0] = START_TOKEN_ID
+        self.initial_tokenized = np.zeros((1, sequence_length, 1, embedding_dim), dtype=np.float32)
+        self.initial_tokenized[0, :, 0, :] = token_embedding_weight[self.input_ids[0]] + self.bias_rows
+        self.tokenized = self.initial_tokenized.copy()
+        bindings.input(f"{model_name}/input_layer2").set_buffer(self.tokenized)
+
+        # Output buffers are bound once; logits for position i are gathered into a single vector
+        self.output_buffers = []
+        self.output_slices = []
+        offset = 0
+        for name in output_names:
+            buffer = np.zeros(infer_model.output(name).shape, dtype=np.float32)
+            bindings.output(name).set_buffer(buffer)
+            self.output_buffers.append(buffer)
+            self.output_slices.append(slice(offset, offset + buffer.shape[-1]))
+            offset += buffer.shape[-1]
+        self.logits = np.zeros((1, offset), dtype=np.float32)
+        self.repetition_penalty = RepetitionPenalty(offset, penalty=repetition_penalty)
+
+        self.token_times = []
+
+    def set_encoded_features(self, encoded_features):
+        """
+        Bind the encoder output for the chunk about to be decoded.
+
+        :param encoded_features: Encoder output buffer.
+        """
+        self.bindings.input(f"{self.model_name}/input_layer1").set_buffer(encoded_features)
+
+    def reset(self):
+        """
+        Restore the tokenized input to the start-of-transcript sequence.
+        """
+        np.copyto(self.tokenized, self.initial_tokenized)
+        self.input_ids[0, 1:] = 0
+
+    def set_token(self, position, token):
+        """
+        Write a single token into the decoder input, updating only its embedding row.
+
+        :param position: Position in the fixed-length sequence.
+        :param token: Token ID to place at that position.
+        """
+        self.input_ids[0, position] = token
+        np.add(self.token_embedding_weight[token], self.bias_rows[position], out=self.tokenized[0, position, 0])
+
+    def load_tokens(self, tokens):
+        """
+        Make the decoder input hold the start token followed by `tokens`, rewriting only the rows
+        that differ. Positions after the last token are left as they are: the decoder is causal,
+        so they do not affect the logits of earlier positions.
+
+        :param tokens: Generated token IDs (without the start token).
+        """
+        for position, token in enumerate(tokens, start=1):
+            if self.input_ids[0, position] != token:
+                self.set_token(position, token)
+
+    def run_step(self, position):
+        """
+        Run the decoder once and return the logits for the given position.
+
+        :param position: Position whose next-token logits are needed.
+        :return: Logits of shape (1, vocab_size). The array is reused by the next step.
+        """
+        self.configured_infer_model.run([self.bindings], self.timeout_ms)
+        for buffer, out_slice in zip(self.output_buffers, self.output_slices):
+            self.logits[:, out_slice] = buffer[:, position]
+        return self.logits
+
+    def decode(self, encoded_features):
+        """
+        Decode one chunk of encoder features with the configured strategy.
+
+        :param encoded_features: Encoder output buffer.
+        :return: List of generated token IDs.
+        """
+        self.set_encoded_features(encoded_features)
+        self.reset()
+        self.token_times = []
+
+        if isinstance(self.strategy, BeamSearch):
+            start = time.perf_counter()
+            tokens = self.strategy.search(self, self.sequence_length - 1, self.eos_token_id, self.repetition_penalty)
+            # One entry per generated token, so tokens/sec stays comparable across strategies
+            self.token_times = [(time.perf_counter() - start) / max(1, len(tokens))] * len(tokens)
+            return tokens
+
+        generated_tokens = []
+        for i in range(self.sequence_length - 1):
+            step_start = time.perf_counter()
+            logits = self.run_step(i)[0]
+            self.repetition_penalty(logits, generated_tokens, out=logits)
+            next_token = self.strategy.select(logits, generated_tokens)
+            generated_tokens.append(next_token)
+            self.set_token(i + 1, next_token)
+            self.token_times.append(time.perf_counter() - step_start)
+
+            if next_token == self.eos_token_id:
+                break
+
+        return generated_tokens
+
+    def get_timings(self):
+        """
+        Summarize the per-token timings of the last decoded chunk.
+
+        :return: Dictionary with token count, total, mean and max step time in milliseconds, and tokens/sec.
+        """
+        if not self.token_times:
+            return {"tokens": 0, "total_ms": 0.0, "mean_ms": 0.0, "max_ms": 0.0, "tokens_per_sec": 0.0}
+        times_ms = np.array(self.token_times) * 1000
+        return {
+            "tokens": len(times_ms),
+            "total_ms": float(times_ms.sum()),
+            "mean_ms": float(times_ms.mean()),
+            "max_ms": float(times_ms.max()),
+            "tokens_per_sec": float(len(times_ms) / (times_ms.sum() / 1000)),
+        }